@@ -3,10 +3,11 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QSplitter,
                              QScrollArea, QGridLayout, QFrame, QStackedWidget,
                              QSizePolicy)
-from PyQt5.QtCore import Qt, QPoint, QRect, QSize
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, QTimer
 from PyQt5.QtGui import QFont, QIcon, QMouseEvent, QPixmap
 from edit_view import EditView
-from script_view import ScriptView
+from script_view import ScriptView, ScriptViewPool
+from lua_syntax_checker import prewarm_parser
 from menu import MenuBar
 from tip_bar import TipBar
 from side_bar import SideBar
@@ -43,6 +44,9 @@ class MainWindow(QMainWindow):
 
         self.scrapbook=[]
 
+        # 屬性腳本編輯用的 ScriptView 物件池（視窗顯示後預先建立）
+        self.script_view_pool = ScriptViewPool(size=2)
+
         # 建立UI
         self.setup_ui()
 
@@ -113,26 +117,33 @@ class MainWindow(QMainWindow):
 
     def _on_summon_script_view(self, edit_view, container):
         """處理腳本編輯器請求"""
-        # 建立簡化版 ScriptView
-        script_view = ScriptView(mode="simple")
-        script_view.set_property(container.name, container.input.text())
-
-        # 產生唯一 ID
+        # 產生唯一 ID；同一容器的編輯器已開啟時直接切換過去
         script_view_id = f"script_{id(container)}"
+        if self.main_content_area.find(script_view_id):
+            self.main_content_area.setCurrentWidget(self.main_content_area.find(script_view_id))
+            return
+
+        def close():
+            # 移除 script_view、切回 edit_view 並歸還物件池
+            self.main_content_area.removeWidget(script_view)
+            self.main_content_area.setCurrentWidget(edit_view)
+            self.script_view_pool.release(script_view)
 
         def on_apply(text):
             # 寫入容器
             container.input.setText(text)
-            # 移除 script_view 並切回 edit_view
-            self.main_content_area.removeWidget(script_view)
-            self.main_content_area.setCurrentWidget(edit_view)
+            close()
 
         def on_back():
-            # 移除 script_view 並切回 edit_view（不寫入）
-            self.main_content_area.removeWidget(script_view)
-            self.main_content_area.setCurrentWidget(edit_view)
-
-        script_view.set_callbacks(on_apply=on_apply, on_back=on_back)
+            # 不寫入
+            close()
+
+        # 從物件池取出簡化版 ScriptView
+        script_view = self.script_view_pool.acquire(
+            container.name, container.input.text(), on_apply=on_apply, on_back=on_back,
+            symbol_index=edit_view.symbol_index,
+            source_id=getattr(container, "source_id", None),
+        )
         self.main_content_area.addWidget(script_view, obj=script_view_id, switch=True)
 
     def create_title_bar(self):
@@ -331,4 +342,7 @@ class MainWindow(QMainWindow):
 if __name__ == "__main__":
     window = MainWindow()
     window.show()
+    # 視窗顯示後於背景載入 Lua 解析器，首次語法檢查不必等待
+    QTimer.singleShot(0, prewarm_parser)
+    QTimer.singleShot(0, window.script_view_pool.prefill)
     sys.exit(app.exec_())
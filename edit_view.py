@@ -7,6 +7,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QPoint, QMimeData, pyqtSignal, QSize, QThread, QTimer, QEvent, QRect, QPropertyAnimation, QEasingCurve, QObject
 from PyQt5.QtGui import QPixmap, QIcon, QDrag, QCursor, QColor
 from script_view import ScriptView
+from lua_symbols import SymbolIndex
 from common import FlowLayout, WatchFaceText, StackWidget
 import components
 from summon_obj import *
@@ -266,7 +267,7 @@ class WatchPreview(QWidget):
     summon=pyqtSignal(object,object,object)
     receive=pyqtSignal(object,object)
 
-    def __init__(self,data=None,parent=None):
+    def __init__(self,data=None,parent=None,single_canvas=False):
         super().__init__(parent)
         self.scale=[]
         self.hash_table={}
@@ -275,6 +276,11 @@ class WatchPreview(QWidget):
         self.face.setMinimumSize(200,200)
         self.setAcceptDrops(True)
         self.receive.connect(self.show_component)
+        # single_canvas: 所有圖層由同一個 LayerCanvas 繪製，而不是各自一個 widget
+        self.canvas=None
+        if single_canvas:
+            self.canvas=LayerCanvas(self)
+            self.canvas.layer_pressed.connect(lambda layer: self.select.emit(self.hash_table[layer]))
         self.set_ui()
 
     def set_ui(self):
@@ -284,11 +290,17 @@ class WatchPreview(QWidget):
         face_layout.setAlignment(Qt.AlignCenter)
         face_layout.addWidget(self.face)
         self.override=OverrideWidget("drop here\nadd new item","img/edit/view_drag.png",self)
+        # 畫布要在錶面圖片之上才看得到圖層、收到點擊；OverrideWidget 顯示時會自己 raise_()
+        if self.canvas is not None:
+            self.canvas.raise_()
 
     def show_component(self,obj,hash_id):
+        self.hash_table[obj]=hash_id
+        if isinstance(obj,CanvasLayer):
+            self.canvas.add_layer(obj)
+            return
         obj.setParent(self)
         obj.installEventFilter(self)
-        self.hash_table[obj]=hash_id
         obj.show()
 
     def eventFilter(self, watched, event):
@@ -299,6 +311,8 @@ class WatchPreview(QWidget):
     def resizeEvent(self, event):
         super().resizeEvent(event)
         """更新圖片大小，保持長寬比"""
+        if self.canvas is not None:
+            self.canvas.resize(self.size())
         if self.face_img.isNull():
             return
         # 獲取當前 widget 的大小
@@ -399,7 +413,9 @@ class AttributeLayout(QVBoxLayout):
             self.row_layout=QHBoxLayout(self)
             self.row_layout.setContentsMargins(0, 2, 0, 2)
             self.row_layout.setSpacing(8)
-            self.attr_config = attr_config
+            # 保留自己的副本：面板輸入只更新這份（複製時沿用），不會改到
+            # components 的 schema，元件類別的預設值因此固定不變
+            self.attr_config = dict(attr_config)
             self.name = attr_config.get("name", "")
             self.attr_type = attr_config.get("type", "text")
             self.default = attr_config.get("default", "")
@@ -587,8 +603,8 @@ class AttributeLayout(QVBoxLayout):
         self.data[widget.attr_config["name"]]=widget.get_value()
         self.item.append(widget)
 
-    def summon(self):
-        new=components_factory(*self.pack())
+    def summon(self,canvas=False):
+        new=components_factory(*self.pack(),canvas=canvas)
         for obj in self.item:
             new.connect(obj.name,obj.value_changed,obj.set_value)
             obj.value_changed.emit(obj.get_value())
@@ -603,6 +619,7 @@ class AttributePanal(StackWidget):
     delect_widget=pyqtSignal(object,object)
     send_obj=pyqtSignal(object,object)
     request_script_editor=pyqtSignal(object)  # 轉發 container 的腳本編輯器請求
+    script_source_changed=pyqtSignal(str,str)  # (source_id, 運算式) number 屬性內容變更
     def __init__(self, data=None, signal=None, tip_signal=None, parent=None):
         super().__init__(parent)
         self.override=OverrideWidget("drop here\nset preset value","img/edit/att_drag.png",self)
@@ -611,6 +628,7 @@ class AttributePanal(StackWidget):
         self.summon_widget.connect(self.copy_widget)
         self.def_widget.connect(self.create_widget)
         self.tip_signal=tip_signal
+        self.canvas_layers=False  # True 時產生 CanvasLayer（WatchPreview 使用單一畫布）
         self.addWidget(QWidget())
 
     def copy_widget(self,com_type,pos,hash_id):
@@ -633,16 +651,21 @@ class AttributePanal(StackWidget):
         for idx in range(l.count()):
             item=l.itemAt(idx).widget()
             copy_item=item.copy()
-            # 連接 number 類型的腳本編輯器信號
+            # 連接 number 類型的腳本編輯器信號，並把運算式提供給符號索引
             if copy_item.attr_type == "number":
+                copy_item.source_id = f"{hash_id}.{copy_item.name}"
                 copy_item.open_script_editor.connect(self.request_script_editor.emit)
+                copy_item.value_changed.connect(
+                    lambda value, source_id=copy_item.source_id:
+                        self.script_source_changed.emit(source_id, str(value))
+                )
             if copy_item.name=="x":
                 copy_item.set_value(pos.x())
             if copy_item.name=="y":
                 copy_item.set_value(pos.y())
             attributes_layout.addWidget(copy_item)
         self.addWidget(new,str(hash_id))
-        new=attributes_layout.summon()
+        new=attributes_layout.summon(self.canvas_layers)
 
         self.send_obj.emit(new,hash_id)
 
@@ -701,6 +724,8 @@ class AttributePanal(StackWidget):
 class EditView(QWidget):
     exp_singal=pyqtSignal(object,object,object)
     summon_script_view=pyqtSignal(object,object)  # (edit_view, container)
+    # True: 預覽區以單一 LayerCanvas 繪製所有圖層（圖層很多時重繪較快）
+    single_canvas=False
 
     def __init__(self, parent=None, data=None, tip_signal=None):
         super().__init__(parent)
@@ -712,6 +737,10 @@ class EditView(QWidget):
         self.setAcceptDrops(True)
         self.is_dragging = False
         self.id_stack=[1]
+        # 整個錶面（主腳本與所有屬性運算式）的符號索引，在背景執行緒更新
+        self.symbol_index=SymbolIndex()
+        index=self.symbol_index
+        self.destroyed.connect(lambda: index.close())
         self.set_ui()
         self.setStyleSheet(load_style())
 
@@ -720,11 +749,12 @@ class EditView(QWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
         self.explorer=Exploror(self.data, self.exp_singal)
-        self.watch_preview=WatchPreview(self.data)
+        self.watch_preview=WatchPreview(self.data,single_canvas=self.single_canvas)
 
         component_related=QSplitter(Qt.Vertical)
         self.components=ComponentPanel(self.data)
         self.attribute=AttributePanal(self.data, self.tip_signal)
+        self.attribute.canvas_layers=self.single_canvas
         self.drag_box=DragVisual(self)
         component_related.setObjectName("objectSplitter")
         component_related.setHandleWidth(2)
@@ -751,6 +781,17 @@ class EditView(QWidget):
         self.attribute.request_script_editor.connect(
             lambda container: self.summon_script_view.emit(self, container)
         )
+        self.attribute.script_source_changed.connect(self.update_script_source)
+
+    def update_script_source(self,source_id,code):
+        """更新符號索引中的一個來源；純數字不是 Lua 運算式，直接移除"""
+        text=code.strip()
+        try:
+            float(text)
+            text=""
+        except ValueError:
+            pass
+        self.symbol_index.submit(source_id, code if text else None)
 
     def get_hash_id(self):
         if self.id_stack[-1] is self.id_stack[0]:
@@ -762,6 +803,7 @@ class EditView(QWidget):
         
     def delete_component(self,obj):
         self.id_stack.append(obj.hash_id)
+        self.symbol_index.remove_prefix(f"{obj.hash_id}.")
 
     def att_call(self,obj,hash_id):
         self.watch_preview.receive.emit(obj,hash_id)
@@ -0,0 +1,181 @@
+"""Lua 自動完成索引
+
+為腳本編輯器提供預先建立的自動完成索引，每次按鍵只需二分搜尋，
+成本與文件大小無關。此模組不依賴 PyQt5。
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from watchmaker_api import (
+    WATCHMAKER_API, WATCHMAKER_ACTIONS, EASING_FUNCTIONS, WATCHMAKER_TAG_GROUPS,
+)
+
+
+# Lua 關鍵字與常用標準函數
+LUA_STANDARD_NAMES = [
+    'and', 'break', 'do', 'else', 'elseif', 'end', 'false',
+    'for', 'function', 'goto', 'if', 'in', 'local', 'nil',
+    'not', 'or', 'repeat', 'return', 'then', 'true', 'until', 'while',
+    'print', 'type', 'tonumber', 'tostring', 'pairs', 'ipairs',
+    'next', 'select', 'unpack', 'pcall', 'xpcall', 'error', 'assert',
+    'string.len', 'string.sub', 'string.find', 'string.format',
+    'string.lower', 'string.upper', 'string.rep', 'string.reverse',
+    'math.abs', 'math.ceil', 'math.floor', 'math.max', 'math.min',
+    'math.random', 'math.sin', 'math.cos', 'math.tan', 'math.sqrt',
+    'table.insert', 'table.remove', 'table.sort', 'table.concat',
+]
+
+# 自定義變數前綴
+VARIABLE_PREFIXES = ['var_', 'var_ms_', 'var_s_']
+
+
+class CompletionIndex:
+    """不分大小寫的排序前綴索引
+
+    以小寫鍵排序後用二分搜尋取出前綴範圍，再依使用次數排序，
+    使用次數相同時保持字母順序。
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self._words = sorted(set(words), key=lambda word: (word.lower(), word))
+        self._keys = [word.lower() for word in self._words]
+        self._usage: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._words)
+
+    @property
+    def words(self) -> List[str]:
+        return list(self._words)
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """回傳以 prefix 開頭的候選字（不分大小寫），常用的排在前面"""
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\uffff', start)
+        matches = self._words[start:end]
+
+        if self._usage:
+            usage = self._usage
+            matches = sorted(matches, key=lambda word: -usage.get(word, 0))
+        return matches[:limit] if limit else matches
+
+    def record_use(self, word: str):
+        """記錄一次選用，提高該字之後的排名"""
+        self._usage[word] = self._usage.get(word, 0) + 1
+
+
+# 所有 API 自動完成項目（QsciAPIs 與 API_COMPLETIONS 共用）
+API_WORDS = [
+    *LUA_STANDARD_NAMES,
+    *WATCHMAKER_API.keys(),
+    *VARIABLE_PREFIXES,
+    *EASING_FUNCTIONS,
+    *WATCHMAKER_ACTIONS,
+]
+
+# API 自動完成索引（所有編輯器共用，使用次數也一併共用）
+API_COMPLETIONS = CompletionIndex(API_WORDS)
+
+
+# ============================================================================
+# 標籤模糊搜尋
+# ============================================================================
+
+class TagEntry(NamedTuple):
+    """標籤索引中的一筆資料"""
+    display: str        # 選單顯示文字，例如 "Day_of_week_full:{ddww}"
+    tag: str            # 插入的標籤，例如 "{ddww}"
+    code: str           # 小寫標籤代碼，例如 "ddww"
+    name: str           # 小寫描述，例如 "day_of_week_full"
+    initials: str       # 描述各單字字首，例如 "dowf"
+    category: str
+    order: int          # 在 WATCHMAKER_TAGS 中的順序
+    haystack: str       # 模糊比對用字串 "code name category"
+
+
+class TagIndex:
+    """WatchMaker 標籤的模糊搜尋索引
+
+    查詢字串依序比對：標籤代碼完全相同 > 代碼前綴 > 描述單字字首或
+    縮寫前綴 > 子字串 > 子序列（字元依序出現即可），同級再依比對範圍
+    長短與原始順序排序。查詢延續上一次時只在上次的結果中縮小範圍。
+    """
+
+    _WORD_SPLIT = re.compile(r'[^a-z0-9]+')
+
+    def __init__(self, groups: Dict[str, Dict[str, str]]):
+        entries = []
+        for category, tags in groups.items():
+            for display, tag in tags.items():
+                name = display.split(':{', 1)[0].lower()
+                words = [word for word in self._WORD_SPLIT.split(name) if word]
+                code = tag.strip('{}').lower()
+                entries.append(TagEntry(
+                    display=display,
+                    tag=tag,
+                    code=code,
+                    name=name,
+                    initials=''.join(word[0] for word in words),
+                    category=category,
+                    order=len(entries),
+                    haystack=f"{code} {name} {category.lower()}",
+                ))
+        self.entries: Tuple[TagEntry, ...] = tuple(entries)
+        self._words = {entry: tuple(self._WORD_SPLIT.split(entry.name)) for entry in entries}
+        self._by_display = {entry.display: entry for entry in entries}
+        self._last_query = None
+        self._last_matches: Tuple[TagEntry, ...] = self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, display: str) -> Optional[TagEntry]:
+        return self._by_display.get(display)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[TagEntry]:
+        """依查詢字串回傳排序後的標籤，空查詢回傳全部（原始順序）"""
+        query = query.lower().strip('{}')
+        if not query:
+            self._last_query, self._last_matches = '', self.entries
+            return list(self.entries[:limit] if limit else self.entries)
+
+        # 延續上一次的查詢時只需在上次的結果中縮小範圍
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = self.entries
+
+        pattern = re.compile('.*?'.join(map(re.escape, query)))
+        search = pattern.search
+        scored = []
+        for entry in candidates:
+            match = search(entry.haystack)
+            if match is None:
+                continue
+            scored.append((self._rank(entry, query, match), entry))
+        scored.sort()
+
+        matches = tuple(entry for _, entry in scored)
+        self._last_query, self._last_matches = query, matches
+        return list(matches[:limit] if limit else matches)
+
+    def _rank(self, entry: TagEntry, query: str, match) -> tuple:
+        if entry.code == query:
+            level = 0
+        elif entry.code.startswith(query):
+            level = 1
+        elif entry.initials.startswith(query) or any(
+                word.startswith(query) for word in self._words[entry]):
+            level = 2
+        elif query in entry.haystack:
+            level = 3
+        else:
+            level = 4
+        return level, match.end() - match.start(), entry.order
+
+
+# 標籤索引（匯入時建立一次）
+TAG_INDEX = TagIndex(WATCHMAKER_TAG_GROUPS)
@@ -0,0 +1,144 @@
+"""Lua Formatter
+
+Token-stream based indentation formatter. Instead of rewriting the whole
+text it returns the minimal per-line edits (leading/trailing whitespace
+only), so editors can apply them as a single undo step without a full
+re-lex, and can restrict them to a line range.
+"""
+
+from typing import List, NamedTuple, Optional
+
+from lua_tokenizer import tokenize, COMMENT, KEYWORD, OPERATOR, STRING
+
+
+class LineEdit(NamedTuple):
+    """Replace whitespace at both ends of one line"""
+    line: int           # 0-indexed line
+    remove_leading: int  # number of leading whitespace characters to replace
+    indent: str         # new leading whitespace
+    remove_trailing: int  # number of trailing whitespace characters to delete
+
+
+# Tokens that open / close an indentation level
+_OPENING_KEYWORDS = frozenset(['function', 'then', 'do', 'repeat', 'else'])
+_CLOSING_KEYWORDS = frozenset(['end', 'until', 'else', 'elseif'])
+_OPENING_BRACKETS = frozenset(['(', '{', '['])
+_CLOSING_BRACKETS = frozenset([')', '}', ']'])
+
+
+def _is_opener(token) -> bool:
+    if token.type == KEYWORD:
+        return token.value in _OPENING_KEYWORDS
+    return token.type == OPERATOR and token.value in _OPENING_BRACKETS
+
+
+def _is_closer(token) -> bool:
+    if token.type == KEYWORD:
+        return token.value in _CLOSING_KEYWORDS
+    return token.type == OPERATOR and token.value in _CLOSING_BRACKETS
+
+
+def indent_levels(code: str, tokens=None) -> List[Optional[int]]:
+    """Indentation level of every line, None for lines that must not change.
+
+    Levels count lines with unclosed openers rather than the openers
+    themselves, so ``foo({`` indents its contents once, and a line that
+    starts with closers (``end``, ``})``, ``else``) is dedented to match
+    the line that opened them. Lines starting inside a multi-line string
+    or long comment are left alone.
+    """
+    if tokens is None:
+        tokens = tokenize(code)
+
+    line_count = code.count('\n') + 1
+    levels: List[Optional[int]] = [None] * line_count
+    groups = []      # [line, number of open tokens] for each line with openers
+    token_index = 0
+    token_count = len(tokens)
+    frozen_until = -1  # last line covered by a multi-line string/comment
+
+    for line in range(line_count):
+        line_tokens = []
+        while token_index < token_count and tokens[token_index].line == line:
+            line_tokens.append(tokens[token_index])
+            token_index += 1
+
+        if line <= frozen_until:
+            level = None
+        else:
+            level = len(groups)
+
+        leading = True
+        for token in line_tokens:
+            if token.type == COMMENT or token.type == STRING:
+                newlines = token.value.count('\n')
+                if newlines:
+                    frozen_until = max(frozen_until, line + newlines)
+                if token.type == COMMENT:
+                    continue
+
+            if _is_closer(token) and groups:
+                groups[-1][1] -= 1
+                if groups[-1][1] == 0:
+                    groups.pop()
+                # Closers at the start of a line dedent the line itself
+                if leading and level is not None:
+                    level = len(groups)
+            else:
+                leading = False
+
+            if _is_opener(token):
+                if groups and groups[-1][0] == line:
+                    groups[-1][1] += 1
+                else:
+                    groups.append([line, 1])
+
+        levels[line] = level
+
+    return levels
+
+
+def format_edits(code: str, start_line: int = 0, end_line: Optional[int] = None,
+                 indent: str = "  ") -> List[LineEdit]:
+    """Edits that re-indent lines start_line..end_line (inclusive).
+
+    Only lines whose whitespace actually changes produce an edit; the
+    whole file is tokenized so the range is indented in context.
+    """
+    levels = indent_levels(code)
+    lines = code.split('\n')
+    if end_line is None or end_line >= len(lines):
+        end_line = len(lines) - 1
+
+    edits = []
+    for line in range(max(0, start_line), end_line + 1):
+        level = levels[line]
+        if level is None:
+            continue
+        text = lines[line]
+        if text.endswith('\r'):
+            text = text[:-1]
+        stripped = text.strip(' \t')
+        leading = len(text) - len(text.lstrip(' \t'))
+        trailing = len(text) - len(text.rstrip(' \t')) if stripped else 0
+        new_indent = indent * level if stripped else ""
+        if text[:leading] != new_indent or trailing:
+            edits.append(LineEdit(line, leading, new_indent, trailing))
+    return edits
+
+
+def apply_edits(code: str, edits: List[LineEdit]) -> str:
+    """Apply edits to a string (for callers without an editor)"""
+    lines = code.split('\n')
+    for edit in edits:
+        text = lines[edit.line]
+        suffix = '\r' if text.endswith('\r') else ''
+        body = text[:-1] if suffix else text
+        body = body[edit.remove_leading:len(body) - edit.remove_trailing]
+        lines[edit.line] = edit.indent + body + suffix
+    return '\n'.join(lines)
+
+
+def format_lua(code: str, indent: str = "  ") -> str:
+    """Return re-indented code"""
+    return apply_edits(code, format_edits(code, indent=indent))
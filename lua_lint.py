@@ -0,0 +1,312 @@
+"""Lua Lint - headless batch checker for WatchMaker scripts
+
+Checks Lua scripts and attribute expressions with LuaSyntaxChecker from
+the command line, spreading the work over a process pool. Does not
+import PyQt5, so it starts fast on build machines.
+
+Usage:
+    python lua_lint.py [options] PATH [PATH ...]
+
+PATH may be a .lua script, an exported watch (watch.xml or a .watch
+archive) or a directory searched recursively for those files. Other script
+extensions (e.g. .txt) are only searched for when given with --ext.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from lua_syntax_checker import (
+    LuaSyntaxChecker, ErrorSeverity, enable_disk_cache, parser_status, wrap_expression,
+    unwrap_expression_errors,
+)
+from watchmaker_api import WATCHMAKER_API, WATCHMAKER_ACTIONS, EASING_FUNCTIONS
+
+SCRIPT_EXTENSIONS = ('.lua',)
+WATCH_EXTENSIONS = ('.xml', '.watch')
+
+
+class LintItem(NamedTuple):
+    """One piece of Lua code to check"""
+    path: str       # file the code came from
+    name: str       # "script" or "<layer>.<attribute>"
+    code: str
+    kind: str       # "script" or "expression"
+
+
+# ============================================================================
+# Collecting scripts
+# ============================================================================
+
+def _number_attributes():
+    """Map layer type -> names of its number attributes (from the schemas)"""
+    from components import attributes as schemas
+
+    result = {}
+    for layer_type in schemas.__all__:
+        spec = getattr(schemas, layer_type)
+        if isinstance(spec, list) and spec and isinstance(spec[0], dict):
+            result[layer_type] = {attr["name"] for attr in spec
+                                  if attr.get("type") == "number"}
+    return result
+
+
+def _is_plain_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _items_from_watch_xml(path: str, data: bytes, number_attrs) -> List[LintItem]:
+    """Extract the main script and layer expressions from a watch.xml"""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        print(f"Warning: Cannot parse {path}: {e}", file=sys.stderr)
+        return []
+
+    items = []
+    for index, element in enumerate(root.iter()):
+        if element.tag.lower() == "script" and element.text and element.text.strip():
+            items.append(LintItem(path, "script", element.text, "script"))
+            continue
+
+        layer_type = element.get("type")
+        if layer_type not in number_attrs:
+            continue
+        layer_name = element.get("name") or f"{layer_type}#{index}"
+        for attr in sorted(number_attrs[layer_type]):
+            value = element.get(attr)
+            if value and value.strip() and not _is_plain_number(value.strip()):
+                items.append(LintItem(path, f"{layer_name}.{attr}", value, "expression"))
+    return items
+
+
+def collect_items(paths: List[str], script_extensions=SCRIPT_EXTENSIONS) -> List[LintItem]:
+    """Walk the given files/directories and collect everything to check
+
+    Directories are searched for script_extensions and watch files; files
+    named explicitly are always checked.
+    """
+    extensions = tuple(ext.lower() for ext in script_extensions) + WATCH_EXTENSIONS
+    number_attrs = None
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(extensions):
+                        files.append(os.path.join(dirpath, filename))
+        else:
+            files.append(path)
+
+    items = []
+    for path in files:
+        lower = path.lower()
+        try:
+            if lower.endswith(WATCH_EXTENSIONS):
+                if number_attrs is None:
+                    number_attrs = _number_attributes()
+                if lower.endswith('.watch'):
+                    with zipfile.ZipFile(path) as archive:
+                        for member in archive.namelist():
+                            if member.lower().endswith('.xml'):
+                                items.extend(_items_from_watch_xml(
+                                    f"{path}!{member}", archive.read(member), number_attrs))
+                else:
+                    with open(path, 'rb') as f:
+                        items.extend(_items_from_watch_xml(path, f.read(), number_attrs))
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    items.append(LintItem(path, "script", f.read(), "script"))
+        except (OSError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+            print(f"Warning: Cannot read {path}: {e}", file=sys.stderr)
+    return items
+
+
+# ============================================================================
+# Checking (runs in worker processes)
+# ============================================================================
+
+_checker: Optional[LuaSyntaxChecker] = None
+
+
+def _init_worker(cache_dir: Optional[str] = None):
+    """Create the per-process checker and load/warm the parser
+
+    Loading happens here rather than in the first check_item() call so
+    the one-time import is not counted in any item's time.
+    """
+    global _checker
+    if cache_dir:
+        enable_disk_cache(cache_dir)
+    _checker = LuaSyntaxChecker(
+        watchmaker_api=WATCHMAKER_API,
+        watchmaker_actions=WATCHMAKER_ACTIONS,
+        easing_functions=EASING_FUNCTIONS
+    )
+    parser_status()
+
+
+def check_item(item: LintItem) -> dict:
+    """Check one item and return a JSON-serialisable result"""
+    if _checker is None:
+        _init_worker()
+
+    code = item.code
+    if item.kind == "expression":
+        code = wrap_expression(code)
+
+    started = time.perf_counter()
+    errors = _checker.check(code)
+    elapsed = time.perf_counter() - started
+    if item.kind == "expression":
+        errors = unwrap_expression_errors(errors, item.code)
+
+    diagnostics = []
+    for error in errors:
+        diagnostics.append({
+            "line": error.line + 1,
+            "column": error.column + 1,
+            "severity": error.severity.value,
+            "code": error.error_code,
+            "message": error.message,
+        })
+
+    return {
+        "path": item.path,
+        "name": item.name,
+        "kind": item.kind,
+        "time": elapsed,
+        "diagnostics": diagnostics,
+    }
+
+
+def run(items: List[LintItem], jobs: int, cache_dir: Optional[str] = None) -> List[dict]:
+    """Check all items, in parallel when jobs > 1"""
+    if jobs <= 1 or len(items) <= 1:
+        _init_worker(cache_dir)
+        return [check_item(item) for item in items]
+
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(cache_dir,)) as pool:
+        return list(pool.map(check_item, items, chunksize=chunksize))
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def _group_by_file(results: List[dict]) -> List[dict]:
+    files = {}
+    for result in results:
+        entry = files.setdefault(result["path"], {"path": result["path"], "time": 0.0, "items": []})
+        entry["time"] += result["time"]
+        entry["items"].append(result)
+    return list(files.values())
+
+
+def _count(results: List[dict], severity: str) -> int:
+    return sum(1 for r in results for d in r["diagnostics"] if d["severity"] == severity)
+
+
+def format_json(results: List[dict], wall_time: float) -> str:
+    report = {
+        "summary": {
+            "files": len({r["path"] for r in results}),
+            "items": len(results),
+            "errors": _count(results, ErrorSeverity.ERROR.value),
+            "warnings": _count(results, ErrorSeverity.WARNING.value),
+            "time": wall_time,
+        },
+        "files": _group_by_file(results),
+    }
+    return json.dumps(report, indent=2, ensure_ascii=False)
+
+
+def format_junit(results: List[dict], wall_time: float) -> str:
+    suites = ET.Element("testsuites", {
+        "name": "lua-lint",
+        "tests": str(len(results)),
+        "failures": str(sum(1 for r in results if r["diagnostics"])),
+        "time": f"{wall_time:.3f}",
+    })
+    for file_entry in _group_by_file(results):
+        items = file_entry["items"]
+        suite = ET.SubElement(suites, "testsuite", {
+            "name": file_entry["path"],
+            "tests": str(len(items)),
+            "failures": str(sum(1 for r in items if r["diagnostics"])),
+            "time": f"{file_entry['time']:.3f}",
+        })
+        for result in items:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": file_entry["path"],
+                "name": result["name"],
+                "time": f"{result['time']:.3f}",
+            })
+            if result["diagnostics"]:
+                lines = [f"{d['line']}:{d['column']} [{d['code']}] {d['message']}"
+                         for d in result["diagnostics"]]
+                first = result["diagnostics"][0]
+                failure = ET.SubElement(case, "failure", {
+                    "message": first["message"],
+                    "type": first["severity"],
+                })
+                failure.text = "\n".join(lines)
+    return ET.tostring(suites, encoding="unicode")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check WatchMaker Lua scripts and attribute expressions."
+    )
+    parser.add_argument("paths", nargs="+", help="files or directories to check")
+    parser.add_argument("-f", "--format", choices=["json", "junit"], default="json",
+                        help="report format (default: json)")
+    parser.add_argument("-o", "--output", help="write the report to a file instead of stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", help="persist parse results in this directory")
+    parser.add_argument("--warnings-as-errors", action="store_true",
+                        help="exit with status 1 on warnings too")
+    parser.add_argument("--ext", action="append", default=[], metavar="EXT",
+                        help="also search directories for scripts with this extension "
+                             "(e.g. --ext .txt); may be repeated")
+    args = parser.parse_args(argv)
+
+    extensions = SCRIPT_EXTENSIONS + tuple(
+        ext if ext.startswith('.') else f".{ext}" for ext in args.ext)
+
+    started = time.perf_counter()
+    items = collect_items(args.paths, extensions)
+    results = run(items, args.jobs, args.cache_dir)
+    wall_time = time.perf_counter() - started
+
+    formatter = format_junit if args.format == "junit" else format_json
+    report = formatter(results, wall_time)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    else:
+        print(report)
+
+    failing = {ErrorSeverity.ERROR.value}
+    if args.warnings_as_errors:
+        failing.add(ErrorSeverity.WARNING.value)
+    has_failures = any(d["severity"] in failing for r in results for d in r["diagnostics"])
+    return 1 if has_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
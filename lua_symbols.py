@@ -0,0 +1,591 @@
+"""Lua Symbols
+
+Workspace-wide index of global symbols across the Lua sources of a watch
+(the main script and every attribute expression). Each source is
+scanned with the tokenizer into definitions and usages of globals,
+``var_``/``var_ms_``/``var_s_`` variables and callbacks; updating one
+source only replaces that source's entries, so queries never rescan the
+workspace. SemanticHighlighter classifies the same names (and {tag}s)
+for editor highlighting, per top-level chunk from the checker's ASTs.
+Does not depend on PyQt5.
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from lua_syntax_checker import LuaSyntaxChecker
+from lua_tokenizer import tokenize, COMMENT, KEYWORD, NAME, OPERATOR, STRING
+from watchmaker_api import WATCHMAKER_API, EASING_FUNCTIONS
+
+# Symbol categories
+CALLBACK = "callback"
+VARIABLE = "variable"
+GLOBAL = "global"
+
+CALLBACK_NAMES = frozenset(LuaSyntaxChecker.VALID_CALLBACKS)
+VARIABLE_PREFIXES = ('var_ms_', 'var_s_', 'var_')
+
+# Lua standard library globals (base functions and library tables, 5.1-5.4)
+LUA_GLOBALS = frozenset([
+    '_G', '_VERSION', '_ENV', 'assert', 'collectgarbage', 'dofile', 'error',
+    'gcinfo', 'getfenv', 'getmetatable', 'ipairs', 'load', 'loadfile',
+    'loadstring', 'module', 'newproxy', 'next', 'pairs', 'pcall', 'print',
+    'rawequal', 'rawget', 'rawlen', 'rawset', 'require', 'select', 'setfenv',
+    'setmetatable', 'tonumber', 'tostring', 'type', 'unpack', 'xpcall',
+    'bit32', 'coroutine', 'debug', 'io', 'math', 'os', 'package', 'string',
+    'table', 'utf8',
+])
+
+# Globals provided by Lua and WatchMaker (API functions and the easing
+# functions passed to wm_schedule), never reported as undefined
+BUILTIN_GLOBALS = LUA_GLOBALS | frozenset(WATCHMAKER_API) | frozenset(EASING_FUNCTIONS)
+
+
+class Symbol(NamedTuple):
+    """One definition or usage of a global name"""
+    name: str
+    source: str         # source id, e.g. "script" or "<layer>.<attribute>"
+    line: int           # 0-indexed
+    column: int         # 0-indexed
+    definition: bool    # True for assignments and function definitions
+    category: str       # CALLBACK, VARIABLE or GLOBAL
+
+
+def symbol_category(name: str) -> str:
+    if name in CALLBACK_NAMES:
+        return CALLBACK
+    if name.startswith(VARIABLE_PREFIXES):
+        return VARIABLE
+    return GLOBAL
+
+
+# Keywords that open a block with its own local scope
+_SCOPE_OPENERS = frozenset(['do', 'then', 'repeat'])
+
+
+def extract_symbols(code: str, source: str = "") -> List[Symbol]:
+    """Global definitions and usages in one piece of Lua code.
+
+    Locals (``local`` declarations, function parameters and ``for``
+    variables) are tracked per block and skipped, as are field accesses
+    (``a.b``, ``a:b``), table constructor keys and WatchMaker tags
+    written as ``{tag}``.
+    """
+    tokens = [token for token in tokenize(code) if token.type != COMMENT]
+    count = len(tokens)
+    symbols = []
+    scopes = [set()]        # local names per open block
+    pending = []            # names to declare in the next block (params, for vars)
+    brackets = []           # open brackets, to recognise table keys
+
+    def value_at(index):
+        return tokens[index].value if 0 <= index < count else None
+
+    def is_local(name):
+        return any(name in scope for scope in scopes)
+
+    def add(token, definition):
+        symbols.append(Symbol(token.value, source, token.line, token.column,
+                              definition, symbol_category(token.value)))
+
+    def open_scope():
+        scopes.append(set(pending))
+        pending.clear()
+
+    def close_scope():
+        if len(scopes) > 1:
+            scopes.pop()
+
+    def read_params(index):
+        """Collect parameter names from '(' at index, return index after ')'"""
+        if value_at(index) != '(':
+            return index
+        index += 1
+        while index < count and tokens[index].value != ')':
+            if tokens[index].type == NAME:
+                pending.append(tokens[index].value)
+            index += 1
+        return index + 1
+
+    i = 0
+    while i < count:
+        token = tokens[i]
+        value = token.value
+
+        if token.type == KEYWORD:
+            if value == 'local':
+                i += 1
+                if value_at(i) == 'function':
+                    i += 1
+                    if i < count and tokens[i].type == NAME:
+                        scopes[-1].add(tokens[i].value)
+                        i += 1
+                    i = read_params(i)
+                    open_scope()
+                    continue
+                # local a, b <const> = ...
+                while i < count and tokens[i].type == NAME:
+                    scopes[-1].add(tokens[i].value)
+                    i += 1
+                    if value_at(i) == '<':
+                        i += 3
+                    if value_at(i) != ',':
+                        break
+                    i += 1
+                continue
+
+            if value == 'function':
+                i += 1
+                if i < count and tokens[i].type == NAME:
+                    name_token = tokens[i]
+                    qualified = value_at(i + 1) in ('.', ':')
+                    if not is_local(name_token.value):
+                        add(name_token, definition=not qualified)
+                    # Skip the rest of a.b.c:d
+                    i += 1
+                    while value_at(i) in ('.', ':') and i + 1 < count:
+                        if value_at(i) == ':':
+                            pending.append('self')
+                        i += 2
+                i = read_params(i)
+                open_scope()
+                continue
+
+            if value == 'for':
+                i += 1
+                while i < count and tokens[i].value not in ('in', '='):
+                    if tokens[i].type == NAME:
+                        pending.append(tokens[i].value)
+                    i += 1
+                continue
+
+            if value in _SCOPE_OPENERS:
+                open_scope()
+            elif value == 'else':
+                close_scope()
+                open_scope()
+            elif value in ('elseif', 'end', 'until'):
+                close_scope()
+            elif value == 'goto':
+                i += 1  # label name
+            i += 1
+            continue
+
+        if token.type == OPERATOR:
+            if value in ('(', '{', '['):
+                brackets.append(value)
+            elif value in (')', '}', ']'):
+                if brackets:
+                    brackets.pop()
+            elif value == '::':
+                i += 2  # ::label::
+            i += 1
+            continue
+
+        if token.type == NAME:
+            previous = value_at(i - 1)
+            following = value_at(i + 1)
+            if previous in ('.', ':'):
+                pass    # field or method
+            elif previous == '{' and following == '}':
+                pass    # WatchMaker tag
+            elif following == '=' and brackets and brackets[-1] == '{':
+                pass    # table constructor key
+            elif not is_local(value):
+                add(token, definition=_is_assignment_target(tokens, i, count))
+        i += 1
+
+    return symbols
+
+
+# Semantic highlighting kinds
+API_CALL = "api"
+TAG = "tag"
+
+_TAG_RE = re.compile(r'\{[A-Za-z0-9_]+\}')
+_PLACEHOLDER_RE = re.compile(r'"__wm_tag_[A-Za-z0-9_]+__"$')
+_PLACEHOLDER_NAME_RE = re.compile(r'__wm_tag_[A-Za-z0-9_]+__$')
+
+
+class SemanticSpan(NamedTuple):
+    """A range of code with a semantic meaning the lexer cannot see"""
+    start: int          # character offset
+    end: int
+    kind: str           # API_CALL, VARIABLE, CALLBACK or TAG
+
+
+def semantic_spans(code: str, tokens=None) -> List[SemanticSpan]:
+    """Classify WatchMaker API calls, var_ variables, callback definitions
+    and {tag} literals from the token stream, sorted by position."""
+    if tokens is None:
+        tokens = tokenize(code)
+    spans = []
+    previous = None     # last significant token
+    for index, token in enumerate(tokens):
+        if token.type == COMMENT:
+            continue
+        if token.type == STRING:
+            spans.extend(_string_spans(token))
+        elif token.type == NAME:
+            kind = _token_name_kind(token.value, previous)
+            if kind is not None:
+                spans.append(SemanticSpan(token.start, token.end, kind))
+            elif (previous is not None and previous.value == '{'
+                  and index + 1 < len(tokens) and tokens[index + 1].value == '}'):
+                # Bare {tag} in an expression
+                spans.append(SemanticSpan(previous.start, tokens[index + 1].end, TAG))
+        previous = token
+    return spans
+
+
+def _string_spans(token) -> List[SemanticSpan]:
+    """TAG spans of a string token: a whole tag placeholder left by the
+    checker's preprocessing, or the {tag}s written inside the literal"""
+    if _PLACEHOLDER_RE.match(token.value):
+        return [SemanticSpan(token.start, token.end, TAG)]
+    return [SemanticSpan(token.start + match.start(), token.start + match.end(), TAG)
+            for match in _TAG_RE.finditer(token.value)]
+
+
+def _token_name_kind(name: str, previous) -> Optional[str]:
+    """Kind of a name judged from the previous token only"""
+    if previous is not None and previous.value in ('.', ':'):
+        return None     # field or method
+    if name in CALLBACK_NAMES and previous is not None and previous.value == 'function':
+        return CALLBACK
+    return _name_kind(name)
+
+
+def _name_kind(name: str) -> Optional[str]:
+    if name.startswith(VARIABLE_PREFIXES):
+        return VARIABLE
+    if name in WATCHMAKER_API:
+        return API_CALL
+    return None
+
+
+def _ast_name_kinds(tree) -> List[Tuple[str, Optional[str]]]:
+    """(name, kind) of every name in a luaparser AST, in source order.
+
+    Field and method names, table constructor keys, local function
+    names and labels have no kind; only global function definitions of a
+    callback name are callbacks.
+    """
+    from luaparser import ast as luaast, astnodes
+
+    fields = set()      # id() of Name nodes that are not variables
+    callbacks = set()
+    kinds = []
+    for node in luaast.walk(tree):
+        # walk() yields parents before children, so the sets are filled
+        # before the Name nodes they refer to
+        if isinstance(node, astnodes.Name):
+            if id(node) in fields:
+                kinds.append((node.id, None))
+            elif id(node) in callbacks:
+                kinds.append((node.id, CALLBACK))
+            else:
+                kinds.append((node.id, _name_kind(node.id)))
+        elif isinstance(node, astnodes.Index):
+            if node.notation == astnodes.IndexNotation.DOT:
+                fields.add(id(node.idx))
+        elif isinstance(node, astnodes.Invoke):
+            fields.add(id(node.func))
+        elif isinstance(node, astnodes.Method):
+            fields.add(id(node.name))
+        elif isinstance(node, astnodes.Field):
+            if not node.between_brackets:
+                fields.add(id(node.key))
+        elif isinstance(node, astnodes.Function):
+            if getattr(node.name, 'id', None) in CALLBACK_NAMES:
+                callbacks.add(id(node.name))
+        elif isinstance(node, astnodes.LocalFunction):
+            fields.add(id(node.name))   # a local, not the WatchMaker callback
+        elif isinstance(node, astnodes.Goto):
+            kinds.append((getattr(node.label, 'id', node.label), None))
+        elif isinstance(node, astnodes.Label):
+            kinds.append((getattr(node.id, 'id', node.id), None))
+    return kinds
+
+
+def chunk_semantic_spans(text: str, tree=None) -> List[SemanticSpan]:
+    """Semantic spans of one chunk of tag-preprocessed code.
+
+    Names are classified from the chunk's AST when one is given and its
+    names line up with the tokens; otherwise from the token stream.
+    """
+    tokens = [token for token in tokenize(text) if token.type != COMMENT]
+    kinds = None
+    if tree is not None:
+        kinds = _ast_name_kinds(tree)
+        names = [token.value for token in tokens if token.type == NAME]
+        if [name for name, _ in kinds] != names:
+            kinds = None    # e.g. syntax the AST does not keep names for
+    name_index = 0
+    spans = []
+    previous = None
+    for token in tokens:
+        if token.type == STRING:
+            spans.extend(_string_spans(token))
+        elif token.type == NAME:
+            if kinds is not None:
+                kind = kinds[name_index][1]
+                name_index += 1
+            elif _PLACEHOLDER_NAME_RE.match(token.value):
+                # A tag inside a string literal: the placeholder's quotes
+                # close and reopen the literal around its name
+                spans.append(SemanticSpan(token.start - 1, token.end + 1, TAG))
+                kind = None
+            else:
+                kind = _token_name_kind(token.value, previous)
+            if kind is not None:
+                spans.append(SemanticSpan(token.start, token.end, kind))
+        previous = token
+    return spans
+
+
+class SemanticHighlighter:
+    """Semantic spans of a document, computed per top-level chunk
+
+    Chunk ASTs come from LuaSyntaxChecker.parsed_chunks(), which reuses
+    the chunks the syntax check already parsed into the shared cache.
+    Spans are kept per chunk, so after an edit only the changed chunks
+    are classified again. Not thread-safe: use one per thread.
+    """
+
+    def __init__(self, checker: Optional[LuaSyntaxChecker] = None,
+                 max_entries: int = 4096):
+        self._checker = checker if checker is not None else LuaSyntaxChecker()
+        self.max_entries = max_entries
+        # (chunk key, has AST) -> chunk-relative spans
+        self._chunks: "OrderedDict[Tuple[str, bool], List[SemanticSpan]]" = OrderedDict()
+
+    def spans(self, code: str) -> List[SemanticSpan]:
+        """Semantic spans of code, sorted by position"""
+        checker = self._checker
+        # Chunks too large to parse quickly on this thread keep token spans
+        # until the syntax check has parsed them
+        parsed = checker.parsed_chunks(code, checker.process_chunk_chars)
+        spans = []
+        for item in parsed:
+            key = (item.key, item.ast is not None)
+            chunk_spans = self._chunks.get(key)
+            if chunk_spans is None:
+                chunk_spans = chunk_semantic_spans(item.chunk.text, item.ast)
+                self._chunks[key] = chunk_spans
+                while len(self._chunks) > self.max_entries:
+                    self._chunks.popitem(last=False)
+            else:
+                self._chunks.move_to_end(key)
+            base = item.chunk.start
+            for span in chunk_spans:
+                spans.append(SemanticSpan(checker.original_offset(base + span.start),
+                                          checker.original_offset(base + span.end),
+                                          span.kind))
+        return spans
+
+
+def _is_assignment_target(tokens, index: int, count: int) -> bool:
+    """Whether the name at index is assigned: ``name =`` or ``name, other =``"""
+    index += 1
+    while (index + 1 < count and tokens[index].value == ','
+           and tokens[index + 1].type == NAME):
+        index += 2
+    return index < count and tokens[index].value == '='
+
+
+class SymbolIndex:
+    """Incremental symbol index over named Lua sources
+
+    ``update`` rescans a single source (skipped when its code did not
+    change) and patches the per-name tables; ``submit`` does the same on
+    a background thread, keeping only the latest code per source. All
+    queries are answered from the tables under a lock.
+    """
+
+    def __init__(self, builtins: Iterable[str] = BUILTIN_GLOBALS):
+        self._builtins = frozenset(builtins)
+        self._lock = threading.RLock()
+        self._codes: Dict[str, int] = {}                    # source -> hash of code
+        self._by_source: Dict[str, List[Symbol]] = {}       # sorted by position
+        self._by_name: Dict[str, Dict[str, List[Symbol]]] = {}
+        self._definition_counts: Dict[str, int] = {}
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Optional[str]] = {}        # None removes the source
+        self._busy = False
+        self._stopped = False
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Updating
+    # ------------------------------------------------------------------
+
+    def update(self, source: str, code: str) -> bool:
+        """Rescan one source, return False if its code is unchanged"""
+        code_hash = hash(code)
+        with self._lock:
+            if self._codes.get(source) == code_hash:
+                return False
+        symbols = extract_symbols(code, source)
+        with self._lock:
+            self._remove(source)
+            self._codes[source] = code_hash
+            self._by_source[source] = symbols
+            for symbol in symbols:
+                self._by_name.setdefault(symbol.name, {}).setdefault(source, []).append(symbol)
+                if symbol.definition:
+                    self._definition_counts[symbol.name] = \
+                        self._definition_counts.get(symbol.name, 0) + 1
+        return True
+
+    def remove(self, source: str):
+        with self._lock:
+            self._remove(source)
+
+    def remove_prefix(self, prefix: str):
+        """Remove every source whose id starts with prefix"""
+        with self._cond:
+            for source in [s for s in self._pending if s.startswith(prefix)]:
+                del self._pending[source]
+        with self._lock:
+            for source in [s for s in self._by_source if s.startswith(prefix)]:
+                self._remove(source)
+
+    def _remove(self, source: str):
+        symbols = self._by_source.pop(source, None)
+        self._codes.pop(source, None)
+        if not symbols:
+            return
+        for name in {symbol.name for symbol in symbols}:
+            sources = self._by_name.get(name)
+            if sources is None:
+                continue
+            removed = sources.pop(source, ())
+            definitions = sum(1 for symbol in removed if symbol.definition)
+            if definitions:
+                remaining = self._definition_counts[name] - definitions
+                if remaining:
+                    self._definition_counts[name] = remaining
+                else:
+                    del self._definition_counts[name]
+            if not sources:
+                del self._by_name[name]
+
+    def submit(self, source: str, code: Optional[str]):
+        """Update (or remove, when code is None) a source in the background"""
+        with self._cond:
+            if self._stopped:
+                return
+            self._pending[source] = code
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="lua-symbol-index", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until all submitted updates are applied"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._busy, timeout)
+
+    def close(self):
+        """Stop the background thread"""
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                source, code = next(iter(self._pending.items()))
+                del self._pending[source]
+                self._busy = True
+            try:
+                if code is None:
+                    self.remove(source)
+                else:
+                    self.update(source, code)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def sources(self) -> List[str]:
+        with self._lock:
+            return list(self._by_source)
+
+    def names(self, category: Optional[str] = None) -> List[str]:
+        with self._lock:
+            names = sorted(self._by_name)
+        if category is not None:
+            names = [name for name in names if symbol_category(name) == category]
+        return names
+
+    def _occurrences(self, name: str, definition: bool) -> List[Symbol]:
+        with self._lock:
+            sources = self._by_name.get(name, {})
+            return [symbol for source in sorted(sources) for symbol in sources[source]
+                    if symbol.definition == definition]
+
+    def definitions(self, name: str) -> List[Symbol]:
+        """Where name is assigned or defined as a function"""
+        return self._occurrences(name, True)
+
+    def usages(self, name: str) -> List[Symbol]:
+        """Where name is read"""
+        return self._occurrences(name, False)
+
+    def is_defined(self, name: str, exclude_source: Optional[str] = None) -> bool:
+        """Whether name is a builtin or defined in any (other) source"""
+        with self._lock:
+            if name in self._builtins:
+                return True
+            count = self._definition_counts.get(name, 0)
+            if count and exclude_source is not None:
+                own = self._by_name[name].get(exclude_source, ())
+                count -= sum(1 for symbol in own if symbol.definition)
+            return count > 0
+
+    def symbol_at(self, source: str, line: int, column: int) -> Optional[Symbol]:
+        """The symbol covering (line, column) in a source"""
+        with self._lock:
+            symbols = self._by_source.get(source, [])
+            keys = [(symbol.line, symbol.column) for symbol in symbols]
+        index = bisect_right(keys, (line, column)) - 1
+        if index >= 0:
+            symbol = symbols[index]
+            if symbol.line == line and column <= symbol.column + len(symbol.name):
+                return symbol
+        return None
+
+    def undefined(self, source: Optional[str] = None) -> List[Symbol]:
+        """Usages of names that are not defined anywhere in the workspace"""
+        with self._lock:
+            sources = [source] if source is not None else sorted(self._by_source)
+            return [symbol for s in sources for symbol in self._by_source.get(s, [])
+                    if not symbol.definition
+                    and symbol.name not in self._builtins
+                    and symbol.name not in self._definition_counts]
+
+
+def build_index(sources: Iterable[Tuple[str, str]]) -> SymbolIndex:
+    """Index (source, code) pairs synchronously"""
+    index = SymbolIndex()
+    for source, code in sources:
+        index.update(source, code)
+    return index
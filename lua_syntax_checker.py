@@ -4,10 +4,24 @@ Provides AST-based syntax validation for Lua scripts with
 WatchMaker-specific API validation.
 """
 
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import List, Optional, Dict, Any, NamedTuple
 from enum import Enum
+import hashlib
+import json
+import os
+import queue
 import re
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect_right
+
+from lua_tokenizer import (
+    tokenize, resplit_chunks, LuaChunk, LuaToken, LineIndex, COMMENT, KEYWORD, OPERATOR,
+)
 
 
 class ErrorSeverity(Enum):
@@ -45,6 +59,484 @@ ERROR_MESSAGES = {
     "W010": "wm_schedule requires a table argument",
 }
 
+# Bracket pairs for the fallback checker
+_BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}'}
+_CLOSING_BRACKETS = {close: open_ for open_, close in _BRACKET_PAIRS.items()}
+
+
+class CacheEntry(NamedTuple):
+    """Cached result for one piece of preprocessed code"""
+    errors: List[LuaSyntaxError]  # positions relative to the cached code
+    ast: Any = None               # luaparser AST, None if parsing failed
+
+
+class ParsedChunk(NamedTuple):
+    """A top-level chunk of preprocessed code and its luaparser AST"""
+    chunk: LuaChunk
+    key: str                      # shared diagnostics cache key of chunk.text
+    ast: Any = None               # None if the chunk did not parse or was not parsed
+
+
+class DiagnosticsCache:
+    """
+    Content-addressed diagnostics cache shared by all checkers.
+
+    Entries are keyed by a hash of the preprocessed code (plus a salt
+    describing the checker configuration) and evicted in LRU order once
+    max_entries is exceeded. When a cache directory is set, the
+    diagnostics of each entry are also written there as JSON so reopening
+    a watch face can reuse them without running luaparser again (ASTs
+    stay in memory only). The directory is kept under max_disk_bytes by
+    removing the least recently used files, and files older than
+    max_disk_age seconds are dropped.
+    """
+
+    # Bump when the on-disk entry layout changes
+    FORMAT_VERSION = 2
+
+    # Files written by this class, of any format version
+    _FILE_RE = re.compile(r'^[0-9a-f]{40}\.v\d+\.(?:json|pickle)$')
+
+    def __init__(self, max_entries: int = 2048, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 32 * 1024 * 1024,
+                 max_disk_age: float = 30 * 24 * 3600):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_age = max_disk_age
+        self.cache_dir = None
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        if cache_dir:
+            self.enable_disk(cache_dir)
+
+    @staticmethod
+    def make_salt(description: str) -> bytes:
+        """Digest a checker configuration once, for use with make_key"""
+        return hashlib.sha1(description.encode('utf-8')).digest()
+
+    @staticmethod
+    def make_key(code: str, salt: bytes = b"") -> str:
+        """Hash code (and a salt digest from make_salt) into a cache key"""
+        return hashlib.sha1(salt + code.encode('utf-8')).hexdigest()
+
+    def enable_disk(self, cache_dir: str):
+        """Persist entries under cache_dir (created if missing)"""
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        with self._disk_lock:
+            self._prune()
+
+    def disable_disk(self):
+        """Stop reading/writing the on-disk store"""
+        self.cache_dir = None
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry, falling back to the disk store"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        """Store an entry in memory and, if enabled, on disk"""
+        self._remember(key, entry)
+        self._store(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries (the disk store is kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.v{self.FORMAT_VERSION}.json")
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        path = self._disk_path(key)
+        if not path:
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_disk_age:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            errors = [_error_from_json(item) for item in data["errors"]]
+            # Refresh the file's age so eviction removes the least recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return CacheEntry(errors)
+
+    def _store(self, key: str, entry: CacheEntry):
+        path = self._disk_path(key)
+        if not path:
+            return
+        data = json.dumps({"errors": [_error_to_json(error) for error in entry.errors]})
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Failed to write diagnostics cache: {e}")
+            return
+        with self._disk_lock:
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune()
+
+    def _prune(self):
+        """Drop expired cache files, then the oldest until 3/4 of max_disk_bytes"""
+        cache_dir = self.cache_dir
+        if not cache_dir:
+            return
+        now = time.time()
+        files = []
+        try:
+            names = os.listdir(cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not self._FILE_RE.match(name):
+                continue
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+                if (now - stat.st_mtime > self.max_disk_age
+                        or not name.endswith(f".v{self.FORMAT_VERSION}.json")):
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        if total > self.max_disk_bytes:
+            files.sort()
+            target = self.max_disk_bytes * 3 // 4
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+        self._disk_bytes = total
+
+
+def _error_to_json(error: LuaSyntaxError) -> dict:
+    return {
+        "line": error.line,
+        "column": error.column,
+        "code": error.error_code,
+        "message": error.message,
+        "severity": error.severity.value,
+        "start_pos": error.start_pos,
+        "length": error.length,
+    }
+
+
+def _error_from_json(item: dict) -> LuaSyntaxError:
+    """Rebuild a cached diagnostic, raising on anything malformed"""
+    line, column = item["line"], item["column"]
+    start_pos, length = item.get("start_pos"), item.get("length")
+    if not all(isinstance(value, int) for value in (line, column)):
+        raise TypeError("line/column must be integers")
+    if not all(value is None or isinstance(value, int) for value in (start_pos, length)):
+        raise TypeError("start_pos/length must be integers")
+    if not isinstance(item["message"], str) or not isinstance(item["code"], str):
+        raise TypeError("message/code must be strings")
+    return LuaSyntaxError(
+        line=line, column=column, message=item["message"],
+        severity=ErrorSeverity(item["severity"]), error_code=item["code"],
+        start_pos=start_pos, length=length,
+    )
+
+
+class ParserError(NamedTuple):
+    """Syntax error reported by the ANTLR lexer/parser"""
+    line: int                 # 0-indexed line number
+    column: int               # 0-indexed column
+    message: str
+    token: Optional[str]      # offending token text, None for lexer errors
+    start_pos: Optional[int]  # character offset of the offending token
+    length: int               # length of the offending token
+
+
+_error_listener = None
+
+
+def _error_listener_class():
+    """Create (once) the ANTLR error listener that collects ParserErrors"""
+    global _error_listener
+    if _error_listener is None:
+        from antlr4 import Token
+        from antlr4.error.ErrorListener import ErrorListener
+
+        class CollectingErrorListener(ErrorListener):
+            """Records syntax errors instead of printing them"""
+
+            def __init__(self):
+                super().__init__()
+                self.errors: List[ParserError] = []
+
+            def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+                token = None
+                start_pos = None
+                length = 1
+                if offendingSymbol is not None:
+                    start_pos = offendingSymbol.start
+                    if offendingSymbol.type != Token.EOF:
+                        token = offendingSymbol.text
+                        length = max(1, offendingSymbol.stop - offendingSymbol.start + 1)
+                self.errors.append(ParserError(
+                    line=max(0, line - 1), column=max(0, column), message=msg,
+                    token=token, start_pos=start_pos, length=length
+                ))
+
+        _error_listener = CollectingErrorListener
+    return _error_listener
+
+
+# Cache shared by every LuaSyntaxChecker that is not given its own
+SHARED_DIAGNOSTICS_CACHE = DiagnosticsCache()
+
+
+def enable_disk_cache(cache_dir: str):
+    """Opt in to persisting the shared diagnostics cache under cache_dir"""
+    SHARED_DIAGNOSTICS_CACHE.enable_disk(cache_dir)
+
+
+# ============================================================================
+# Child process for oversized chunks
+# ============================================================================
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ChunkProcess:
+    """
+    A child Python process that checks single chunks.
+
+    Parsing a large chunk (e.g. a big data table) on a thread holds the
+    GIL for the whole parse and cannot be interrupted. In a child process
+    the caller only polls for the result, and terminate() really stops
+    work that is no longer wanted. Requests and results travel as JSON
+    lines; the process is started on first use and again after
+    terminate().
+    """
+
+    def __init__(self, config: dict):
+        self._config = config
+        self._process = None
+        self._results = None
+        self.broken = False     # the child could not be started or died
+
+    def submit(self, code: str):
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        # Large chunks fill the pipe until the child reads them, write off-thread
+        threading.Thread(
+            target=self._write, args=(self._process.stdin, json.dumps(code) + "\n"),
+            name="lua-chunk-process-writer", daemon=True
+        ).start()
+
+    def wait(self, timeout: float) -> Optional[List[LuaSyntaxError]]:
+        """Errors of the submitted chunk, None if not done within timeout"""
+        try:
+            line = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            raise ChildProcessError("chunk process exited")
+        return [_error_from_json(item) for item in json.loads(line)]
+
+    def terminate(self):
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _start(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_MODULE_DIR, env.get("PYTHONPATH")]))
+        self._process = subprocess.Popen(
+            [sys.executable, "-c", "import lua_syntax_checker; lua_syntax_checker.serve_chunk_requests()"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=env, encoding="utf-8", bufsize=1,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        self._process.stdin.write(json.dumps(self._config) + "\n")
+        self._results = queue.Queue()
+        threading.Thread(
+            target=self._read, args=(self._process.stdout, self._results),
+            name="lua-chunk-process-reader", daemon=True
+        ).start()
+
+    @staticmethod
+    def _write(stream, data):
+        try:
+            stream.write(data)
+            stream.flush()
+        except (OSError, ValueError):
+            pass    # killed; the reader reports it
+
+    @staticmethod
+    def _read(stream, results):
+        try:
+            for line in stream:
+                results.put(line)
+        except (OSError, ValueError):
+            pass
+        results.put(None)
+
+
+def serve_chunk_requests():
+    """Main loop of a ChunkProcess child: one JSON chunk in, its errors out"""
+    out = sys.stdout
+    sys.stdout = sys.stderr     # keep stray prints out of the result stream
+    config = json.loads(sys.stdin.readline())
+    checker = LuaSyntaxChecker(
+        watchmaker_api=dict.fromkeys(config["api"]),
+        watchmaker_actions=config["actions"],
+        easing_functions=config["easing"],
+    )
+    checker._check_parser_available()
+    for line in sys.stdin:
+        errors = checker._check_chunk(json.loads(line))
+        out.write(json.dumps([_error_to_json(error) for error in errors]) + "\n")
+        out.flush()
+
+
+# ============================================================================
+# Parser loading and prewarm (shared by all checkers)
+# ============================================================================
+
+# Representative snippet run through the parser to build ANTLR's DFA caches
+_PREWARM_CODE = """
+local t = {1, 2, x = "a" .. [[b]]}
+function on_second(h, m, s)
+    if s % 2 == 0 and t.x ~= nil then
+        wm_schedule { action = 'tween', tween = 'x', from = 0, to = 1, duration = 1, easing = outQuad }
+    end
+    for i = 1, #t do t[i] = t[i] + 1 end
+    wm_action('m_task:x')
+end
+"""
+
+_parser_lock = threading.Lock()     # held while loading/warming the parser
+_prewarm_lock = threading.Lock()
+_parser_status = None   # (available, version) once loaded
+_prewarm_thread = None
+
+
+def _load_parser():
+    """Import luaparser and the ANTLR runtime once and warm them up"""
+    global _parser_status
+    with _parser_lock:
+        if _parser_status is not None:
+            return
+        try:
+            import luaparser
+            from luaparser import ast  # noqa: F401
+        except ImportError:
+            _parser_status = (False, "none")
+            return
+
+        version = getattr(luaparser, '__version__', 'unknown')
+        try:
+            warm_checker = LuaSyntaxChecker(cache=DiagnosticsCache(max_entries=1))
+            warm_checker._parser_available = True
+            warm_checker._do_full_check(_PREWARM_CODE)
+        except Exception:
+            pass  # Warming is best effort; real checks report problems
+        _parser_status = (True, version)
+
+
+def prewarm_parser():
+    """
+    Start loading luaparser/ANTLR on a background thread.
+
+    Call once the UI is up; checks that start before loading finishes
+    wait for it instead of importing a second time.
+    """
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _parser_status is not None or _prewarm_thread is not None:
+            return
+        _prewarm_thread = threading.Thread(
+            target=_load_parser, name="lua-parser-prewarm", daemon=True
+        )
+        _prewarm_thread.start()
+
+
+def parser_status():
+    """(available, version) of luaparser, loading it on first use"""
+    if _parser_status is None:
+        _load_parser()
+    return _parser_status
+
+
+# Attribute expressions are checked as "return (<expr>\n)"
+EXPRESSION_PREFIX = "return ("
+
+
+def wrap_expression(expression: str) -> str:
+    """Turn an attribute expression into a chunk the parser accepts"""
+    return f"{EXPRESSION_PREFIX}{expression}\n)"
+
+
+def unwrap_expression_errors(errors: List[LuaSyntaxError], expression: str) -> List[LuaSyntaxError]:
+    """Map errors found in wrap_expression(expression) back onto expression.
+
+    Errors the parser reports twice at the same spot (an unfinished
+    expression and the wrapper's closing parenthesis both land on its
+    end) are kept once per (line, column, code).
+    """
+    prefix = len(EXPRESSION_PREFIX)
+    last_line = expression.count('\n')
+    end_column = len(expression) - expression.rfind('\n') - 1
+    result = []
+    seen = set()
+    for error in errors:
+        line, column = error.line, error.column
+        if line > last_line:
+            # Errors on the closing parenthesis belong to the end of the expression
+            line, column = last_line, end_column
+        elif line == 0:
+            column = max(0, column - prefix)
+        start_pos, length = error.start_pos, error.length
+        if start_pos is not None:
+            start_pos = min(max(0, start_pos - prefix), max(0, len(expression) - 1))
+            if length:
+                length = max(1, min(length, len(expression) - start_pos))
+        if (line, column, error.error_code) in seen:
+            continue
+        seen.add((line, column, error.error_code))
+        result.append(replace(error, line=line, column=column,
+                              start_pos=start_pos, length=length))
+    return result
+
 
 class LuaSyntaxChecker:
     """Main syntax checker class using luaparser"""
@@ -54,36 +546,95 @@ class LuaSyntaxChecker:
         'on_hour', 'on_minute', 'on_second', 'on_millisecond',
         'on_display_bright', 'on_display_not_bright'
     ]
+    _CALLBACK_NAMES = frozenset(VALID_CALLBACKS)
+
+    # Semantic rules: AST node class name -> checker methods run on it.
+    # All rules share a single walk over the AST.
+    SEMANTIC_RULES = {
+        'Call': ('_check_function_call',),
+        'Function': ('_check_function_definition',),
+        'LocalFunction': ('_check_function_definition',),
+    }
+
+    # Extra validation for specific WatchMaker calls: name -> checker method
+    CALL_RULES = {
+        'wm_schedule': '_validate_wm_schedule',
+        'wm_action': '_validate_wm_action',
+    }
 
     # WatchMaker tag pattern: {tag_name}
     TAG_PATTERN = re.compile(r'\{([a-zA-Z0-9_]+)\}')
 
     def __init__(self, watchmaker_api: Dict[str, Any] = None,
                  watchmaker_actions: List[str] = None,
-                 easing_functions: List[str] = None):
+                 easing_functions: List[str] = None,
+                 cache: Optional[DiagnosticsCache] = None):
         self.watchmaker_api = watchmaker_api or {}
         self.watchmaker_actions = watchmaker_actions or []
         self.easing_functions = easing_functions or []
-        self._parser_available = self._check_parser_available()
+
+        # Frozen lookup tables for the semantic rules
+        self._api_names = frozenset(self.watchmaker_api)
+        self._action_names = frozenset(self.watchmaker_actions)
+        # Actions ending with ':' accept any suffix (e.g. 'm_task:something')
+        self._action_prefixes = tuple(
+            a.rstrip(':') for a in self.watchmaker_actions if a.endswith(':')
+        )
+        self._easing_names = frozenset(self.easing_functions)
+        self._semantic_dispatch = None  # node class -> bound rule methods
+
+        self._parser_available = None  # resolved on first check
         self._last_ast = None
         self._fallback_warned = False
+        self._tokens_code = None
+        self._tokens = []
+        self._chunks_code = ""   # preprocessed code last split into chunks
+        self._chunks = []
+
+        # Position mapping for the code being checked
+        self._checked_code = ""
+        self._line_index = LineIndex("")
+        self._tag_spans = []     # (preprocessed start, preprocessed end, original start, original end)
+        self._tag_starts = []    # preprocessed starts, for bisect
 
         # Cache for performance
         self._cache_code = None
         self._cache_errors = None
 
+        # Shared chunk cache; the salt keeps results of checkers with
+        # different API tables or parser modes apart
+        self._shared_cache = cache if cache is not None else SHARED_DIAGNOSTICS_CACHE
+        self._cache_salt = None
+
+        # Chunks longer than this are parsed in a ChunkProcess when checking
+        # with a time budget, so a stale check can be stopped mid-parse
+        self.process_chunk_chars = 8000
+        self._chunk_process = None
+
+    def _make_cache_salt(self, parser_version: str) -> bytes:
+        """Digest of everything besides the code that affects diagnostics"""
+        return DiagnosticsCache.make_salt(repr((
+            parser_version,
+            sorted(self._api_names),
+            sorted(self._action_names),
+            sorted(self._easing_names),
+        )))
+
     def _check_parser_available(self) -> bool:
-        """Check if luaparser is installed"""
-        try:
-            from luaparser import ast
-            return True
-        except ImportError:
-            return False
+        """Check if luaparser is installed (shared, loaded only once)"""
+        if self._cache_salt is None:
+            available, version = parser_status()
+            if self._parser_available is None:
+                self._parser_available = available
+            if not self._parser_available:
+                version = "none"
+            self._cache_salt = self._make_cache_salt(version)
+        return self._parser_available
 
     @property
     def parser_available(self) -> bool:
         """Public property to check parser availability"""
-        return self._parser_available
+        return self._check_parser_available()
 
     def _preprocess_tags(self, code: str) -> str:
         """
@@ -91,12 +642,56 @@ class LuaSyntaxChecker:
         This allows the Lua parser to handle the code without syntax errors.
         Example: {dd} becomes "__wm_tag_dd__"
         """
-        def replace_tag(match):
-            tag_name = match.group(1)
-            # Replace with a valid Lua string literal that won't cause syntax errors
-            return f'"__wm_tag_{tag_name}__"'
+        parts = []
+        spans = []
+        last = 0
+        shift = 0  # preprocessed offset minus original offset
 
-        return self.TAG_PATTERN.sub(replace_tag, code)
+        for match in self.TAG_PATTERN.finditer(code):
+            # Replace with a valid Lua string literal that won't cause syntax errors
+            placeholder = f'"__wm_tag_{match.group(1)}__"'
+            parts.append(code[last:match.start()])
+            parts.append(placeholder)
+            pre_start = match.start() + shift
+            spans.append((pre_start, pre_start + len(placeholder), match.start(), match.end()))
+            shift += len(placeholder) - (match.end() - match.start())
+            last = match.end()
+
+        self._tag_spans = spans
+        self._tag_starts = [span[0] for span in spans]
+        if not spans:
+            return code
+        parts.append(code[last:])
+        return ''.join(parts)
+
+    def _original_offset(self, offset: int) -> int:
+        """Map an offset in the preprocessed code back to the original code"""
+        index = bisect_right(self._tag_starts, offset) - 1
+        if index < 0:
+            return offset
+        pre_start, pre_end, orig_start, orig_end = self._tag_spans[index]
+        if offset < pre_end:
+            # Inside a placeholder: point at the tag itself
+            return orig_start + min(offset - pre_start, orig_end - orig_start - 1)
+        return offset - pre_end + orig_end
+
+    def _restore_error_positions(self, errors: List[LuaSyntaxError],
+                                 index: Optional[LineIndex]) -> List[LuaSyntaxError]:
+        """
+        Map error positions from the preprocessed code to the original code,
+        index is the LineIndex of the original code (None without tags)
+        """
+        if not self._tag_spans or index is None:
+            return errors
+        for error in errors:
+            if error.start_pos is None:
+                continue
+            end = error.start_pos + (error.length or 0)
+            error.start_pos = self._original_offset(error.start_pos)
+            if error.length:
+                error.length = max(1, self._original_offset(end) - error.start_pos)
+            error.line, error.column = index.position(error.start_pos)
+        return errors
 
     def _restore_tags_in_message(self, message: str) -> str:
         """
@@ -119,34 +714,248 @@ class LuaSyntaxChecker:
         Returns list of LuaSyntaxError objects, empty if no errors.
         Falls back to basic checking if parser unavailable.
         """
+        errors = []
+        for slice_errors, _ in self.check_progressive(code):
+            errors.extend(slice_errors)
+        return errors
+
+    def check_progressive(self, code: str, first_line: int = 0,
+                          last_line: Optional[int] = None,
+                          budget: Optional[float] = None):
+        """
+        Check code in slices, yielding (new_errors, done) after each one.
+
+        The code is split into top-level chunks (function definitions and
+        top-level statements). Chunks already present in the shared
+        diagnostics cache reuse their results; only new or edited chunks
+        go through luaparser. Chunks overlapping first_line..last_line
+        (e.g. the visible part of an editor) are checked and yielded
+        first; the rest follows in slices of about ``budget`` seconds, so
+        callers can publish partial results or stop between slices. With
+        no budget everything after the priority range is one slice.
+
+        With a budget, chunks longer than process_chunk_chars are parsed
+        in a child process; while it runs an (often empty) slice is
+        yielded every ``budget`` seconds, and closing the generator
+        terminates the child.
+        """
         if not code or not code.strip():
-            return []
+            yield [], True
+            return
 
         # Return cached result if code unchanged
         if code == self._cache_code and self._cache_errors is not None:
-            return self._cache_errors.copy()
+            yield self._cache_errors.copy(), True
+            return
 
         # Preprocess WatchMaker tags to avoid syntax errors
         preprocessed_code = self._preprocess_tags(code)
+        index = LineIndex(code) if self._tag_spans else None
+
+        if not self._check_parser_available():
+            # The fallback is a single linear token pass, one slice
+            errors = self._restore_error_positions(self._fallback_check(preprocessed_code), index)
+            self._cache_code = code
+            self._cache_errors = errors
+            yield errors, True
+            return
+
+        chunks = self._split_chunks(preprocessed_code)
+        order, priority_count = self._chunk_order(chunks, first_line, last_line)
+        results = [None] * len(chunks)
+        pending = []
+        slice_start = time.perf_counter()
+
+        for count, chunk_index in enumerate(order, 1):
+            chunk = chunks[chunk_index]
+            if budget is not None and len(chunk.text) > self.process_chunk_chars:
+                checking = self._check_large_chunk(chunk.text, budget)
+                try:
+                    for text_errors in checking:
+                        if text_errors is not None:
+                            break
+                        # Still parsing: let the caller publish or stop
+                        yield pending, False
+                        pending = []
+                        slice_start = time.perf_counter()
+                finally:
+                    checking.close()
+            else:
+                text_errors = self._check_chunk(chunk.text)
+            chunk_errors = [self._offset_error(error, chunk) for error in text_errors]
+            results[chunk_index] = self._restore_error_positions(chunk_errors, index)
+            pending.extend(chunk_errors)
+
+            if count == len(order):
+                break
+            if count == priority_count or (
+                    budget is not None and time.perf_counter() - slice_start >= budget):
+                yield pending, False
+                pending = []
+                slice_start = time.perf_counter()
 
-        if not self._parser_available:
-            errors = self._basic_fallback_check(preprocessed_code)
-        else:
-            errors = self._do_full_check(preprocessed_code)
+        # Update cache
+        self._cache_code = code
+        self._cache_errors = [error for chunk_errors in results for error in chunk_errors]
+
+        yield pending, True
+
+    def _split_chunks(self, code: str) -> List[LuaChunk]:
+        """split_chunks(), re-splitting only the part of code edited since
+        the previous call"""
+        if code != self._chunks_code:
+            self._chunks = resplit_chunks(code, self._chunks_code, self._chunks)
+            self._chunks_code = code
+        return self._chunks
+
+    @staticmethod
+    def _chunk_order(chunks: List[LuaChunk], first_line: int,
+                     last_line: Optional[int]):
+        """Chunk indices with those overlapping the line range first"""
+        if last_line is None:
+            return list(range(len(chunks))), 0
+
+        priority = []
+        rest = []
+        for index, chunk in enumerate(chunks):
+            next_line = chunks[index + 1].line if index + 1 < len(chunks) else chunk.line + chunk.text.count('\n') + 1
+            if chunk.line <= last_line and next_line > first_line:
+                priority.append(index)
+            else:
+                rest.append(index)
+        return priority + rest, len(priority)
+
+    def _fallback_check(self, code: str) -> List[LuaSyntaxError]:
+        """Fallback check of preprocessed code through the shared cache"""
+        key = DiagnosticsCache.make_key(code, self._cache_salt)
+        entry = self._shared_cache.get(key)
+        if entry is not None:
+            return [replace(error) for error in entry.errors]
+
+        errors = self._basic_fallback_check(code)
 
         # Restore tag placeholders in error messages
         for error in errors:
             error.message = self._restore_tags_in_message(error.message)
+        self._shared_cache.put(key, CacheEntry([replace(error) for error in errors]))
+        return errors
 
-        # Update cache
-        self._cache_code = code
-        self._cache_errors = errors
+    def _check_chunk(self, text: str) -> List[LuaSyntaxError]:
+        """Full check of a single chunk, positions relative to the chunk"""
+        if not text.strip():
+            return []
 
+        key = DiagnosticsCache.make_key(text, self._cache_salt)
+        entry = self._shared_cache.get(key)
+        if entry is not None:
+            self._last_ast = entry.ast
+            return entry.errors
+
+        self._last_ast = None
+        errors = self._do_full_check(text)
+        for error in errors:
+            error.message = self._restore_tags_in_message(error.message)
+
+        self._shared_cache.put(key, CacheEntry(errors, self._last_ast))
         return errors
 
+    def _check_large_chunk(self, text: str, poll: float):
+        """
+        _check_chunk() in the ChunkProcess: yields None every poll seconds
+        while the child is parsing, then the errors. Closing the generator
+        before that kills the child.
+        """
+        key = DiagnosticsCache.make_key(text, self._cache_salt)
+        entry = self._shared_cache.get(key)
+        process = self._chunk_process
+        if entry is not None or (process is not None and process.broken):
+            yield self._check_chunk(text)
+            return
+
+        if process is None:
+            process = self._chunk_process = ChunkProcess({
+                "api": sorted(self._api_names),
+                "actions": list(self.watchmaker_actions),
+                "easing": list(self.easing_functions),
+            })
+        errors = None
+        try:
+            process.submit(text)
+            while errors is None:
+                errors = process.wait(poll)
+                if errors is None:
+                    yield None
+        except (OSError, ValueError, ChildProcessError):
+            # No usable child (e.g. a frozen build): parse on this thread,
+            # unless the caller stops at this slice (it may have closed us)
+            process.broken = True
+            process.terminate()
+            yield None
+            yield self._check_chunk(text)
+            return
+        finally:
+            if errors is None:
+                process.terminate()
+
+        # The AST stays in the child; only the diagnostics are cached here
+        self._last_ast = None
+        self._shared_cache.put(key, CacheEntry(errors))
+        yield errors
+
+    def parsed_chunks(self, code: str,
+                      max_parse_chars: Optional[int] = None) -> List[ParsedChunk]:
+        """
+        Top-level chunks of code with their luaparser ASTs, for editor
+        features that need more than tokens.
+
+        ASTs are taken from the shared diagnostics cache, so chunks the
+        syntax check already parsed are not parsed again. Other chunks are
+        checked (and cached) here, except those longer than
+        max_parse_chars, which get no AST. Chunk offsets are in the
+        tag-preprocessed code; map them back with original_offset().
+        """
+        preprocessed_code = self._preprocess_tags(code)
+        parser_available = self._check_parser_available()
+        parsed = []
+        for chunk in self._split_chunks(preprocessed_code):
+            key = DiagnosticsCache.make_key(chunk.text, self._cache_salt)
+            ast = None
+            if parser_available and chunk.text.strip():
+                entry = self._shared_cache.get(key)
+                if entry is not None:
+                    ast = entry.ast
+                elif max_parse_chars is None or len(chunk.text) <= max_parse_chars:
+                    self._check_chunk(chunk.text)
+                    ast = self._last_ast
+            parsed.append(ParsedChunk(chunk, key, ast))
+        return parsed
+
+    def original_offset(self, offset: int) -> int:
+        """Map an offset in the last preprocessed code (see parsed_chunks)
+        back to the original code"""
+        return self._original_offset(offset)
+
+    def close(self):
+        """Stop the chunk process, if one was started"""
+        if self._chunk_process is not None:
+            self._chunk_process.terminate()
+
+    @staticmethod
+    def _offset_error(error: LuaSyntaxError, chunk: LuaChunk) -> LuaSyntaxError:
+        """Map a chunk-relative error to a position in the full code"""
+        if chunk.start == 0:
+            return replace(error)
+        return replace(
+            error,
+            line=error.line + chunk.line,
+            start_pos=error.start_pos + chunk.start if error.start_pos is not None else None
+        )
+
     def _do_full_check(self, code: str) -> List[LuaSyntaxError]:
         """Perform full parser-based check"""
         errors = []
+        self._checked_code = code
+        self._line_index = LineIndex(code)
 
         try:
             # Phase 1: Parse syntax
@@ -174,127 +983,87 @@ class LuaSyntaxChecker:
 
     def _parse_syntax(self, code: str) -> List[LuaSyntaxError]:
         """Parse Lua code and extract syntax errors"""
-        import sys
-        import io
-        from luaparser import ast
-        from luaparser.ast import SyntaxException
+        try:
+            from antlr4 import InputStream, CommonTokenStream, Token
+            from luaparser.parser.LuaLexer import LuaLexer
+            from luaparser.parser.LuaParser import LuaParser
+            from luaparser.builder import BuilderVisitor
+        except ImportError:
+            # luaparser without the ANTLR pipeline: rely on the exception only
+            return self._parse_syntax_simple(code)
 
-        errors = []
+        self._last_ast = None
 
-        # Capture luaparser's stdout/stderr output (contains detailed error info)
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        captured_stdout = io.StringIO()
-        captured_stderr = io.StringIO()
-        sys.stdout = captured_stdout
-        sys.stderr = captured_stderr
+        # Collect errors through a listener instead of the console, so
+        # checks on different threads never touch sys.stdout/sys.stderr
+        listener = _error_listener_class()()
 
-        try:
-            tree = ast.parse(code)
-            self._last_ast = tree  # Cache for semantic analysis
+        lexer = LuaLexer(InputStream(code))
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(listener)
 
-        except SyntaxException as e:
-            # Get captured stderr which contains ANTLR error messages
-            stderr_output = captured_stderr.getvalue()
-            stdout_output = captured_stdout.getvalue()
+        token_stream = CommonTokenStream(lexer, channel=Token.DEFAULT_CHANNEL)
+        parser = LuaParser(token_stream)
+        parser.removeErrorListeners()
+        parser.addErrorListener(listener)
 
-            # Parse ANTLR error messages from stderr
-            parsed_errors = self._parse_antlr_errors(stderr_output + stdout_output, code)
+        try:
+            tree = parser.start_()
+            if not listener.errors and parser.getNumberOfSyntaxErrors() == 0:
+                self._last_ast = BuilderVisitor(token_stream).visit(tree)  # Cache for semantic analysis
+                return []
+        except Exception as e:
+            if not listener.errors:
+                return [self._parse_generic_exception(e, code)]
 
-            if parsed_errors:
-                errors.extend(parsed_errors)
-            else:
-                # Fallback to exception message parsing
-                error = self._parse_syntax_exception(e, code)
-                errors.append(error)
+        return self._convert_parser_errors(listener.errors, code)
 
-            self._last_ast = None
+    def _parse_syntax_simple(self, code: str) -> List[LuaSyntaxError]:
+        """Parse with luaparser.ast.parse and report its exception"""
+        from luaparser import ast
+        from luaparser.ast import SyntaxException
 
+        try:
+            self._last_ast = ast.parse(code)  # Cache for semantic analysis
+            return []
+        except SyntaxException as e:
+            self._last_ast = None
+            return [self._parse_syntax_exception(e, code)]
         except Exception as e:
-            # Try to extract line info from exception message
-            error = self._parse_generic_exception(e, code)
-            errors.append(error)
             self._last_ast = None
+            return [self._parse_generic_exception(e, code)]
 
-        finally:
-            # Restore stdout/stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-
-        return errors
-
-    def _parse_antlr_errors(self, output: str, code: str) -> List[LuaSyntaxError]:
-        """Parse ANTLR error messages from luaparser output"""
+    def _convert_parser_errors(self, parser_errors: List["ParserError"],
+                               code: str) -> List[LuaSyntaxError]:
+        """Convert structured ANTLR errors into LuaSyntaxError objects"""
         errors = []
         seen_errors = set()  # Avoid duplicate errors
-        code_lines = code.split('\n')
-
-        # ANTLR error format: "line X:Y message"
-        # Example: "line 4:0 missing 'end' at '<EOF>'"
-        pattern = re.compile(r'line\s+(\d+):(\d+)\s+(.+?)(?=line\s+\d+:|\Z)', re.DOTALL)
-
-        for match in pattern.finditer(output):
-            reported_line = int(match.group(1)) - 1  # Convert to 0-indexed
-            column = int(match.group(2))
-            raw_message = match.group(3).strip().replace('\n', ' ').strip()
-
-            # Extract the problematic token from error message
-            # Format: "no viable alternative at input 'token'" or with escaped newline
-            error_token = None
-
-            # Try to match token with possible escaped newline
-            token_match = re.search(r"at input\s+'([^']*)'", raw_message)
-            if token_match:
-                token_content = token_match.group(1)
-                # Handle escaped newline in token - take first part
-                if '\\n' in token_content:
-                    error_token = token_content.split('\\n')[0].strip()
-                else:
-                    error_token = token_content.strip()
-            else:
-                token_match = re.search(r"mismatched input\s+'([^']*)'", raw_message)
-                if token_match:
-                    error_token = token_match.group(1).strip()
-
-            # Find actual line by searching for the error token in code
-            actual_line = reported_line
-
-            if error_token:
-                # Search backwards from reported line to find the token
-                for search_line in range(min(reported_line, len(code_lines) - 1), -1, -1):
-                    if search_line < len(code_lines):
-                        token_pos = code_lines[search_line].find(error_token)
-                        if token_pos >= 0:
-                            actual_line = search_line
-                            column = token_pos
-                            break
 
-            # Clean up message for display
-            clean_message = raw_message
-            # Remove escaped newlines and content after them in quoted strings
-            clean_message = re.sub(r"'([^']*?)\\n[^']*'", r"'\1'", clean_message)
+        for parser_error in parser_errors:
+            # Clean up message for display: drop escaped newlines and what
+            # follows them inside quoted input
+            clean_message = re.sub(r"'([^']*?)\\n[^']*'", r"'\1'", parser_error.message)
             clean_message = clean_message.replace('\\n', ' ').strip()
 
-            # Create unique key to avoid duplicates
-            error_key = (actual_line, clean_message)
+            error_key = (parser_error.line, clean_message)
             if error_key in seen_errors:
                 continue
             seen_errors.add(error_key)
 
-            # Calculate character position for highlighting
-            start_pos = sum(len(l) + 1 for l in code_lines[:max(0, actual_line)]) + column
-
-            # Determine highlight length
-            highlight_len = len(error_token) if error_token else 1
+            if parser_error.start_pos is not None:
+                start_pos = parser_error.start_pos
+            else:
+                # Lexer errors carry no token, locate them by line/column
+                start_pos = self._line_index.offset(parser_error.line, parser_error.column)
 
             errors.append(LuaSyntaxError(
-                line=max(0, actual_line),
-                column=max(0, column),
+                line=parser_error.line,
+                column=parser_error.column,
                 message=clean_message,
                 severity=ErrorSeverity.ERROR,
                 error_code="E001",
-                start_pos=start_pos,
-                length=max(1, highlight_len)
+                start_pos=min(start_pos, max(0, len(code) - 1)),
+                length=parser_error.length
             ))
 
         return errors
@@ -313,8 +1082,7 @@ class LuaSyntaxChecker:
             column = int(match.group(2)) if match.group(2) else 0
 
         # Calculate character position for highlighting
-        lines = code.split('\n')
-        start_pos = sum(len(l) + 1 for l in lines[:max(0, line)]) + column
+        start_pos = self._line_index.offset(line, column)
 
         # Clean up error message
         clean_msg = msg
@@ -350,64 +1118,66 @@ class LuaSyntaxChecker:
         )
 
     def _analyze_semantics(self, code: str) -> List[LuaSyntaxError]:
-        """Analyze AST for WatchMaker-specific issues"""
+        """
+        Analyze AST for WatchMaker-specific issues.
+
+        Walks the tree once and dispatches each node by its exact type to
+        the rules registered in SEMANTIC_RULES; other nodes cost a single
+        dict lookup.
+        """
         from luaparser import ast as luaast
-        from luaparser import astnodes
 
         errors = []
 
         if not self._last_ast:
             return errors
 
+        dispatch = self._get_semantic_dispatch()
         for node in luaast.walk(self._last_ast):
-            # Check function calls
-            if isinstance(node, astnodes.Call):
-                call_errors = self._check_function_call(node)
-                errors.extend(call_errors)
-
-            # Check function definitions (for callbacks)
-            if isinstance(node, (astnodes.Function, astnodes.LocalFunction)):
-                func_errors = self._check_function_definition(node)
-                errors.extend(func_errors)
+            rules = dispatch.get(type(node))
+            if rules:
+                for rule in rules:
+                    errors.extend(rule(node))
 
         return errors
 
+    def _get_semantic_dispatch(self) -> Dict[type, tuple]:
+        """Resolve SEMANTIC_RULES to node classes and bound methods once"""
+        if self._semantic_dispatch is None:
+            from luaparser import astnodes
+
+            self._semantic_dispatch = {
+                getattr(astnodes, node_name): tuple(getattr(self, name) for name in rule_names)
+                for node_name, rule_names in self.SEMANTIC_RULES.items()
+                if hasattr(astnodes, node_name)
+            }
+        return self._semantic_dispatch
+
     def _check_function_call(self, node) -> List[LuaSyntaxError]:
         """Check if function call is valid WatchMaker API"""
-        from luaparser import astnodes
-
         errors = []
         func_name = self._get_call_name(node)
 
         if not func_name:
             return errors
 
-        line = (node.line - 1) if hasattr(node, 'line') and node.line else 0
-
         # Check WatchMaker functions
         if func_name.startswith('wm_'):
-            if func_name not in self.watchmaker_api:
-                errors.append(LuaSyntaxError(
-                    line=line, column=0,
-                    message=ERROR_MESSAGES["W001"].format(func_name=func_name),
-                    severity=ErrorSeverity.WARNING,
-                    error_code="W001"
+            if func_name not in self._api_names:
+                errors.append(self._node_warning(
+                    node, ERROR_MESSAGES["W001"].format(func_name=func_name), "W001",
+                    name=func_name
                 ))
 
-            # Special validation for wm_schedule
-            if func_name == 'wm_schedule':
-                errors.extend(self._validate_wm_schedule(node))
-
-            # Special validation for wm_action
-            if func_name == 'wm_action':
-                errors.extend(self._validate_wm_action(node))
+            # Special validation for wm_schedule, wm_action, ...
+            rule = self.CALL_RULES.get(func_name)
+            if rule:
+                errors.extend(getattr(self, rule)(node))
 
         return errors
 
     def _check_function_definition(self, node) -> List[LuaSyntaxError]:
         """Check callback function definitions"""
-        from luaparser import astnodes
-
         errors = []
 
         # Get function name
@@ -421,19 +1191,16 @@ class LuaSyntaxChecker:
         if not func_name:
             return errors
 
-        line = (node.line - 1) if hasattr(node, 'line') and node.line else 0
-
         # Check callback functions
         if func_name.startswith('on_'):
-            if func_name not in self.VALID_CALLBACKS:
-                errors.append(LuaSyntaxError(
-                    line=line, column=0,
-                    message=ERROR_MESSAGES["W002"].format(
+            if func_name not in self._CALLBACK_NAMES:
+                errors.append(self._node_warning(
+                    node.name if hasattr(node.name, 'start_char') else node,
+                    ERROR_MESSAGES["W002"].format(
                         func_name=func_name,
                         valid_list=', '.join(self.VALID_CALLBACKS)
                     ),
-                    severity=ErrorSeverity.WARNING,
-                    error_code="W002"
+                    "W002"
                 ))
 
         return errors
@@ -443,7 +1210,6 @@ class LuaSyntaxChecker:
         from luaparser import astnodes
 
         errors = []
-        line = (node.line - 1) if hasattr(node, 'line') and node.line else 0
 
         # Check argument exists and is table
         if not hasattr(node, 'args') or not node.args:
@@ -456,12 +1222,7 @@ class LuaSyntaxChecker:
             return errors
 
         if not isinstance(arg, astnodes.Table):
-            errors.append(LuaSyntaxError(
-                line=line, column=0,
-                message=ERROR_MESSAGES["W010"],
-                severity=ErrorSeverity.WARNING,
-                error_code="W010"
-            ))
+            errors.append(self._node_warning(arg, ERROR_MESSAGES["W010"], "W010"))
             return errors
 
         # Extract table fields and check easing
@@ -472,13 +1233,10 @@ class LuaSyntaxChecker:
                     if key == 'easing' and hasattr(field, 'value'):
                         value = field.value
                         if hasattr(value, 's'):  # String value
-                            easing = value.s
-                            if self.easing_functions and easing not in self.easing_functions:
-                                errors.append(LuaSyntaxError(
-                                    line=line, column=0,
-                                    message=ERROR_MESSAGES["W004"].format(easing=easing),
-                                    severity=ErrorSeverity.WARNING,
-                                    error_code="W004"
+                            easing = self._string_value(value)
+                            if self._easing_names and easing not in self._easing_names:
+                                errors.append(self._node_warning(
+                                    value, ERROR_MESSAGES["W004"].format(easing=easing), "W004"
                                 ))
 
         return errors
@@ -488,7 +1246,6 @@ class LuaSyntaxChecker:
         from luaparser import astnodes
 
         errors = []
-        line = (node.line - 1) if hasattr(node, 'line') and node.line else 0
 
         if not hasattr(node, 'args') or not node.args:
             return errors
@@ -499,25 +1256,62 @@ class LuaSyntaxChecker:
         else:
             return errors
 
-        if isinstance(arg, astnodes.String) and self.watchmaker_actions:
-            action = arg.s
+        if isinstance(arg, astnodes.String) and self._action_names:
+            action = self._string_value(arg)
             # Check exact match or prefix match for actions ending with ':'
-            if action not in self.watchmaker_actions:
-                # Check prefix match (e.g., 'm_task:something')
-                prefix_match = any(
-                    action.startswith(a.rstrip(':'))
-                    for a in self.watchmaker_actions if a.endswith(':')
-                )
-                if not prefix_match:
-                    errors.append(LuaSyntaxError(
-                        line=line, column=0,
-                        message=ERROR_MESSAGES["W003"].format(action=action),
-                        severity=ErrorSeverity.WARNING,
-                        error_code="W003"
+            if action not in self._action_names:
+                if not action.startswith(self._action_prefixes):
+                    errors.append(self._node_warning(
+                        arg, ERROR_MESSAGES["W003"].format(action=action), "W003"
                     ))
 
         return errors
 
+    @staticmethod
+    def _string_value(node) -> str:
+        """Text of a String node (luaparser 3.x gives str, 4.x bytes)"""
+        value = node.s
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='replace')
+        return value
+
+    def _node_warning(self, node, message: str, error_code: str,
+                      name: Optional[str] = None) -> LuaSyntaxError:
+        """
+        Build a warning located at an AST node. Call nodes start at their
+        argument list, pass the called name to highlight it instead.
+        """
+        start = getattr(node, 'start_char', None)
+        stop = getattr(node, 'stop_char', None)
+        if start is not None and name:
+            name_end = start
+            while name_end > 0 and self._checked_code[name_end - 1].isspace():
+                name_end -= 1
+            if self._checked_code.endswith(name, 0, name_end):
+                start, stop = name_end - len(name), name_end - 1
+        if start is None:
+            line = (node.line - 1) if getattr(node, 'line', None) else 0
+            return LuaSyntaxError(
+                line=line, column=0,
+                message=message,
+                severity=ErrorSeverity.WARNING,
+                error_code=error_code
+            )
+
+        line, column = self._line_index.position(start)
+        if stop is None or stop < start:
+            stop = start
+        # Keep the highlight on the first line of the node
+        stop = min(stop, self._line_index.line_end(line) - 1)
+        return LuaSyntaxError(
+            line=line, column=column,
+            message=message,
+            severity=ErrorSeverity.WARNING,
+            error_code=error_code,
+            start_pos=start,
+            length=max(1, stop - start + 1)
+        )
+
     def _get_call_name(self, node) -> Optional[str]:
         """Extract function name from Call node"""
         from luaparser import astnodes
@@ -532,162 +1326,106 @@ class LuaSyntaxChecker:
                     return func.idx.id
         return None
 
+    def tokens(self, code: str) -> List[LuaToken]:
+        """
+        Token stream for code, shared by the fallback checker and editor
+        features (formatting, highlighting). The last result is reused
+        while the code is unchanged.
+        """
+        if code != self._tokens_code:
+            self._tokens = tokenize(code)
+            self._tokens_code = code
+        return self._tokens
+
     def _basic_fallback_check(self, code: str) -> List[LuaSyntaxError]:
-        """Fallback to basic regex-based checking when parser unavailable"""
+        """
+        Fallback check when the parser is unavailable.
+
+        Walks the token stream once, reporting unterminated strings and
+        comments, unexpected symbols, mismatched brackets and unpaired
+        block keywords in linear time.
+        """
         if not self._fallback_warned:
             self._fallback_warned = True
             print("Warning: luaparser not installed, using basic syntax check")
 
         errors = []
-        lines = code.split('\n')
-
-        # Track block pairing
-        block_stack = []
-        block_keywords = {
-            'function': 'end', 'if': 'end', 'for': 'end',
-            'while': 'end', 'do': 'end', 'repeat': 'until',
-        }
-
-        # Track brackets across all lines
-        paren_balance = 0
-        bracket_balance = 0
-        brace_balance = 0
-        paren_open_line = -1
-        bracket_open_line = -1
-        brace_open_line = -1
-
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-
-            if stripped.startswith('--') or not stripped:
-                continue
+        block_stack = []     # [keyword, opening token, waiting for 'do']
+        bracket_stack = []   # opening bracket tokens
+        open_brackets = dict.fromkeys(_BRACKET_PAIRS, 0)
 
-            clean_line = self._remove_strings_fallback(stripped)
-
-            # Check block start
-            for keyword in block_keywords:
-                if (clean_line.startswith(keyword + ' ') or
-                    clean_line.startswith(keyword + '(') or
-                    clean_line == keyword):
-                    block_stack.append((keyword, i))
-                    break
-
-            # Check block end
-            if (clean_line == 'end' or clean_line.startswith('end ') or
-                clean_line.startswith('end)') or clean_line.startswith('end,')):
-                if block_stack:
-                    block_stack.pop()
-                else:
-                    errors.append(LuaSyntaxError(
-                        line=i, column=0,
-                        message="Unexpected 'end'",
-                        severity=ErrorSeverity.ERROR,
-                        error_code="E003"
-                    ))
+        for token in self.tokens(code):
+            if token.error:
+                errors.append(self._token_error(token, f"Syntax error: {token.error}", "E001"))
+                continue
+            if token.type == COMMENT:
+                continue
 
-            # Check until
-            if clean_line.startswith('until ') or clean_line == 'until':
-                if block_stack and block_stack[-1][0] == 'repeat':
-                    block_stack.pop()
-
-            # Track brackets
-            for char in clean_line:
-                if char == '(':
-                    if paren_balance == 0:
-                        paren_open_line = i
-                    paren_balance += 1
-                elif char == ')':
-                    paren_balance -= 1
-                    if paren_balance < 0:
-                        errors.append(LuaSyntaxError(
-                            line=i, column=0,
-                            message="Unmatched ')'",
-                            severity=ErrorSeverity.ERROR,
-                            error_code="E004"
-                        ))
-                        paren_balance = 0
-                elif char == '[':
-                    if bracket_balance == 0:
-                        bracket_open_line = i
-                    bracket_balance += 1
-                elif char == ']':
-                    bracket_balance -= 1
-                    if bracket_balance < 0:
-                        errors.append(LuaSyntaxError(
-                            line=i, column=0,
-                            message="Unmatched ']'",
-                            severity=ErrorSeverity.ERROR,
-                            error_code="E004"
-                        ))
-                        bracket_balance = 0
-                elif char == '{':
-                    if brace_balance == 0:
-                        brace_open_line = i
-                    brace_balance += 1
-                elif char == '}':
-                    brace_balance -= 1
-                    if brace_balance < 0:
-                        errors.append(LuaSyntaxError(
-                            line=i, column=0,
-                            message="Unmatched '}'",
-                            severity=ErrorSeverity.ERROR,
-                            error_code="E004"
-                        ))
-                        brace_balance = 0
+            value = token.value
+            if token.type == KEYWORD:
+                if value in ('function', 'if', 'repeat'):
+                    block_stack.append([value, token, False])
+                elif value in ('for', 'while'):
+                    block_stack.append([value, token, True])
+                elif value == 'do':
+                    if block_stack and block_stack[-1][2]:
+                        block_stack[-1][2] = False
+                    else:
+                        block_stack.append([value, token, False])
+                elif value == 'end':
+                    if block_stack and block_stack[-1][0] != 'repeat':
+                        block_stack.pop()
+                    else:
+                        errors.append(self._token_error(token, "Unexpected 'end'", "E003"))
+                elif value == 'until':
+                    if block_stack and block_stack[-1][0] == 'repeat':
+                        block_stack.pop()
+                    else:
+                        errors.append(self._token_error(token, "Unexpected 'until'", "E003"))
+            elif token.type == OPERATOR:
+                if value in _BRACKET_PAIRS:
+                    bracket_stack.append(token)
+                    open_brackets[value] += 1
+                elif value in _CLOSING_BRACKETS:
+                    opening = _CLOSING_BRACKETS[value]
+                    if not open_brackets[opening]:
+                        errors.append(self._token_error(token, f"Unmatched '{value}'", "E004"))
+                        continue
+                    # Brackets opened after the matching one were never closed
+                    while bracket_stack[-1].value != opening:
+                        inner = bracket_stack.pop()
+                        open_brackets[inner.value] -= 1
+                        errors.append(self._token_error(inner, f"Unclosed '{inner.value}'", "E004"))
+                    bracket_stack.pop()
+                    open_brackets[opening] -= 1
 
         # Report unclosed blocks
-        for keyword, line_num in block_stack:
-            errors.append(LuaSyntaxError(
-                line=line_num, column=0,
-                message=ERROR_MESSAGES["E003"].format(keyword=keyword, start_line=line_num + 1),
-                severity=ErrorSeverity.ERROR,
-                error_code="E003"
+        for keyword, opener, _ in block_stack:
+            errors.append(self._token_error(
+                opener,
+                ERROR_MESSAGES["E003"].format(keyword=keyword, start_line=opener.line + 1),
+                "E003"
             ))
 
         # Report unclosed brackets
-        if paren_balance > 0:
-            errors.append(LuaSyntaxError(
-                line=paren_open_line, column=0,
-                message="Unclosed '('",
-                severity=ErrorSeverity.ERROR,
-                error_code="E004"
-            ))
-        if bracket_balance > 0:
-            errors.append(LuaSyntaxError(
-                line=bracket_open_line, column=0,
-                message="Unclosed '['",
-                severity=ErrorSeverity.ERROR,
-                error_code="E004"
-            ))
-        if brace_balance > 0:
-            errors.append(LuaSyntaxError(
-                line=brace_open_line, column=0,
-                message="Unclosed '{'",
-                severity=ErrorSeverity.ERROR,
-                error_code="E004"
-            ))
+        for opener in bracket_stack:
+            errors.append(self._token_error(opener, f"Unclosed '{opener.value}'", "E004"))
 
+        errors.sort(key=lambda error: (error.line, error.column))
         return errors
 
-    def _remove_strings_fallback(self, line: str) -> str:
-        """Remove string literals from line to avoid false positives"""
-        result = []
-        in_string = False
-        string_char = None
-        i = 0
-        while i < len(line):
-            char = line[i]
-            if not in_string:
-                if char in '"\'':
-                    in_string = True
-                    string_char = char
-                else:
-                    result.append(char)
-            else:
-                if char == string_char and (i == 0 or line[i-1] != '\\'):
-                    in_string = False
-            i += 1
-        return ''.join(result)
+    @staticmethod
+    def _token_error(token: LuaToken, message: str, error_code: str) -> LuaSyntaxError:
+        """Build an error spanning the first line of a token"""
+        return LuaSyntaxError(
+            line=token.line,
+            column=token.column,
+            message=message,
+            severity=ErrorSeverity.ERROR,
+            error_code=error_code,
+            start_pos=token.start,
+            length=max(1, len(token.value.split('\n', 1)[0]))
+        )
 
     def clear_cache(self):
         """Clear the result cache"""
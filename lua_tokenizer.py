@@ -0,0 +1,425 @@
+"""Lua Tokenizer
+
+Single-pass tokenizer for Lua source code and a splitter that divides a
+script into independent top-level chunks (function definitions and
+top-level statements) for incremental checking.
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional, Tuple
+
+
+# Token types
+NAME = "name"
+KEYWORD = "keyword"
+NUMBER = "number"
+STRING = "string"
+COMMENT = "comment"
+OPERATOR = "op"
+
+LUA_KEYWORDS = frozenset([
+    'and', 'break', 'do', 'else', 'elseif', 'end', 'false', 'for',
+    'function', 'goto', 'if', 'in', 'local', 'nil', 'not', 'or',
+    'repeat', 'return', 'then', 'true', 'until', 'while',
+])
+
+
+class LuaToken(NamedTuple):
+    """A single lexical token"""
+    type: str               # one of NAME, KEYWORD, NUMBER, STRING, COMMENT, OPERATOR
+    value: str              # raw source text of the token
+    start: int              # character offset of the first character
+    end: int                # character offset after the last character
+    line: int               # 0-indexed line of the first character
+    column: int             # 0-indexed column of the first character
+    error: Optional[str] = None  # set for unterminated strings/comments
+
+
+_NAME_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_NUMBER_RE = re.compile(
+    r'0[xX](?:[0-9a-fA-F]*\.?[0-9a-fA-F]*)(?:[pP][+-]?[0-9]+)?'
+    r'|(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?'
+)
+_LONG_BRACKET_RE = re.compile(r'\[(=*)\[')
+_OPERATORS = (
+    '...', '..', '==', '~=', '<=', '>=', '<<', '>>', '//', '::',
+    '+', '-', '*', '/', '%', '^', '#', '&', '~', '|', '<', '>', '=',
+    '(', ')', '{', '}', '[', ']', ';', ':', ',', '.',
+)
+_WHITESPACE = ' \t\r\f\v'
+
+
+def tokenize(code: str) -> List[LuaToken]:
+    """Tokenize Lua source code in a single linear pass.
+
+    Unterminated strings and comments are returned as tokens with the
+    ``error`` field set instead of raising, so callers can report them.
+    """
+    tokens = []
+    pos = 0
+    line = 0
+    line_start = 0
+    length = len(code)
+
+    while pos < length:
+        char = code[pos]
+
+        # Whitespace
+        if char == '\n':
+            line += 1
+            pos += 1
+            line_start = pos
+            continue
+        if char in _WHITESPACE:
+            pos += 1
+            continue
+
+        start = pos
+        start_line = line
+        column = pos - line_start
+        error = None
+
+        # Comments
+        if code.startswith('--', pos):
+            match = _LONG_BRACKET_RE.match(code, pos + 2)
+            if match:
+                close = ']' + match.group(1) + ']'
+                end = code.find(close, match.end())
+                if end < 0:
+                    end = length
+                    error = "unfinished long comment"
+                else:
+                    end += len(close)
+            else:
+                end = code.find('\n', pos)
+                if end < 0:
+                    end = length
+            line, line_start = _advance_lines(code, start, end, line, line_start)
+            tokens.append(LuaToken(COMMENT, code[start:end], start, end, start_line, column, error))
+            pos = end
+            continue
+
+        # Names and keywords
+        if char.isalpha() or char == '_':
+            match = _NAME_RE.match(code, pos)
+            if match:
+                end = match.end()
+                value = match.group()
+                typ = KEYWORD if value in LUA_KEYWORDS else NAME
+                tokens.append(LuaToken(typ, value, start, end, start_line, column))
+                pos = end
+                continue
+
+        # Numbers
+        if char.isdigit() or (char == '.' and pos + 1 < length and code[pos + 1].isdigit()):
+            match = _NUMBER_RE.match(code, pos)
+            end = match.end() if match and match.end() > pos else pos + 1
+            tokens.append(LuaToken(NUMBER, code[start:end], start, end, start_line, column))
+            pos = end
+            continue
+
+        # Short strings
+        if char == '"' or char == "'":
+            end = pos + 1
+            while True:
+                if end >= length or code[end] == '\n':
+                    error = "unfinished string"
+                    break
+                current = code[end]
+                if current == '\\':
+                    # Escaped newline continues the string on the next line
+                    if end + 1 < length and code[end + 1] == '\n':
+                        line += 1
+                        line_start = end + 2
+                    end += 2
+                    continue
+                end += 1
+                if current == char:
+                    break
+            end = min(end, length)
+            tokens.append(LuaToken(STRING, code[start:end], start, end, start_line, column, error))
+            pos = end
+            continue
+
+        # Long strings
+        if char == '[':
+            match = _LONG_BRACKET_RE.match(code, pos)
+            if match:
+                close = ']' + match.group(1) + ']'
+                end = code.find(close, match.end())
+                if end < 0:
+                    end = length
+                    error = "unfinished long string"
+                else:
+                    end += len(close)
+                line, line_start = _advance_lines(code, start, end, line, line_start)
+                tokens.append(LuaToken(STRING, code[start:end], start, end, start_line, column, error))
+                pos = end
+                continue
+
+        # Operators and punctuation
+        for op in _OPERATORS:
+            if code.startswith(op, pos):
+                end = pos + len(op)
+                tokens.append(LuaToken(OPERATOR, op, start, end, start_line, column))
+                pos = end
+                break
+        else:
+            # Unknown character, emit as a single-character operator
+            tokens.append(LuaToken(OPERATOR, char, start, pos + 1, start_line, column,
+                                   f"unexpected symbol '{char}'"))
+            pos += 1
+
+    return tokens
+
+
+def _advance_lines(code: str, start: int, end: int, line: int, line_start: int):
+    """Line number and line start offset after a token spanning start..end"""
+    newlines = code.count('\n', start, end)
+    if newlines:
+        return line + newlines, code.rfind('\n', start, end) + 1
+    return line, line_start
+
+
+# ============================================================================
+# Position mapping
+# ============================================================================
+
+class LineIndex:
+    """Line start offsets of a text, built once for position conversions.
+
+    Converts character offsets to 0-indexed (line, column) pairs and back
+    with a binary search, so mapping many diagnostics stays O(log n) each.
+    """
+
+    def __init__(self, code: str):
+        self.length = len(code)
+        starts = [0]
+        find = code.find
+        pos = find('\n')
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.line_starts = starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Character offset -> (line, column)"""
+        offset = max(0, min(offset, self.length))
+        line = bisect_right(self.line_starts, offset) - 1
+        return line, offset - self.line_starts[line]
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """(line, column) -> character offset, clamped to the text"""
+        line = max(0, min(line, len(self.line_starts) - 1))
+        return max(0, min(self.line_starts[line] + column, self.length))
+
+    def line_end(self, line: int) -> int:
+        """Offset of the end of a line, excluding the newline"""
+        if line + 1 < len(self.line_starts):
+            return self.line_starts[line + 1] - 1
+        return self.length
+
+
+# ============================================================================
+# Top-level chunk splitting
+# ============================================================================
+
+class LuaChunk(NamedTuple):
+    """A contiguous range of whole lines holding top-level statements"""
+    start: int      # character offset (always the start of a line)
+    end: int        # character offset after the chunk
+    line: int       # 0-indexed line of the first character
+    text: str
+
+
+# Keywords that can begin a top-level statement
+_STATEMENT_KEYWORDS = frozenset([
+    'local', 'function', 'if', 'for', 'while', 'do', 'repeat',
+    'return', 'break', 'goto',
+])
+
+# Tokens after which a statement always continues on the next line
+_CONTINUATION_KEYWORDS = frozenset([
+    'and', 'or', 'not', 'local', 'return', 'goto', 'until', 'in',
+    'function', 'then', 'do', 'else', 'elseif', 'for', 'while', 'if', 'repeat',
+])
+
+
+def _line_start(code: str, pos: int) -> int:
+    return code.rfind('\n', 0, pos) + 1
+
+
+def split_chunks(code: str, tokens: Optional[List[LuaToken]] = None) -> List[LuaChunk]:
+    """Split Lua code into top-level chunks.
+
+    A new chunk begins at the start of a line whose first token starts a
+    new statement while no block (function/if/for/while/do/repeat) or
+    bracket is open. Chunks consist of whole lines and together cover the
+    entire input, so line/column positions inside a chunk map back to the
+    full text by adding ``chunk.line`` / ``chunk.start``.
+
+    After a top-level ``return`` or a stray closer (``end``/``until``
+    without an open block, a closing bracket without an opening one) no
+    further boundaries are made: the parser reports such code against
+    what follows it, so the rest of the file stays in the same chunk.
+    """
+    if tokens is None:
+        tokens = tokenize(code)
+
+    boundaries = [0]
+    blocks = []          # open block keywords
+    bracket_depth = 0
+    prev = None          # previous significant token
+    prev_end_line = -1   # line on which the previous token ends
+    sealed = False       # no more boundaries (top-level return or stray closer)
+
+    for token in tokens:
+        if token.type == COMMENT:
+            continue
+
+        # Is this token the first on a new line at top level?
+        if (not sealed and prev is not None and token.line > prev_end_line
+                and not blocks and bracket_depth == 0
+                and _ends_statement(prev) and _starts_statement(token)):
+            boundary = _line_start(code, token.start)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+        if token.type == KEYWORD:
+            value = token.value
+            if not blocks and bracket_depth == 0 and value in ('return', 'end', 'until'):
+                sealed = True
+            if value in ('function', 'if', 'repeat'):
+                blocks.append(value)
+            elif value in ('for', 'while'):
+                blocks.append('loop')  # the following 'do' belongs to this loop
+            elif value == 'do':
+                if blocks and blocks[-1] == 'loop':
+                    blocks[-1] = 'do'
+                else:
+                    blocks.append('do')
+            elif value in ('end', 'until'):
+                if blocks:
+                    blocks.pop()
+        elif token.type == OPERATOR:
+            if token.value in ('(', '[', '{'):
+                bracket_depth += 1
+            elif token.value in (')', ']', '}'):
+                if bracket_depth == 0:
+                    sealed = True
+                bracket_depth = max(0, bracket_depth - 1)
+
+        prev = token
+        prev_end_line = token.line
+        if token.type == STRING:
+            prev_end_line += token.value.count('\n')
+
+    boundaries.append(len(code))
+
+    chunks = []
+    line = 0
+    for index in range(len(boundaries) - 1):
+        start, end = boundaries[index], boundaries[index + 1]
+        text = code[start:end]
+        chunks.append(LuaChunk(start, end, line, text))
+        line += text.count('\n')
+    return chunks
+
+
+def resplit_chunks(code: str, old_code: str, old_chunks: List[LuaChunk],
+                   max_attempts: int = 4) -> List[LuaChunk]:
+    """split_chunks(code) for an edited version of old_code.
+
+    Only the edited range is tokenized again: splitting restarts one
+    chunk before the first changed character and stops at the first old
+    boundary in the unchanged tail that it reproduces, after which the
+    old chunks are reused with shifted positions. Falls back to a full
+    split when no old boundary is reproduced within max_attempts.
+    """
+    if not old_chunks or not old_code:
+        return split_chunks(code)
+    prefix, suffix = _common_affixes(code, old_code)
+    if prefix == len(code) == len(old_code):
+        return list(old_chunks)
+
+    starts = [chunk.start for chunk in old_chunks]
+    first = max(bisect_right(starts, prefix) - 2, 0)
+    restart = old_chunks[first]
+    shift = len(code) - len(old_code)
+    tail_start = len(old_code) - suffix
+
+    attempts = 0
+    for index in range(first + 1, len(old_chunks)):
+        old = old_chunks[index]
+        if old.start < tail_start or old.start + shift <= restart.start:
+            continue
+        attempts += 1
+        if attempts > max_attempts:
+            break
+        boundary = old.start + shift
+        # Split up to the following boundary so the first token after
+        # this one is complete
+        window_end = old.end + shift
+        window = split_chunks(code[restart.start:window_end])
+        if not any(chunk.start + restart.start == boundary for chunk in window):
+            continue
+
+        chunks = old_chunks[:first]
+        line = restart.line
+        for chunk in window:
+            start = chunk.start + restart.start
+            if start >= boundary:
+                break
+            chunks.append(LuaChunk(start, chunk.end + restart.start, line, chunk.text))
+            line += chunk.text.count('\n')
+        line_shift = line - old.line
+        chunks.extend(LuaChunk(chunk.start + shift, chunk.end + shift,
+                               chunk.line + line_shift, chunk.text)
+                      for chunk in old_chunks[index:])
+        return chunks
+
+    return split_chunks(code)
+
+
+def _common_affixes(new: str, old: str) -> Tuple[int, int]:
+    """Lengths of the common prefix and (non-overlapping) common suffix"""
+    limit = min(len(new), len(old))
+
+    # Binary search, comparing slices in C
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if new[:mid] == old[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = low
+    low, high = 0, limit - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if new[len(new) - mid:] == old[len(old) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return prefix, low
+
+
+def _ends_statement(token: LuaToken) -> bool:
+    if token.type == OPERATOR:
+        return token.value in (')', ']', '}')
+    if token.type == KEYWORD:
+        return token.value not in _CONTINUATION_KEYWORDS
+    return True
+
+
+def _starts_statement(token: LuaToken) -> bool:
+    if token.type == NAME:
+        return True
+    if token.type == KEYWORD:
+        return token.value in _STATEMENT_KEYWORDS
+    return token.type == OPERATOR and token.value in ('::', ';')
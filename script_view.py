@@ -4,15 +4,27 @@
 支援 WatchMaker Lua API。
 """
 
+import hashlib
 import os
+import tempfile
+import threading
+from collections import deque
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QSplitter, QListWidget, QListWidgetItem,
-                             QFrame, QTextEdit, QScrollArea, QShortcut)
-from PyQt5.QtCore import pyqtSignal, Qt, QTimer
+                             QFrame, QScrollArea, QShortcut, QListView,
+                             QAbstractItemView)
+from PyQt5.QtCore import (pyqtSignal, Qt, QTimer, QObject, QStandardPaths,
+                          QAbstractListModel, QModelIndex)
 from PyQt5.QtGui import QColor, QFont, QFontMetrics, QKeySequence
 from PyQt5.Qsci import QsciScintilla, QsciLexerLua, QsciAPIs
 
-from lua_syntax_checker import LuaSyntaxChecker, LuaSyntaxError, ErrorSeverity
+from lua_syntax_checker import (LuaSyntaxChecker, LuaSyntaxError, ErrorSeverity,
+                                prewarm_parser, wrap_expression, unwrap_expression_errors)
+from watchmaker_api import WATCHMAKER_API, WATCHMAKER_ACTIONS, EASING_FUNCTIONS, WATCHMAKER_TAGS
+from lua_completion import API_COMPLETIONS, API_WORDS, TAG_INDEX
+from lua_formatter import format_edits
+from lua_symbols import (extract_symbols, SemanticHighlighter,
+                         API_CALL, VARIABLE, CALLBACK, TAG)
 
 
 def load_style():
@@ -26,487 +38,86 @@ def load_style():
         return ""
 
 
-# WatchMaker Lua API 定義
-WATCHMAKER_API = {
-    # 核心函數
-    'wm_schedule': {
-        'signature': "wm_schedule(config)",
-        'description': "Manage animations and timed events. config is a table containing action, tween, from, to, duration, easing properties.",
-        'example': "wm_schedule { action='tween', tween='rotation', from=0, to=360, duration=1, easing='outQuad' }"
-    },
-    'wm_unschedule_all': {
-        'signature': "wm_unschedule_all()",
-        'description': "Cancel all scheduled animations or events.",
-        'example': "wm_unschedule_all()"
-    },
-    'wm_action': {
-        'signature': "wm_action(action_name)",
-        'description': "Execute various watch control actions like media playback, volume, weather update, etc.",
-        'example': "wm_action('media_play_pause')"
-    },
-    'wm_tag': {
-        'signature': "wm_tag(tag_name)",
-        'description': "Return the dynamic value of a WatchMaker tag.",
-        'example': "local hour = wm_tag('{dh}')"
-    },
-    'wm_vibrate': {
-        'signature': "wm_vibrate(duration, repeat)",
-        'description': "Trigger haptic feedback. duration in milliseconds, repeat is the repeat count.",
-        'example': "wm_vibrate(100, 2)"
-    },
-    'wm_sfx': {
-        'signature': "wm_sfx(filename)",
-        'description': "Play an MP3 file from the sfx folder.",
-        'example': "wm_sfx('click.mp3')"
-    },
-    'wm_transition': {
-        'signature': "wm_transition(effect)",
-        'description': "Execute screen transition effects.",
-        'example': "wm_transition('fade')"
-    },
-    'wm_anim_set': {
-        'signature': "wm_anim_set(layer, property, value)",
-        'description': "Configure animation properties for a layer.",
-        'example': "wm_anim_set('layer1', 'opacity', 0.5)"
-    },
-    'wm_anim_start': {
-        'signature': "wm_anim_start(layer)",
-        'description': "Start animation on the specified layer.",
-        'example': "wm_anim_start('layer1')"
-    },
-
-    # Callback Functions
-    'on_hour': {
-        'signature': "function on_hour(h)",
-        'description': "Executes every hour. h is the current hour (0-23).",
-        'example': "function on_hour(h)\n  print('Hour: ' .. h)\nend"
-    },
-    'on_minute': {
-        'signature': "function on_minute(h, m)",
-        'description': "Executes every minute. h is hour, m is minute.",
-        'example': "function on_minute(h, m)\n  print(h .. ':' .. m)\nend"
-    },
-    'on_second': {
-        'signature': "function on_second(h, m, s)",
-        'description': "Executes every second. h is hour, m is minute, s is second.",
-        'example': "function on_second(h, m, s)\n  var_s_time = h * 3600 + m * 60 + s\nend"
-    },
-    'on_millisecond': {
-        'signature': "function on_millisecond(dt)",
-        'description': "Executes every millisecond. dt is delta time in ms. Use var_ms_ prefix for variables.",
-        'example': "function on_millisecond(dt)\n  var_ms_counter = var_ms_counter + dt\nend"
-    },
-    'on_display_bright': {
-        'signature': "function on_display_bright()",
-        'description': "Executes when the watch screen turns on (becomes bright).",
-        'example': "function on_display_bright()\n  wm_anim_start('intro')\nend"
-    },
-    'on_display_not_bright': {
-        'signature': "function on_display_not_bright()",
-        'description': "Executes when the watch screen turns off (becomes dim).",
-        'example': "function on_display_not_bright()\n  wm_unschedule_all()\nend"
-    },
-
-    # Variables
-    'is_bright': {
-        'signature': "is_bright",
-        'description': "Boolean value indicating whether the screen is currently bright.",
-        'example': "if is_bright then\n  -- screen is on\nend"
-    },
-}
-
-# WatchMaker 動作列表
-WATCHMAKER_ACTIONS = [
-    'media_play_pause', 'media_next', 'media_prev', 'media_stop',
-    'sw_start_stop', 'sw_reset', 'sw_lap',
-    'vol_up', 'vol_down', 'vol_mute',
-    'm_update_weather', 'm_task:',
-    'flashlight_on', 'flashlight_off',
-    'alarm', 'timer', 'stopwatch',
-]
-
-# Easing 函數列表
-EASING_FUNCTIONS = [
-    'linear',
-    'inQuad', 'outQuad', 'inOutQuad',
-    'inCubic', 'outCubic', 'inOutCubic',
-    'inQuart', 'outQuart', 'inOutQuart',
-    'inQuint', 'outQuint', 'inOutQuint',
-    'inSine', 'outSine', 'inOutSine',
-    'inExpo', 'outExpo', 'inOutExpo',
-    'inCirc', 'outCirc', 'inOutCirc',
-    'inElastic', 'outElastic', 'inOutElastic',
-    'inBack', 'outBack', 'inOutBack',
-    'inBounce', 'outBounce', 'inOutBounce',
-]
-
-# WatchMaker 標籤系統（從 TAG_REFERENCE.md 擷取）
-# 格式: "Description:{tag}": "{tag}" (空格以底線替代)
-WATCHMAKER_TAGS = {
-    # Date / 日期
-    "Day_in_month:{dd}": "{dd}",
-    "Day_in_month_with_leading_zero:{ddz}": "{ddz}",
-    "Day_in_year:{ddy}": "{ddy}",
-    "Day_of_week_format_1:{ddw1}": "{ddw1}",
-    "Day_of_week_format_2:{ddw2}": "{ddw2}",
-    "Day_of_week:{ddw}": "{ddw}",
-    "Day_of_week_full:{ddww}": "{ddww}",
-    "Day_of_week_next_format_1:{ddw1_1}": "{ddw1_1}",
-    "Day_of_week_next_format_2:{ddw2_1}": "{ddw2_1}",
-    "Day_of_week_next:{ddw_1}": "{ddw_1}",
-    "Day_of_week_next_full:{ddww_1}": "{ddww_1}",
-    "Day_of_week_Sun=0_Sat=6:{ddw0}": "{ddw0}",
-    "Days_in_current_month:{ddim}": "{ddim}",
-    "Month_in_year:{dn}": "{dn}",
-    "Month_short:{dnn}": "{dnn}",
-    "Month_medium:{dnnn}": "{dnnn}",
-    "Month_full:{dnnnn}": "{dnnnn}",
-    "Year_2_digits:{dy}": "{dy}",
-    "Year_4_digits:{dyy}": "{dyy}",
-    "Week_in_month:{dwm}": "{dwm}",
-    "Week_in_year:{dw}": "{dw}",
-
-    # Time (12-Hour) / 時間（12小時制）
-    "Hour_1-12:{dh}": "{dh}",
-    "Hour_0-11:{dh11}": "{dh11}",
-    "Hour_1-12_with_leading_zero:{dhz}": "{dhz}",
-    "Hour_0-11_with_leading_zero:{dh11z}": "{dh11z}",
-    "Hour_text_1-12:{dht}": "{dht}",
-    "Hour_tens_1-12:{dhtt}": "{dhtt}",
-    "Hour_ones_1-12:{dhto}": "{dhto}",
-    "Hour_tens_0-11:{dh11tt}": "{dh11tt}",
-    "Hour_ones_0-11:{dh11to}": "{dh11to}",
-    "Hour_UTC_12hr:{dhutc12}": "{dhutc12}",
-    "Hour_UTC_12hr_with_leading_zero:{dhutc12z}": "{dhutc12z}",
-    "AM/PM:{da}": "{da}",
-
-    # Time (24-Hour) / 時間（24小時制）
-    "Hour_1-24:{dh24}": "{dh24}",
-    "Hour_0-23:{dh23}": "{dh23}",
-    "Hour_1-24_with_leading_zero:{dh24z}": "{dh24z}",
-    "Hour_0-23_with_leading_zero:{dh23z}": "{dh23z}",
-    "Hour_text_1-24:{dh24t}": "{dh24t}",
-    "Hour_tens_1-24:{dh24tt}": "{dh24tt}",
-    "Hour_ones_1-24:{dh24to}": "{dh24to}",
-    "Hour_tens_0-23:{dh23tt}": "{dh23tt}",
-    "Hour_ones_0-23:{dh23to}": "{dh23to}",
-    "Hour_UTC_24hr:{dhutc24}": "{dhutc24}",
-    "Hour_UTC_24hr_with_leading_zero:{dhutc24z}": "{dhutc24z}",
-    "UTC_Offset:{dutcoff}": "{dutcoff}",
-
-    # Minutes / 分鐘
-    "Minute_in_hour:{dm}": "{dm}",
-    "Minute_with_leading_zero:{dmz}": "{dmz}",
-    "Minute_tens:{dmt}": "{dmt}",
-    "Minute_ones:{dmo}": "{dmo}",
-    "Minute_text_all:{dmat}": "{dmat}",
-    "Minute_text_tens:{dmtt}": "{dmtt}",
-    "Minute_text_ones:{dmot}": "{dmot}",
-
-    # Seconds & Milliseconds / 秒與毫秒
-    "Second_in_minute:{ds}": "{ds}",
-    "Second_with_leading_zero:{dsz}": "{dsz}",
-    "Second_tens:{dst}": "{dst}",
-    "Second_ones:{dso}": "{dso}",
-    "Second_text_all:{dsat}": "{dsat}",
-    "Second_text_tens:{dstt}": "{dstt}",
-    "Second_text_ones:{dsot}": "{dsot}",
-    "Milliseconds:{dss}": "{dss}",
-    "Milliseconds_with_leading_zeros:{dssz}": "{dssz}",
-    "Seconds_*_1000_+_milliseconds:{dsps}": "{dsps}",
-    "Seconds_since_epoch:{depoch}": "{depoch}",
-    "Time_percent_24_hours:{dtp}": "{dtp}",
-    "Timezone:{dz}": "{dz}",
-
-    # Rotation Values / 旋轉值
-    "Hour_hand_rotation_12h:{drh}": "{drh}",
-    "Hour_hand_rotation_24h:{drh24}": "{drh24}",
-    "Hour_hand_rotation_12h_no_adjust:{drh0}": "{drh0}",
-    "Minute_hand_rotation:{drm}": "{drm}",
-    "Second_hand_rotation:{drs}": "{drs}",
-    "Second_hand_smooth_rotation:{drss}": "{drss}",
-    "Milliseconds_rotation:{drms}": "{drms}",
-
-    # Time Zone 1 / 時區1
-    "Time_Zone_1_Location:{tz1l}": "{tz1l}",
-    "Time_Zone_1_Location_Long:{tz1ll}": "{tz1ll}",
-    "Time_Zone_1_UTC_Offset:{tz1o}": "{tz1o}",
-    "Time_Zone_1_UTC_Offset_Mins:{tz1om}": "{tz1om}",
-    "Time_Zone_1_Daylight_Savings:{tz1dst}": "{tz1dst}",
-    "Time_Zone_1_Time:{tz1t}": "{tz1t}",
-    "Time_Zone_1_Rotation_hour:{tz1rh}": "{tz1rh}",
-    "Time_Zone_1_Rotation_hour_24h:{tz1rh24}": "{tz1rh24}",
-    "Time_Zone_1_Rotation_minute:{tz1rm}": "{tz1rm}",
-
-    # Time Zone 2 / 時區2
-    "Time_Zone_2_Location:{tz2l}": "{tz2l}",
-    "Time_Zone_2_Location_Long:{tz2ll}": "{tz2ll}",
-    "Time_Zone_2_UTC_Offset:{tz2o}": "{tz2o}",
-    "Time_Zone_2_UTC_Offset_Mins:{tz2om}": "{tz2om}",
-    "Time_Zone_2_Daylight_Savings:{tz2dst}": "{tz2dst}",
-    "Time_Zone_2_Time:{tz2t}": "{tz2t}",
-    "Time_Zone_2_Rotation_hour:{tz2rh}": "{tz2rh}",
-    "Time_Zone_2_Rotation_hour_24h:{tz2rh24}": "{tz2rh24}",
-    "Time_Zone_2_Rotation_minute:{tz2rm}": "{tz2rm}",
-
-    # Time Zone 3 / 時區3
-    "Time_Zone_3_Location:{tz3l}": "{tz3l}",
-    "Time_Zone_3_Location_Long:{tz3ll}": "{tz3ll}",
-    "Time_Zone_3_UTC_Offset:{tz3o}": "{tz3o}",
-    "Time_Zone_3_UTC_Offset_Mins:{tz3om}": "{tz3om}",
-    "Time_Zone_3_Daylight_Savings:{tz3dst}": "{tz3dst}",
-    "Time_Zone_3_Time:{tz3t}": "{tz3t}",
-    "Time_Zone_3_Rotation_hour:{tz3rh}": "{tz3rh}",
-    "Time_Zone_3_Rotation_hour_24h:{tz3rh24}": "{tz3rh24}",
-    "Time_Zone_3_Rotation_minute:{tz3rm}": "{tz3rm}",
-
-    # Color Switcher / 顏色切換器
-    "Current_Color:{ucolor}": "{ucolor}",
-    "Current_Color_Brighter:{ucolor_b}": "{ucolor_b}",
-
-    # Counter / 計數器
-    "Seconds_elapsed_since_loaded:{c_elapsed}": "{c_elapsed}",
-    "0_to_100_in_2s_stop:{c_0_100_2_st}": "{c_0_100_2_st}",
-    "0_to_100_in_2s_repeat:{c_0_100_2_rp}": "{c_0_100_2_rp}",
-    "0_to_100_in_2s_reverse:{c_0_100_2_rv}": "{c_0_100_2_rv}",
-    "0_to_100_in_2s_reverse_delay:{c_0_100_2_rv_2}": "{c_0_100_2_rv_2}",
-
-    # Watch Battery / 手錶電池
-    "Battery_level:{bl}": "{bl}",
-    "Battery_level_percent:{blp}": "{blp}",
-    "Battery_rotation:{br}": "{br}",
-    "Battery_temperature_C:{btc}": "{btc}",
-    "Battery_temperature_F:{btf}": "{btf}",
-    "Battery_temperature_C_percent:{btcd}": "{btcd}",
-    "Battery_temperature_F_percent:{btfd}": "{btfd}",
-    "Battery_charging:{bc}": "{bc}",
-
-    # Phone Battery / 手機電池
-    "Phone_Battery_level:{pbl}": "{pbl}",
-    "Phone_Battery_level_percent:{pblp}": "{pblp}",
-    "Phone_Battery_rotation:{pbr}": "{pbr}",
-    "Phone_Battery_temperature_C:{pbtc}": "{pbtc}",
-    "Phone_Battery_temperature_F:{pbtf}": "{pbtf}",
-    "Phone_Battery_temperature_C_percent:{pbtcd}": "{pbtcd}",
-    "Phone_Battery_temperature_F_percent:{pbtfd}": "{pbtfd}",
-    "Phone_Battery_charging:{pbc}": "{pbc}",
-
-    # System / 系統
-    "Operating_System:{aos}": "{aos}",
-    "OS_Version:{aosv}": "{aosv}",
-    "Language_Code:{alangcode}": "{alangcode}",
-    "Language_Region:{alangreg}": "{alangreg}",
-    "Language_Full:{alangfull}": "{alangfull}",
-    "Device_name:{aname}": "{aname}",
-    "Device_model:{amodel}": "{amodel}",
-    "Device_manufacturer:{aman}": "{aman}",
-    "System_Volume:{avol}": "{avol}",
-    "Screen_Brightness:{abrt}": "{abrt}",
-    "Low_Power_Mode:{alowpw}": "{alowpw}",
-    "Bluetooth_Enabled:{abtc}": "{abtc}",
-    "Watch_name:{awname}": "{awname}",
-    "Is_round:{around}": "{around}",
-    "Has_flat_tyre:{atyre}": "{atyre}",
-    "Is_bright:{abright}": "{abright}",
-    "Dim_mode_lo-bit_only:{adimlo}": "{adimlo}",
-    "Milliseconds_since_bright:{abss}": "{abss}",
-    "Seconds_since_bright_capped_30:{abssl}": "{abssl}",
-    "Is_dark_mode:{adark}": "{adark}",
-    "Last_Reboot_Time:{areboot}": "{areboot}",
-
-    # Memory / 記憶體
-    "Used_Memory:{amu}": "{amu}",
-    "Used_Memory_Formatted:{amuf}": "{amuf}",
-    "Used_Memory_Percentage:{amup}": "{amup}",
-    "Free_Memory:{amf}": "{amf}",
-    "Free_Memory_Formatted:{amff}": "{amff}",
-    "Free_Memory_Percentage:{amfp}": "{amfp}",
-    "Total_Memory:{amt}": "{amt}",
-    "Total_Memory_Formatted:{amtf}": "{amtf}",
-
-    # Disk Space / 磁碟空間
-    "Used_Disk_Space:{adsu}": "{adsu}",
-    "Used_Disk_Space_Formatted:{adsuf}": "{adsuf}",
-    "Used_Disk_Space_Percentage:{adsup}": "{adsup}",
-    "Free_Disk_Space:{adsf}": "{adsf}",
-    "Free_Disk_Space_Formatted:{adsff}": "{adsff}",
-    "Free_Disk_Space_Percentage:{adsfp}": "{adsfp}",
-    "Total_Disk_Space:{adst}": "{adst}",
-    "Total_Disk_Space_Formatted:{adstf}": "{adstf}",
-
-    # Location / 位置
-    "Current_latitude:{alat}": "{alat}",
-    "Current_longitude:{alon}": "{alon}",
-    "Current_latitude_degrees:{alatd}": "{alatd}",
-    "Current_longitude_degrees:{alond}": "{alond}",
-    "Current_latitude_degrees_direction:{alatdd}": "{alatdd}",
-    "Current_longitude_degrees_direction:{alondd}": "{alondd}",
-    "Current_altitude:{aalt}": "{aalt}",
-    "what3words_address:{aw3w}": "{aw3w}",
-    "what3words_Word_1:{aw3w1}": "{aw3w1}",
-    "what3words_Word_2:{aw3w2}": "{aw3w2}",
-    "what3words_Word_3:{aw3w3}": "{aw3w3}",
-
-    # Network / 網路
-    "Device_Online:{nc}": "{nc}",
-    "Cellular_Connected:{ncc}": "{ncc}",
-    "WiFi_Strength_percent:{pws}": "{pws}",
-    "WiFi_Connected:{pwc}": "{pwc}",
-    "WiFi_IP_Address:{nwip}": "{nwip}",
-
-    # Stopwatch / 碼錶
-    "Stopwatch_hours:{swh}": "{swh}",
-    "Stopwatch_minutes:{swm}": "{swm}",
-    "Stopwatch_seconds:{sws}": "{sws}",
-    "Stopwatch_milliseconds_2_digits:{swss}": "{swss}",
-    "Stopwatch_milliseconds_3_digits:{swsss}": "{swsss}",
-    "Stopwatch_milliseconds_total:{swsst}": "{swsst}",
-    "Stopwatch_is_running:{swr}": "{swr}",
-    "Stopwatch_minute_rotation:{swrm}": "{swrm}",
-    "Stopwatch_second_rotation:{swrs}": "{swrs}",
-    "Stopwatch_millisecond_rotation:{swrss}": "{swrss}",
-
-    # Weather - Current / 天氣 - 當前
-    "Weather_Location:{wl}": "{wl}",
-    "Current_Temperature:{wt}": "{wt}",
-    "Today_High:{wth}": "{wth}",
-    "Today_Low:{wtl}": "{wtl}",
-    "Current_Temperature_degrees:{wtd}": "{wtd}",
-    "Today_High_degrees:{wthd}": "{wthd}",
-    "Today_Low_degrees:{wtld}": "{wtld}",
-    "Weather_Units:{wm}": "{wm}",
-    "Current_Condition_Text:{wct}": "{wct}",
-    "Current_Condition_Icon:{wci}": "{wci}",
-    "Current_Humidity_Number:{wh}": "{wh}",
-    "Current_Humidity_Percentage:{whp}": "{whp}",
-    "Atmospheric_Pressure:{wp}": "{wp}",
-    "Wind_Speed_mph:{wws}": "{wws}",
-    "Wind_Direction_degrees:{wwd}": "{wwd}",
-    "Wind_Direction_NE:{wwdb}": "{wwdb}",
-    "Wind_Direction_NNE:{wwdbb}": "{wwdbb}",
-    "Cloudiness_percent:{wcl}": "{wcl}",
-    "Rain_volume_3hrs_mm:{wr}": "{wr}",
-    "Is_daytime:{wisday}": "{wisday}",
-    "Sunrise_time:{wsr}": "{wsr}",
-    "Sunset_time:{wss}": "{wss}",
-    "Sunrise_percent_24hrs:{wsrp}": "{wsrp}",
-    "Sunset_percent_24hrs:{wssp}": "{wssp}",
-    "Moon_Phase:{wmp}": "{wmp}",
-    "Weather_manual_location:{wml}": "{wml}",
-    "Weather_last_update:{wlu}": "{wlu}",
-
-    # Weather - Hourly Forecast / 天氣 - 每小時預報
-    "Forecast_Hour_1_Temp:{wf1ht}": "{wf1ht}",
-    "Forecast_Hour_1_Hour:{wf1hh}": "{wf1hh}",
-    "Forecast_Hour_1_Condition_Text:{wf1hct}": "{wf1hct}",
-    "Forecast_Hour_1_Condition_Icon:{wf1hci}": "{wf1hci}",
-    "Forecast_Hour_2_Temp:{wf2ht}": "{wf2ht}",
-    "Forecast_Hour_2_Hour:{wf2hh}": "{wf2hh}",
-    "Forecast_Hour_2_Condition_Text:{wf2hct}": "{wf2hct}",
-    "Forecast_Hour_2_Condition_Icon:{wf2hci}": "{wf2hci}",
-
-    # Weather - Daily Forecast / 天氣 - 每日預報
-    "Forecast_Day_0_Temp:{wf0dt}": "{wf0dt}",
-    "Forecast_Day_0_High:{wf0dth}": "{wf0dth}",
-    "Forecast_Day_0_Low:{wf0dtl}": "{wf0dtl}",
-    "Forecast_Day_0_Condition_Text:{wf0dct}": "{wf0dct}",
-    "Forecast_Day_0_Condition_Icon:{wf0dci}": "{wf0dci}",
-    "Forecast_Day_1_Temp:{wf1dt}": "{wf1dt}",
-    "Forecast_Day_1_High:{wf1dth}": "{wf1dth}",
-    "Forecast_Day_1_Low:{wf1dtl}": "{wf1dtl}",
-    "Forecast_Day_1_Condition_Text:{wf1dct}": "{wf1dct}",
-    "Forecast_Day_1_Condition_Icon:{wf1dci}": "{wf1dci}",
-
-    # Calendar / 日曆
-    "Events_Exist:{cex}": "{cex}",
-    "Event_1_Exists:{c1ex}": "{c1ex}",
-    "Event_1_Text:{c1t}": "{c1t}",
-    "Event_1_Begin_Date:{c1bd}": "{c1bd}",
-    "Event_1_Begin_Time:{c1b}": "{c1b}",
-    "Event_1_Begin_Rotation:{c1br}": "{c1br}",
-    "Event_1_Begin_percent_24hrs:{c1bp}": "{c1bp}",
-    "Event_1_End_Date:{c1ed}": "{c1ed}",
-    "Event_1_End_Time:{c1e}": "{c1e}",
-    "Event_1_End_Rotation:{c1er}": "{c1er}",
-    "Event_1_End_percent_24hrs:{c1ep}": "{c1ep}",
-    "Event_1_Location:{c1l}": "{c1l}",
-    "Event_1_Color:{c1c}": "{c1c}",
-    "Event_1_is_All_Day:{c1ad}": "{c1ad}",
-    "Event_1_Calendar:{c1cal}": "{c1cal}",
-    "Event_1_ID:{c1i}": "{c1i}",
-
-    # Health & Fitness - Steps / 健康與健身 - 步數
-    "Steps:{ssc}": "{ssc}",
-    "Steps_Goal:{stsc}": "{stsc}",
-    "Steps_percent_of_Goal:{sscp}": "{sscp}",
-    "Distance_Units:{sdstu}": "{sdstu}",
-    "Distance:{sdst}": "{sdst}",
-    "Distance_Goal:{stdst}": "{stdst}",
-    "Distance_percent_of_Goal:{sdstp}": "{sdstp}",
-    "Calories_kCal:{scal}": "{scal}",
-    "Calories_Goal_kCal:{stcal}": "{stcal}",
-    "Calories_percent_of_Goal:{scalp}": "{scalp}",
-
-    # Health & Fitness - Activity Rings / 健康與健身 - 活動圓環
-    "Move_kCal:{ham}": "{ham}",
-    "Move_Goal_kCal:{htam}": "{htam}",
-    "Exercise_mins:{hae}": "{hae}",
-    "Exercise_Goal_mins:{htae}": "{htae}",
-    "Stand_hrs:{has}": "{has}",
-    "Stand_Goal_hrs:{htas}": "{htas}",
-    "Flights_Climbed:{hfc}": "{hfc}",
-
-    # Health & Fitness - Heart Rate / 健康與健身 - 心率
-    "Heart_Rate:{shr}": "{shr}",
-    "Heart_Rate_Maximum:{sthr}": "{sthr}",
-    "Heart_Rate_percent_of_Maximum:{shrp}": "{shrp}",
-    "Heart_Rate_Previous:{shr_1}": "{shr_1}",
-    "Heart_Rate_Previous_2:{shr_2}": "{shr_2}",
-
-    # Sensors - Accelerometer / 感測器 - 加速度計
-    "Accelerometer_X:{sax}": "{sax}",
-    "Accelerometer_Y:{say}": "{say}",
-    "Accelerometer_Z:{saz}": "{saz}",
-
-    # Sensors - Gyroscope / 感測器 - 陀螺儀
-    "Gyroscope_X:{sgx}": "{sgx}",
-    "Gyroscope_Y:{sgy}": "{sgy}",
-    "Gyroscope_Z:{sgz}": "{sgz}",
-
-    # Sensors - Compass / 感測器 - 指南針
-    "Compass_for_Rotation:{scr}": "{scr}",
-    "Compass_Display:{sct}": "{sct}",
-    "Compass_Display_degrees:{sctd}": "{sctd}",
-    "Compass_Bearing_NE:{scb}": "{scb}",
-    "Compass_Bearing_NNE:{scbb}": "{scbb}",
-    "Compass_Display_degrees_NE:{sctdb}": "{sctdb}",
-    "Compass_Display_degrees_NNE:{sctdbb}": "{sctdbb}",
-
-    # Sensors - Other / 感測器 - 其他
-    "Barometric_Pressure:{sprs}": "{sprs}",
-
-    # Complications / 複雜功能
-    "Complication_1_Text:{m1text}": "{m1text}",
-    "Complication_1_Title:{m1title}": "{m1title}",
-    "Complication_1_Value:{m1value}": "{m1value}",
-    "Complication_1_Min:{m1min}": "{m1min}",
-    "Complication_1_Max:{m1max}": "{m1max}",
-    "Complication_2_Text:{m2text}": "{m2text}",
-    "Complication_2_Title:{m2title}": "{m2title}",
-    "Complication_2_Value:{m2value}": "{m2value}",
-    "Complication_2_Min:{m2min}": "{m2min}",
-    "Complication_2_Max:{m2max}": "{m2max}",
-    "Complication_3_Text:{m3text}": "{m3text}",
-    "Complication_3_Title:{m3title}": "{m3title}",
-    "Complication_3_Value:{m3value}": "{m3value}",
-    "Complication_3_Min:{m3min}": "{m3min}",
-    "Complication_3_Max:{m3max}": "{m3max}",
-    "Complication_4_Text:{m4text}": "{m4text}",
-    "Complication_4_Title:{m4title}": "{m4title}",
-    "Complication_4_Value:{m4value}": "{m4value}",
-    "Complication_4_Min:{m4min}": "{m4min}",
-    "Complication_4_Max:{m4max}": "{m4max}",
-}
+# QsciAPIs 預先準備資料的檔案路徑（每個行程只計算一次）
+_prepared_api_path = None
+
+
+def prepared_api_path():
+    """API 預先準備檔 (.pap) 的路徑，檔名含 API 內容雜湊，內容改變時自動失效"""
+    global _prepared_api_path
+    if _prepared_api_path is None:
+        digest = hashlib.sha1('\n'.join(API_WORDS).encode('utf-8')).hexdigest()[:16]
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+        if not cache_dir:
+            cache_dir = tempfile.gettempdir()
+        cache_dir = os.path.join(cache_dir, "watchmaker_pc")
+        _prepared_api_path = os.path.join(cache_dir, f"lua_api_{digest}.pap")
+    return _prepared_api_path
+
+
+class ApiPreparation(QObject):
+    """行程內共用的 QsciAPIs 預先準備
+
+    只有第一個需要的編輯器會觸發一次 prepare()（使用自己的 lexer 與
+    QsciAPIs，不受編輯器關閉影響），完成後在鎖內存檔一次；其他編輯器
+    等 finished 信號後直接 loadPrepared()。
+    """
+
+    IDLE, PREPARING, READY, FAILED = range(4)
+
+    # 是否已存成 prepared_api_path()
+    finished = pyqtSignal(bool)
+
+    _instance = None
+
+    @classmethod
+    def shared(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.state = self.IDLE
+        self._lexer = None
+        self._apis = None
+        self._save_lock = threading.Lock()
+
+    def ensure(self):
+        """回傳目前狀態；預先準備檔不存在時（只在第一次）開始準備"""
+        if self.state == self.IDLE:
+            if os.path.exists(prepared_api_path()):
+                self.state = self.READY
+            else:
+                self.state = self.PREPARING
+                self._lexer = QsciLexerLua(self)
+                self._apis = QsciAPIs(self._lexer)
+                for word in API_WORDS:
+                    self._apis.add(word)
+                self._apis.apiPreparationFinished.connect(self._on_prepared)
+                self._apis.prepare()
+        return self.state
+
+    def _on_prepared(self):
+        path = prepared_api_path()
+        with self._save_lock:
+            saved = os.path.exists(path)
+            if not saved:
+                # 先寫入暫存檔再換名，其他行程不會讀到寫到一半的檔案
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    saved = self._apis.savePrepared(tmp_path)
+                    if saved:
+                        os.replace(tmp_path, path)
+                except OSError:
+                    saved = False
+                if not saved:
+                    print(f"Warning: Cannot save prepared API file: {path}")
+        self.state = self.READY if saved else self.FAILED
+        self._lexer.deleteLater()
+        self._lexer = self._apis = None
+        self.finished.emit(saved)
 
 
 class LuaLexer(QsciLexerLua):
@@ -568,9 +179,34 @@ class LuaEditor(QsciScintilla):
     TAG_LIST_ID = 1
     API_LIST_ID = 2
 
+    # 標記與指示器編號
+    ERROR_MARKER = 0
+    WARNING_MARKER = 1
+    ERROR_INDICATOR = 0
+
+    # 語意高亮：種類 -> (指示器編號, 文字顏色)；編號從 INDIC_CONTAINER 開始，
+    # 不與詞法分析器使用的指示器衝突
+    SEMANTIC_INDICATORS = {
+        API_CALL: (QsciScintilla.INDIC_CONTAINER, "#DCDCAA"),
+        VARIABLE: (QsciScintilla.INDIC_CONTAINER + 1, "#9CDCFE"),
+        CALLBACK: (QsciScintilla.INDIC_CONTAINER + 2, "#4EC9B0"),
+        TAG: (QsciScintilla.INDIC_CONTAINER + 3, "#C586C0"),
+    }
+
+    # 大型文件模式切換時發出信號 (是否啟用)
+    large_document_changed = pyqtSignal(bool)
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
+        # 大型文件模式：超過任一門檻時關閉耗時的顯示功能，
+        # 低於門檻的 large_doc_hysteresis 比例後才恢復，避免反覆切換
+        self.large_doc_chars = 300000
+        self.large_doc_lines = 10000
+        self.large_doc_hysteresis = 0.8
+        self._large_document = False
+        self._document_mode_scheduled = False
+
         # 標籤自動完成狀態
         self._tag_mode = False
         self._tag_start_pos = -1
@@ -580,13 +216,9 @@ class LuaEditor(QsciScintilla):
         self._api_start_pos = -1
         self._api_word_start = -1
 
-        # 建立 API 關鍵字列表
-        self._api_keywords = self._build_api_keywords()
-
         self.setup_editor()
         self.setup_lexer()
         self.setup_autocomplete()
-        self.setup_tag_autocomplete()
         self.setup_margins()
         self.setup_folding()
         self.setup_indicators()
@@ -594,6 +226,11 @@ class LuaEditor(QsciScintilla):
         # 連接用戶列表選擇信號（用於標籤自動完成）
         self.userListActivated.connect(self._on_userlist_selected)
 
+        # 文件大小改變時檢查是否切換大型文件模式；大量貼上在插入前就排程，
+        # 回到事件迴圈時（重繪之前）切換
+        self.SCN_MODIFIED.connect(self._on_modified)
+        self.textChanged.connect(self._schedule_document_mode)
+
     def setup_editor(self):
         """設置編輯器基本屬性"""
         # 設置編碼
@@ -603,17 +240,14 @@ class LuaEditor(QsciScintilla):
         self.setIndentationsUseTabs(False)
         self.setTabWidth(2)
         self.setAutoIndent(True)
-        self.setIndentationGuides(True)
 
-        # 設置括號匹配
-        self.setBraceMatching(QsciScintilla.SloppyBraceMatch)
+        # 設置括號匹配顏色
         self.setMatchedBraceBackgroundColor(QColor("#3A3D41"))
         self.setMatchedBraceForegroundColor(QColor("#FFCC00"))
         self.setUnmatchedBraceBackgroundColor(QColor("#5A1D1D"))
         self.setUnmatchedBraceForegroundColor(QColor("#FF6B6B"))
 
-        # 設置當前行高亮
-        self.setCaretLineVisible(True)
+        # 設置當前行高亮顏色
         self.setCaretLineBackgroundColor(QColor("#2D2D30"))
         self.setCaretForegroundColor(QColor("#FFFFFF"))
         self.setCaretWidth(2)
@@ -626,8 +260,8 @@ class LuaEditor(QsciScintilla):
         self.setMarginsBackgroundColor(QColor("#252526"))
         self.setMarginsForegroundColor(QColor("#858585"))
 
-        # 啟用自動換行
-        self.setWrapMode(QsciScintilla.WrapWord)
+        # 啟用縮排參考線、括號匹配、當前行高亮與自動換行
+        self._apply_document_features(large=False)
 
         # 設置滾動條
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
@@ -645,45 +279,13 @@ class LuaEditor(QsciScintilla):
         """設置自動完成"""
         self.apis = QsciAPIs(self.lexer)
 
-        # 添加 Lua 標準函數
-        lua_keywords = [
-            'and', 'break', 'do', 'else', 'elseif', 'end', 'false',
-            'for', 'function', 'goto', 'if', 'in', 'local', 'nil',
-            'not', 'or', 'repeat', 'return', 'then', 'true', 'until', 'while',
-            'print', 'type', 'tonumber', 'tostring', 'pairs', 'ipairs',
-            'next', 'select', 'unpack', 'pcall', 'xpcall', 'error', 'assert',
-            'string.len', 'string.sub', 'string.find', 'string.format',
-            'string.lower', 'string.upper', 'string.rep', 'string.reverse',
-            'math.abs', 'math.ceil', 'math.floor', 'math.max', 'math.min',
-            'math.random', 'math.sin', 'math.cos', 'math.tan', 'math.sqrt',
-            'table.insert', 'table.remove', 'table.sort', 'table.concat',
-        ]
-
-        for keyword in lua_keywords:
-            self.apis.add(keyword)
-
-        # 添加 WatchMaker API
-        for func_name in WATCHMAKER_API.keys():
-            self.apis.add(func_name)
-
-        # 添加自定義變數前綴
-        self.apis.add('var_')
-        self.apis.add('var_ms_')
-        self.apis.add('var_s_')
-
-        # 添加 easing 函數
-        for easing in EASING_FUNCTIONS:
-            self.apis.add(easing)
-
-        # 添加動作
-        for action in WATCHMAKER_ACTIONS:
-            self.apis.add(action)
-
-        # 準備 API（同步等待完成）
-        self.apis.prepare()
-
-        # 連接 API 準備完成信號
-        self.apis.apiPreparationFinished.connect(self._on_api_ready)
+        # 載入行程內共用的預先準備資料；還在準備中時等完成後再載入
+        preparation = ApiPreparation.shared()
+        state = preparation.ensure()
+        if state == ApiPreparation.PREPARING:
+            preparation.finished.connect(self._on_api_ready)
+        elif not (state == ApiPreparation.READY and self.apis.loadPrepared(prepared_api_path())):
+            self._prepare_api_locally()
 
         # 設置自動完成 - 使用 AcsAPIs 明確指定使用 API
         self.setAutoCompletionSource(QsciScintilla.AcsAPIs)
@@ -703,22 +305,19 @@ class LuaEditor(QsciScintilla):
         # 自動完成列表顏色
         self.SendScintilla(QsciScintilla.SCI_AUTOCSETMAXHEIGHT, 10)  # 最多顯示 10 項
 
-    def _on_api_ready(self):
-        """API 準備完成時的回調"""
-        # API 準備完成，自動完成現在可用
-        pass
-
-    def setup_tag_autocomplete(self):
-        """設置標籤自動完成"""
-        # 建立標籤自動完成的 API 列表
-        self.tag_apis = QsciAPIs(self.lexer)
-
-        # 添加所有 WatchMaker 標籤
-        for display_text in WATCHMAKER_TAGS.keys():
-            self.tag_apis.add(display_text)
-
-        # 準備 API
-        self.tag_apis.prepare()
+    def _on_api_ready(self, saved):
+        """共用的 API 準備完成，載入存好的資料"""
+        ApiPreparation.shared().finished.disconnect(self._on_api_ready)
+        if not (saved and self.apis.loadPrepared(prepared_api_path())):
+            self._prepare_api_locally()
+
+    def _prepare_api_locally(self):
+        """無法使用預先準備檔（例如快取目錄不可寫）時自行準備"""
+        # 添加 Lua 標準函數、WatchMaker API、變數前綴、easing 函數與動作
+        for word in API_WORDS:
+            self.apis.add(word)
+        # 準備 API（在背景執行緒進行）
+        self.apis.prepare()
 
     def keyPressEvent(self, event):
         """攔截按鍵事件以處理自動完成"""
@@ -754,6 +353,12 @@ class LuaEditor(QsciScintilla):
 
         super().keyPressEvent(event)
 
+        # 標籤模式下輸入或刪除字元時，以 { 之後的文字重新篩選標籤
+        if self._tag_mode and (event.key() == Qt.Key_Backspace
+                               or (event.text() and event.text().isprintable())):
+            self._update_tag_autocomplete()
+            return
+
         # 自動觸發 API 自動完成（輸入字母或數字後）
         if event.text() and event.text().isalnum() and not self._tag_mode:
             # 檢查當前單字長度
@@ -764,45 +369,17 @@ class LuaEditor(QsciScintilla):
             if word_len >= 2:
                 self._show_api_autocomplete()
 
-    def _build_api_keywords(self):
-        """建立 API 關鍵字列表"""
-        keywords = []
-        # Lua 標準函數
-        keywords.extend([
-            'and', 'break', 'do', 'else', 'elseif', 'end', 'false',
-            'for', 'function', 'goto', 'if', 'in', 'local', 'nil',
-            'not', 'or', 'repeat', 'return', 'then', 'true', 'until', 'while',
-            'print', 'type', 'tonumber', 'tostring', 'pairs', 'ipairs',
-            'next', 'select', 'unpack', 'pcall', 'xpcall', 'error', 'assert',
-            'string.len', 'string.sub', 'string.find', 'string.format',
-            'string.lower', 'string.upper', 'string.rep', 'string.reverse',
-            'math.abs', 'math.ceil', 'math.floor', 'math.max', 'math.min',
-            'math.random', 'math.sin', 'math.cos', 'math.tan', 'math.sqrt',
-            'table.insert', 'table.remove', 'table.sort', 'table.concat',
-        ])
-        # WatchMaker API
-        keywords.extend(WATCHMAKER_API.keys())
-        # Easing 函數
-        keywords.extend(EASING_FUNCTIONS)
-        # 動作
-        keywords.extend(WATCHMAKER_ACTIONS)
-        return sorted(set(keywords))
-
     def _show_api_autocomplete(self):
         """顯示 API 自動完成選單"""
         # 取得當前位置和當前輸入的單字
         current_pos = self.SendScintilla(QsciScintilla.SCI_GETCURRENTPOS)
         word_start = self.SendScintilla(QsciScintilla.SCI_WORDSTARTPOSITION, current_pos, True)
 
-        # 取得已輸入的前綴
-        prefix = self.text()[word_start:current_pos].lower() if word_start < current_pos else ""
-
-        # 過濾符合前綴的關鍵字
-        if prefix:
-            filtered = [kw for kw in self._api_keywords if kw.lower().startswith(prefix)]
-        else:
-            filtered = self._api_keywords
+        # 只讀取游標前的單字，不複製整份文件
+        prefix = self.text(word_start, current_pos) if word_start < current_pos else ""
 
+        # 從預建索引取出符合前綴的關鍵字（常用的排在前面）
+        filtered = API_COMPLETIONS.complete(prefix)
         if not filtered:
             return
 
@@ -811,18 +388,36 @@ class LuaEditor(QsciScintilla):
         self._api_start_pos = current_pos
         self._api_word_start = word_start
 
-        # 顯示選單
+        # 顯示選單（保持索引給出的排名順序）
+        self.SendScintilla(QsciScintilla.SCI_AUTOCSETORDER, QsciScintilla.SC_ORDER_CUSTOM)
         self.showUserList(self.API_LIST_ID, filtered)
 
-    def _show_tag_autocomplete(self):
-        """顯示標籤自動完成選單（使用用戶列表）"""
-        # 構建標籤列表字串（以空格分隔，用於 showUserList）
-        tag_list = sorted(WATCHMAKER_TAGS.keys())
+    def _show_tag_autocomplete(self, query=""):
+        """顯示標籤自動完成選單（使用用戶列表），依 query 模糊篩選並排序"""
+        tag_list = [entry.display for entry in TAG_INDEX.search(query)]
+        if not tag_list:
+            self.SendScintilla(QsciScintilla.SCI_AUTOCCANCEL)
+            return
 
-        # 使用 showUserList 顯示標籤選單
+        # 使用 showUserList 顯示標籤選單，保持排序結果
         # 這會觸發 userListActivated 信號
+        self.SendScintilla(QsciScintilla.SCI_AUTOCSETORDER, QsciScintilla.SC_ORDER_CUSTOM)
         self.showUserList(self.TAG_LIST_ID, tag_list)
 
+    def _update_tag_autocomplete(self):
+        """依 { 之後已輸入的文字更新標籤選單"""
+        current_pos = self.SendScintilla(QsciScintilla.SCI_GETCURRENTPOS)
+        query = self.text(self._tag_start_pos, current_pos) if current_pos > self._tag_start_pos else ""
+
+        # 刪除了 { 或輸入了標籤不會出現的字元時離開標籤模式
+        if current_pos < self._tag_start_pos or not all(c.isalnum() or c in '_-' for c in query):
+            self._tag_mode = False
+            self._tag_start_pos = -1
+            self.SendScintilla(QsciScintilla.SCI_AUTOCCANCEL)
+            return
+
+        self._show_tag_autocomplete(query)
+
     def _on_userlist_selected(self, list_id, selected_text):
         """當用戶列表項目被選中時的回調"""
         # 處理 API 列表
@@ -834,6 +429,7 @@ class LuaEditor(QsciScintilla):
             current_pos = self.SendScintilla(QsciScintilla.SCI_GETCURRENTPOS)
             self.SendScintilla(QsciScintilla.SCI_SETSEL, self._api_word_start, current_pos)
             self.SendScintilla(QsciScintilla.SCI_REPLACESEL, 0, selected_text.encode('utf-8'))
+            API_COMPLETIONS.record_use(selected_text)
 
             # 重置 API 模式
             self._api_mode = False
@@ -882,52 +478,212 @@ class LuaEditor(QsciScintilla):
         self.setMarginWidth(2, 16)
 
         # 定義標記樣式
-        self.markerDefine(QsciScintilla.Circle, 0)  # 錯誤標記
-        self.setMarkerBackgroundColor(QColor("#FF6B6B"), 0)
-        self.setMarkerForegroundColor(QColor("#FF6B6B"), 0)
+        self.markerDefine(QsciScintilla.Circle, self.ERROR_MARKER)  # 錯誤標記
+        self.setMarkerBackgroundColor(QColor("#FF6B6B"), self.ERROR_MARKER)
+        self.setMarkerForegroundColor(QColor("#FF6B6B"), self.ERROR_MARKER)
 
-        self.markerDefine(QsciScintilla.RightArrow, 1)  # 警告標記
-        self.setMarkerBackgroundColor(QColor("#FFCC00"), 1)
-        self.setMarkerForegroundColor(QColor("#FFCC00"), 1)
+        self.markerDefine(QsciScintilla.RightArrow, self.WARNING_MARKER)  # 警告標記
+        self.setMarkerBackgroundColor(QColor("#FFCC00"), self.WARNING_MARKER)
+        self.setMarkerForegroundColor(QColor("#FFCC00"), self.WARNING_MARKER)
 
     def setup_folding(self):
         """設置程式碼摺疊"""
         self.setFolding(QsciScintilla.BoxedTreeFoldStyle)
         self.setFoldMarginColors(QColor("#252526"), QColor("#252526"))
 
+    @property
+    def large_document(self):
+        """是否處於大型文件模式"""
+        return self._large_document
+
+    def _on_modified(self, position, modification_type, text, length, *args):
+        """插入前預先判斷是否需要進入大型文件模式
+
+        Scintilla 不允許在修改通知中變更文件或檢視設定，這裡只排程，
+        插入完成後再由 _update_document_mode 依實際大小切換
+        """
+        if (modification_type & QsciScintilla.SC_MOD_BEFOREINSERT
+                and not self._large_document
+                and self.length() + length > self.large_doc_chars):
+            self._schedule_document_mode()
+
+    def _schedule_document_mode(self):
+        """在事件迴圈的下一輪更新大型文件模式（textChanged 也在修改通知中發出）"""
+        if not self._document_mode_scheduled:
+            self._document_mode_scheduled = True
+            QTimer.singleShot(0, self._update_document_mode)
+
+    def _update_document_mode(self):
+        """依文件大小進入或離開大型文件模式（length/lines 皆為 O(1)）"""
+        self._document_mode_scheduled = False
+        chars, lines = self.length(), self.lines()
+        if self._large_document:
+            ratio = self.large_doc_hysteresis
+            large = chars > self.large_doc_chars * ratio or lines > self.large_doc_lines * ratio
+        else:
+            large = chars > self.large_doc_chars or lines > self.large_doc_lines
+        if large != self._large_document:
+            self.set_large_document(large)
+
+    def set_large_document(self, large):
+        """切換大型文件模式"""
+        if large == self._large_document:
+            return
+        self._large_document = large
+        self._apply_document_features(large)
+
+        # 摺疊：關閉時先全部展開，避免留下看不見的行，並停止計算摺疊層級
+        if large:
+            self.SendScintilla(QsciScintilla.SCI_FOLDALL, QsciScintilla.SC_FOLDACTION_EXPAND)
+            self.setFolding(QsciScintilla.NoFoldStyle)
+            self.SendScintilla(QsciScintilla.SCI_SETPROPERTY, b"fold", b"0")
+        else:
+            self.SendScintilla(QsciScintilla.SCI_SETPROPERTY, b"fold", b"1")
+            self.setup_folding()
+
+        self.large_document_changed.emit(large)
+
+    def _apply_document_features(self, large):
+        """啟用或關閉大型文件時耗時的顯示功能（摺疊另由 set_large_document 處理）"""
+        # 換行需要排版整份文件，對大型資料表最耗時
+        self.setWrapMode(QsciScintilla.WrapNone if large else QsciScintilla.WrapWord)
+        self.setIndentationGuides(not large)
+        self.setBraceMatching(QsciScintilla.NoBraceMatch if large
+                              else QsciScintilla.SloppyBraceMatch)
+        self.setCaretLineVisible(not large)
+        # 大型文件只在閒置時為可見範圍之後的部分上色
+        self.SendScintilla(QsciScintilla.SCI_SETIDLESTYLING,
+                           QsciScintilla.SC_IDLESTYLING_AFTERVISIBLE if large
+                           else QsciScintilla.SC_IDLESTYLING_NONE)
+
     def setup_indicators(self):
         """設置指示器（用於錯誤高亮）"""
         # 錯誤指示器（紅色波浪線）
-        self.indicatorDefine(QsciScintilla.SquiggleIndicator, 0)
-        self.setIndicatorForegroundColor(QColor("#FF6B6B"), 0)
+        self.indicatorDefine(QsciScintilla.SquiggleIndicator, self.ERROR_INDICATOR)
+        self.setIndicatorForegroundColor(QColor("#FF6B6B"), self.ERROR_INDICATOR)
 
         # 警告指示器（黃色波浪線）
         self.indicatorDefine(QsciScintilla.SquiggleIndicator, 1)
         self.setIndicatorForegroundColor(QColor("#FFCC00"), 1)
 
+        # 語意高亮指示器（改變文字顏色）
+        for indicator, color in self.SEMANTIC_INDICATORS.values():
+            self.indicatorDefine(QsciScintilla.TextColorIndicator, indicator)
+            self.setIndicatorForegroundColor(QColor(color), indicator)
+
     def add_error_marker(self, line):
         """在指定行添加錯誤標記"""
-        self.markerAdd(line, 0)
+        self.markerAdd(line, self.ERROR_MARKER)
 
     def add_warning_marker(self, line):
         """在指定行添加警告標記"""
-        self.markerAdd(line, 1)
+        self.markerAdd(line, self.WARNING_MARKER)
 
     def clear_markers(self):
         """清除所有標記"""
-        self.markerDeleteAll(0)
-        self.markerDeleteAll(1)
+        self.markerDeleteAll(self.ERROR_MARKER)
+        self.markerDeleteAll(self.WARNING_MARKER)
 
     def highlight_error(self, start_pos, length):
         """高亮錯誤區域"""
-        self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, 0)
+        self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, self.ERROR_INDICATOR)
         self.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE, start_pos, length)
 
     def clear_error_highlights(self):
         """清除所有錯誤高亮"""
-        self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, 0)
+        self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, self.ERROR_INDICATOR)
         self.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, 0, self.length())
 
+    # 標記與指示器由 Scintilla 錨定在文字上，編輯時會自動跟著移動，
+    # 因此直接讀取目前狀態與新的診斷結果比對，只增刪有變化的部分。
+
+    def marker_lines(self, marker):
+        """目前帶有指定標記的所有行"""
+        mask = 1 << marker
+        lines = set()
+        line = self.SendScintilla(QsciScintilla.SCI_MARKERNEXT, 0, mask)
+        while line >= 0:
+            lines.add(line)
+            line = self.SendScintilla(QsciScintilla.SCI_MARKERNEXT, line + 1, mask)
+        return lines
+
+    def sync_markers(self, marker, lines, additive=False):
+        """讓指定標記剛好出現在 lines 上（additive 時只新增）"""
+        current = self.marker_lines(marker)
+        line_count = self.lines()
+        if not additive:
+            for line in current - lines:
+                self.markerDelete(line, marker)
+        for line in lines - current:
+            if 0 <= line < line_count:
+                self.markerAdd(line, marker)
+
+    def indicator_ranges(self, indicator):
+        """目前指示器覆蓋的範圍 [(start, length), ...]"""
+        ranges = []
+        length = self.length()
+        pos = 0
+        while pos < length:
+            end = self.SendScintilla(QsciScintilla.SCI_INDICATOREND, indicator, pos)
+            if end <= pos:
+                break
+            if self.SendScintilla(QsciScintilla.SCI_INDICATORVALUEAT, indicator, pos):
+                ranges.append((pos, end - pos))
+            pos = end
+        return ranges
+
+    def sync_indicator(self, indicator, ranges, additive=False):
+        """讓指示器剛好覆蓋 ranges（additive 時只新增）"""
+        # 重疊或相鄰的範圍在 Scintilla 中是同一段，先合併再比對
+        length = self.length()
+        merged = []
+        for start, size in sorted(ranges):
+            end = min(start + size, length)
+            if start < 0 or end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        wanted = {(start, end - start) for start, end in merged}
+        current = set(self.indicator_ranges(indicator))
+
+        self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, indicator)
+        if not additive:
+            for start, size in current - wanted:
+                self.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, start, size)
+        for start, size in wanted - current:
+            self.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE, start, size)
+
+    def clear_semantic_range(self, start, end):
+        """清除 [start, end)（位元組位置）內的語意高亮"""
+        end = min(end, self.length())
+        if end <= start:
+            return
+        for indicator, _ in self.SEMANTIC_INDICATORS.values():
+            self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, indicator)
+            self.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, start, end - start)
+
+    def fill_semantic_spans(self, spans):
+        """加上語意高亮 spans [(kind, start, length), ...]（位元組位置）"""
+        by_kind = {}
+        for kind, start, length in spans:
+            by_kind.setdefault(kind, []).append((start, length))
+        for kind, ranges in by_kind.items():
+            self.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT,
+                               self.SEMANTIC_INDICATORS[kind][0])
+            for start, length in ranges:
+                self.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE, start, length)
+
+    def visible_line_range(self):
+        """目前可見的文件行範圍 (first, last)，已考慮摺疊"""
+        first_visible = self.firstVisibleLine()
+        lines_on_screen = self.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+        first = self.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, first_visible)
+        last = self.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE,
+                                  first_visible + lines_on_screen)
+        return first, last
+
 
 class APIReferencePanel(QWidget):
     """API 參考面板"""
@@ -1017,12 +773,87 @@ class APIReferencePanel(QWidget):
             self.api_selected.emit(func_name)
 
 
+class OutputLogModel(QAbstractListModel):
+    """固定容量的輸出紀錄（環狀緩衝）
+
+    同一輪事件迴圈內的多筆 append 先暫存，flush 時一次插入；
+    超過 max_lines 時捨棄最舊的紀錄。
+    """
+
+    LEVEL_COLORS = {
+        "info": QColor("#E0E0E0"),
+        "warning": QColor("#FFCC00"),
+        "error": QColor("#FF6B6B"),
+        "success": QColor("#6A9955"),
+    }
+
+    def __init__(self, max_lines=5000, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)   # (text, level)
+        self._pending = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        text, level = self._lines[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == Qt.ForegroundRole:
+            return self.LEVEL_COLORS.get(level, self.LEVEL_COLORS["info"])
+        return None
+
+    def append(self, text, level="info"):
+        """暫存一筆紀錄，回傳是否需要排程 flush"""
+        self._pending.append((text, level))
+        return len(self._pending) == 1
+
+    def flush(self):
+        """把暫存的紀錄一次加入模型"""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+        # 單次更新超過容量時只保留最後 max_lines 筆
+        if len(pending) > self.max_lines:
+            pending = pending[-self.max_lines:]
+
+        overflow = len(self._lines) + len(pending) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._lines.popleft()
+            self.endRemoveRows()
+
+        first = len(self._lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._lines.extend(pending)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._lines.clear()
+        self._pending = []
+        self.endResetModel()
+
+    def lines(self):
+        """目前（含尚未 flush）的紀錄文字"""
+        return [text for text, _ in self._lines] + [text for text, _ in self._pending]
+
+
 class OutputPanel(QWidget):
     """輸出/偵錯面板"""
 
-    def __init__(self, parent=None):
+    def __init__(self, max_lines=5000, parent=None):
         super().__init__(parent)
         self.setObjectName("outputPanel")
+        self.model = OutputLogModel(max_lines, self)
+        self._follow_tail = True
         self.setup_ui()
 
     def setup_ui(self):
@@ -1051,27 +882,36 @@ class OutputPanel(QWidget):
 
         layout.addWidget(title_bar)
 
-        # 輸出文字區域
-        self.output_text = QTextEdit()
+        # 輸出列表：只繪製可見的行
+        self.output_text = QListView()
         self.output_text.setObjectName("outputText")
-        self.output_text.setReadOnly(True)
+        self.output_text.setModel(self.model)
         self.output_text.setFont(QFont("Consolas", 10))
+        self.output_text.setUniformItemSizes(True)
+        self.output_text.setWordWrap(False)
+        self.output_text.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.output_text.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.output_text.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
         layout.addWidget(self.output_text)
 
     def append_output(self, text, level="info"):
-        """Append output message"""
-        color_map = {
-            "info": "#E0E0E0",
-            "warning": "#FFCC00",
-            "error": "#FF6B6B",
-            "success": "#6A9955",
-        }
-        color = color_map.get(level, "#E0E0E0")
-        self.output_text.append(f'<span style="color: {color};">{text}</span>')
+        """Append output message (shown on the next event loop pass)"""
+        if not self.model.append(text, level):
+            return  # Flush already scheduled for this tick
+        # 加入前若已在底部，更新後保持捲動到底部
+        scroll_bar = self.output_text.verticalScrollBar()
+        self._follow_tail = scroll_bar.value() == scroll_bar.maximum()
+        QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        """Apply the coalesced appends"""
+        self.model.flush()
+        if self._follow_tail:
+            self.output_text.scrollToBottom()
 
     def clear_output(self):
         """Clear output"""
-        self.output_text.clear()
+        self.model.clear()
 
     def log_info(self, text):
         """Log info"""
@@ -1090,12 +930,224 @@ class OutputPanel(QWidget):
         self.append_output(f"[SUCCESS] {text}", "success")
 
 
+class SyntaxCheckWorker(QObject):
+    """背景語法檢查器
+
+    在獨立執行緒上執行 LuaSyntaxChecker.check_progressive()，避免 GUI
+    執行緒卡頓。每次提交都帶有文件版本號；尚未開始的舊版本會被新提交
+    取代，執行中的舊版本會在下一個切片邊界停止，只有最新版本的結果
+    會送回 GUI 執行緒。
+
+    可見範圍的診斷最先透過 progress 信號送出，其餘部分依時間預算
+    分片逐步送出，全部完成後再以 checked 信號送出完整結果（含工作區
+    符號索引的未定義變數警告）。
+    """
+
+    # (文件版本號, 本切片新增的錯誤)
+    progress = pyqtSignal(int, object)
+    # (文件版本號, 完整錯誤列表)
+    checked = pyqtSignal(int, object)
+
+    def __init__(self, checker, parent=None):
+        super().__init__(parent)
+        self._checker = checker
+        self._cond = threading.Condition()
+        self._pending = None        # (version, code, viewport, budget, expression)，只保留最新一筆
+        self._latest_version = -1
+        self._stopped = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="lua-syntax-check", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, version, code, viewport=None, budget_ms=None, expression=False):
+        """提交指定版本的程式碼進行檢查（取代尚未處理的舊版本）
+
+        viewport 為優先檢查的 (first_line, last_line)；budget_ms 為每個
+        切片的時間預算，None 表示不分片。expression 為 True 時 code 是
+        屬性運算式，以 return (...) 包裝後檢查，錯誤位置再對應回原文。
+        """
+        with self._cond:
+            self._pending = (version, code, viewport, budget_ms, expression)
+            self._latest_version = version
+            self._cond.notify()
+
+    def cancel(self):
+        """丟棄尚未處理與執行中的檢查結果"""
+        with self._cond:
+            self._pending = None
+            self._latest_version = -1
+
+    def stop(self):
+        """停止背景執行緒與檢查器的子行程"""
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+        self._checker.close()
+
+    def _is_stale(self, version):
+        with self._cond:
+            return self._stopped or version != self._latest_version
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                version, code, viewport, budget_ms, expression = self._pending
+                self._pending = None
+
+            first_line, last_line = viewport if viewport else (0, None)
+            budget = budget_ms / 1000.0 if budget_ms else None
+            checked_code = wrap_expression(code) if expression else code
+            slices = self._checker.check_progressive(checked_code, first_line, last_line, budget)
+
+            errors = []
+            try:
+                for slice_errors, done in slices:
+                    # 已有更新的版本提交，停止並丟棄此版本剩餘的工作
+                    if self._is_stale(version):
+                        break
+                    if expression:
+                        slice_errors = unwrap_expression_errors(slice_errors, code)
+                    errors.extend(slice_errors)
+                    if done:
+                        self.checked.emit(version, errors)
+                    elif slice_errors:
+                        # 大區塊在子行程解析時會定期送出空切片，不必通知
+                        self.progress.emit(version, slice_errors)
+            except RuntimeError:
+                # 接收端 QObject 已被銷毀
+                return
+            finally:
+                slices.close()
+
+
+class SemanticHighlightWorker(QObject):
+    """背景語意高亮計算
+
+    在獨立執行緒上依語法檢查器已解析的區塊 AST 分類 WatchMaker API、
+    var_ 變數、回調函式與 {tag}，每個區塊的結果會保留，編輯後只重算
+    變動的區塊。再與上次已套用的內容比較，只回傳變動範圍（擴展到整行）
+    內的高亮，GUI 執行緒只需更新該範圍的指示器。位置皆為 UTF-8 位元組
+    位置，可直接交給 Scintilla。
+    """
+
+    # (文件版本號, 範圍起點, 範圍終點, [(種類, 起點, 長度), ...])
+    highlighted = pyqtSignal(int, int, int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._pending = None        # (version, code, base)，只保留最新一筆
+        self._stopped = False
+        self._highlighter = SemanticHighlighter()   # 只在背景執行緒使用
+
+        self._thread = threading.Thread(
+            target=self._run, name="lua-semantic-highlight", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, version, code, base=None):
+        """計算 code 的高亮；base 為目前已套用高亮的內容，None 表示全部重算"""
+        with self._cond:
+            self._pending = (version, code, base)
+            self._cond.notify()
+
+    def cancel(self):
+        with self._cond:
+            self._pending = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                version, code, base = self._pending
+                self._pending = None
+
+            data = code.encode('utf-8')
+            start, end = self._changed_range(data, base.encode('utf-8') if base is not None else None)
+            spans = self._byte_spans(code, data, start, end)
+            try:
+                self.highlighted.emit(version, start, end, spans)
+            except RuntimeError:
+                return  # 接收端 QObject 已被銷毀
+
+    @staticmethod
+    def _changed_range(data, base):
+        """data 中與 base 不同的範圍，擴展到整行"""
+        if base is None:
+            return 0, len(data)
+        new, old = memoryview(data), memoryview(base)
+        limit = min(len(new), len(old))
+
+        # 二分搜尋共同前綴與後綴（切片比較在 C 層進行）
+        low, high = 0, limit
+        while low < high:
+            mid = (low + high + 1) // 2
+            if new[:mid] == old[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        prefix = low
+        low, high = 0, limit - prefix
+        while low < high:
+            mid = (low + high + 1) // 2
+            if new[len(new) - mid:] == old[len(old) - mid:]:
+                low = mid
+            else:
+                high = mid - 1
+        suffix = low
+        if prefix == len(new) == len(old):
+            return 0, 0
+
+        start = data.rfind(b'\n', 0, prefix) + 1
+        end = data.find(b'\n', len(data) - suffix)
+        return start, len(data) if end < 0 else end
+
+    def _byte_spans(self, code, data, start, end):
+        """[start, end) 範圍內的高亮，轉換為位元組位置"""
+        if start >= end:
+            return []
+        spans = self._highlighter.spans(code)
+        ascii_only = len(data) == len(code)
+        result = []
+        char_pos = byte_pos = 0
+        for span in spans:
+            if ascii_only:
+                byte_pos = span.start
+            else:
+                # spans 依位置排序，逐段累加位元組長度
+                byte_pos += len(code[char_pos:span.start].encode('utf-8'))
+                char_pos = span.start
+            if byte_pos >= end:
+                break
+            length = span.end - span.start  # 高亮內容皆為 ASCII
+            if byte_pos + length > start:
+                result.append((span.kind, byte_pos, length))
+        return result
+
+
 class ScriptView(QWidget):
     """腳本編輯器視圖"""
 
     # 信號
     return_requested = pyqtSignal()
     script_changed = pyqtSignal(str)  # 當腳本內容改變時
+    _format_finished = pyqtSignal(int, object)  # (文件版本號, 格式化編輯列表)
 
     def __init__(self, mode="full", parent=None):
         super().__init__(parent)
@@ -1108,6 +1160,10 @@ class ScriptView(QWidget):
         self.property_name = ""
         self.original_value = ""
 
+        # 工作區符號索引（由 EditView 提供）與本腳本在索引中的來源 ID
+        self.symbol_index = None
+        self.source_id = None
+
         # Initialize syntax checker with WatchMaker API
         self.syntax_checker = LuaSyntaxChecker(
             watchmaker_api=WATCHMAKER_API,
@@ -1120,6 +1176,29 @@ class ScriptView(QWidget):
         self.check_timer.setSingleShot(True)
         self.check_timer.timeout.connect(self._delayed_syntax_check)
         self.check_delay_ms = 500
+        # 背景檢查每個切片的時間預算（毫秒），可見範圍優先檢查
+        self.check_slice_budget_ms = 50
+        # 超過此字數的腳本在背景執行緒格式化
+        self.format_async_threshold = 50000
+        self._format_finished.connect(self._apply_format_edits)
+
+        # Background checking, results are tagged with the document version
+        self._doc_version = 0
+        self._report_version = -1  # version whose result should report success
+        self.check_worker = SyntaxCheckWorker(self.syntax_checker, self)
+        self.check_worker.progress.connect(self._on_check_progress)
+        self.check_worker.checked.connect(self._on_check_finished)
+        worker = self.check_worker
+        self.destroyed.connect(lambda: worker.stop())
+
+        # Background semantic highlighting, applied only to the changed range
+        self._semantic_base = None  # text the current semantic highlights belong to
+        self._semantic_submitted = (-1, "")
+        self.semantic_batch_size = 2000     # spans applied per event loop pass
+        self.semantic_worker = SemanticHighlightWorker(self)
+        self.semantic_worker.highlighted.connect(self._on_semantic_highlighted)
+        semantic_worker = self.semantic_worker
+        self.destroyed.connect(lambda: semantic_worker.stop())
 
         self.setup_ui()
         self.connect_signals()
@@ -1133,9 +1212,6 @@ class ScriptView(QWidget):
     def _init_editor_focus(self):
         """初始化編輯器焦點和自動完成"""
         self.editor.setFocus()
-        # 重新準備 API 以確保自動完成正常工作
-        if hasattr(self.editor, 'apis') and self.editor.apis:
-            self.editor.apis.prepare()
 
     def setup_ui(self):
         """設置 UI"""
@@ -1210,6 +1286,16 @@ class ScriptView(QWidget):
 
         layout.addStretch()
 
+        # 大型文件模式提示（僅在啟用時顯示）
+        self.large_doc_label = QLabel("Large document mode")
+        self.large_doc_label.setObjectName("largeDocLabel")
+        self.large_doc_label.setToolTip(
+            "Word wrap, folding, brace matching, indentation guides and\n"
+            "current line highlight are off until the script gets smaller."
+        )
+        self.large_doc_label.hide()
+        layout.addWidget(self.large_doc_label)
+
         # Undo button - uses QScintilla built-in undo
         self.undo_btn = QPushButton("Undo")
         self.undo_btn.setObjectName("checkButton")
@@ -1289,6 +1375,9 @@ class ScriptView(QWidget):
         # 編輯器文字改變
         self.editor.textChanged.connect(self.on_text_changed)
 
+        # 大型文件模式切換
+        self.editor.large_document_changed.connect(self._on_large_document_changed)
+
         # Setup keyboard shortcuts using QShortcut
         self.setup_shortcuts()
 
@@ -1318,6 +1407,12 @@ class ScriptView(QWidget):
         self.shortcut_return = QShortcut(QKeySequence("Escape"), self)
         self.shortcut_return.activated.connect(self.on_return)
 
+        # Go to definition: F12, find usages: Shift+F12
+        self.shortcut_definition = QShortcut(QKeySequence("F12"), self)
+        self.shortcut_definition.activated.connect(self.go_to_definition)
+        self.shortcut_usages = QShortcut(QKeySequence("Shift+F12"), self)
+        self.shortcut_usages.activated.connect(self.find_usages)
+
     def undo_action(self):
         """Undo using QScintilla built-in undo"""
         if self.editor.isUndoAvailable():
@@ -1336,8 +1431,10 @@ class ScriptView(QWidget):
         # Update title
         self.title_label.setText(f"Lua Script Editor - {property_name}")
 
-        # Set editor content
+        # Set editor content (loading is not an undoable edit)
         self.editor.setText(self.original_value)
+        self.editor.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        self._semantic_base = None  # setText drops all indicators
 
         # Clear output
         self.output_panel.clear_output()
@@ -1358,34 +1455,72 @@ class ScriptView(QWidget):
             self.output_panel.log_info(f"Inserted {func_name} template")
 
     def check_syntax(self):
-        """Check syntax using luaparser-based checker"""
-        self.editor.clear_markers()
-        self.editor.clear_error_highlights()
-
+        """Check syntax using luaparser-based checker (runs in background)"""
         code = self.editor.text()
         if not code.strip():
+            self.editor.clear_markers()
+            self.editor.clear_error_highlights()
             self.output_panel.log_warning("Code is empty")
             return
 
-        # Perform syntax check using LuaSyntaxChecker
-        errors = self.syntax_checker.check(code)
-        self._display_errors(errors, show_success=True)
+        # Result arrives through _on_check_finished
+        self.check_timer.stop()
+        self._report_version = self._doc_version
+        self._submit_check(code)
+
+    def _submit_check(self, code):
+        """Submit code to the background worker, visible lines first"""
+        self.check_worker.submit(
+            self._doc_version, code,
+            viewport=self.editor.visible_line_range(),
+            budget_ms=self.check_slice_budget_ms,
+            expression=(self.mode == "simple")
+        )
+
+    def _on_check_progress(self, version, errors):
+        """Show markers for a partial result (visible range first)"""
+        if version != self._doc_version:
+            return  # Document changed since this check was submitted
+        # Only add: stale markers are removed once the full result arrives
+        self._mark_errors(errors, additive=True)
+
+    def _on_check_finished(self, version, errors):
+        """Receive background check result for a document version"""
+        if version != self._doc_version:
+            return  # Document changed since this check was submitted
+
+        self._display_errors(errors, show_success=(version == self._report_version))
+        if self.mode != "simple":
+            # The check has parsed the chunks, highlighting reuses their ASTs
+            self._submit_semantic(self.editor.text())
+
+    def _mark_errors(self, errors: list, additive: bool = False):
+        """Update editor markers and highlights to match errors
+
+        Only markers and highlight ranges that differ from what the editor
+        shows are added or removed; with additive=True nothing is removed.
+        """
+        error_lines, warning_lines, ranges = set(), set(), []
+        for error in errors:
+            # Visual markers based on severity
+            if error.severity == ErrorSeverity.ERROR:
+                error_lines.add(error.line)
+                # Highlight error span if available
+                if error.start_pos is not None and error.length:
+                    ranges.append((error.start_pos, error.length))
+            else:
+                warning_lines.add(error.line)
+
+        editor = self.editor
+        editor.sync_markers(editor.ERROR_MARKER, error_lines, additive)
+        editor.sync_markers(editor.WARNING_MARKER, warning_lines, additive)
+        editor.sync_indicator(editor.ERROR_INDICATOR, ranges, additive)
 
     def _display_errors(self, errors: list, show_success: bool = True):
         """Display errors in editor and output panel"""
+        self._mark_errors(errors)
         if errors:
             for error in errors:
-                # Add visual markers based on severity
-                if error.severity == ErrorSeverity.ERROR:
-                    self.editor.add_error_marker(error.line)
-                else:
-                    self.editor.add_warning_marker(error.line)
-
-                # Highlight error span if available
-                if error.start_pos is not None and error.length:
-                    if error.severity == ErrorSeverity.ERROR:
-                        self.editor.highlight_error(error.start_pos, error.length)
-
                 # Log to output panel
                 line_display = error.line + 1  # 1-indexed for display
                 log_msg = f"Line {line_display}: [{error.error_code}] {error.message}"
@@ -1403,59 +1538,179 @@ class ScriptView(QWidget):
     def _delayed_syntax_check(self):
         """Perform syntax check after debounce delay"""
         code = self.editor.text()
-        if not code.strip() or len(code) > 10000:
-            return  # Skip for empty or very long code
-
-        self.editor.clear_markers()
-        self.editor.clear_error_highlights()
-
-        errors = self.syntax_checker.check(code)
-        self._display_errors(errors, show_success=False)
+        if not code.strip() or self.mode == "simple":
+            # Nothing for the check to parse first
+            self._submit_semantic(code)
+        if not code.strip():
+            return  # Skip for empty code
+
+        self._submit_check(code)
+
+    def _submit_semantic(self, code):
+        """Compute semantic highlights for the current document version"""
+        self._semantic_submitted = (self._doc_version, code)
+        self.semantic_worker.submit(self._doc_version, code, self._semantic_base)
+
+    def _on_semantic_highlighted(self, version, start, end, spans):
+        """Apply semantic highlights for the changed range"""
+        if version != self._doc_version:
+            return  # Stale; the base is unchanged so the next result covers it
+        self.editor.clear_semantic_range(start, end)
+        self._semantic_base = self._semantic_submitted[1]
+        self._fill_semantic_batch(version, spans, 0)
+
+    def _fill_semantic_batch(self, version, spans, index):
+        """Fill spans a batch per event loop pass so typing is never blocked"""
+        if version != self._doc_version:
+            # Interrupted by an edit: the rest of the range is unhighlighted,
+            # so the next result has to recompute everything
+            self._semantic_base = None
+            return
+        batch_end = index + self.semantic_batch_size
+        self.editor.fill_semantic_spans(spans[index:batch_end])
+        if batch_end < len(spans):
+            QTimer.singleShot(0, lambda: self._fill_semantic_batch(version, spans, batch_end))
 
     def format_code(self):
-        """Format code (basic indentation)"""
+        """Format the selected lines, or the whole script, with minimal edits"""
         code = self.editor.text()
         if not code.strip():
             return
 
-        formatted_lines = []
-        indent_level = 0
-        indent_str = "  "  # Two spaces
+        start_line, end_line = 0, None
+        if self.editor.hasSelectedText():
+            start_line, _, end_line, end_index = self.editor.getSelection()
+            if end_index == 0 and end_line > start_line:
+                end_line -= 1  # Selection ends at the start of the next line
 
-        increase_indent = {'function', 'if', 'for', 'while', 'do', 'repeat', 'else', 'elseif'}
-        decrease_indent = {'end', 'until', 'else', 'elseif'}
+        if len(code) < self.format_async_threshold:
+            self._apply_format_edits(self._doc_version, format_edits(code, start_line, end_line))
+            return
 
-        for line in code.split('\n'):
-            stripped = line.strip()
+        # Large scripts are formatted off the GUI thread
+        version = self._doc_version
+        self.output_panel.log_info("Formatting...")
 
-            # Check if indent should decrease
-            first_word = stripped.split()[0] if stripped.split() else ''
-            if first_word in decrease_indent:
-                indent_level = max(0, indent_level - 1)
+        def run():
+            edits = format_edits(code, start_line, end_line)
+            try:
+                self._format_finished.emit(version, edits)
+            except RuntimeError:
+                pass  # View destroyed meanwhile
 
-            # Add indented line
-            if stripped:
-                formatted_lines.append(indent_str * indent_level + stripped)
-            else:
-                formatted_lines.append('')
+        threading.Thread(target=run, name="lua-format", daemon=True).start()
 
-            # Check if indent should increase
-            if first_word in increase_indent and first_word not in {'else', 'elseif'}:
-                indent_level += 1
-            elif first_word in {'else', 'elseif'}:
-                indent_level += 1
+    def _apply_format_edits(self, version, edits):
+        """Apply formatter edits as one undo step"""
+        if version != self._doc_version:
+            self.output_panel.log_warning("Code changed while formatting, format again")
+            return
+        if not edits:
+            self.output_panel.log_info("Code already formatted")
+            return
 
-        # Update editor
-        self.editor.setText('\n'.join(formatted_lines))
-        self.output_panel.log_info("Code formatted")
+        editor = self.editor
+        editor.beginUndoAction()
+        # Back to front, so earlier positions stay valid
+        for edit in reversed(edits):
+            line_start = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, edit.line)
+            if edit.remove_trailing:
+                line_end = editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, edit.line)
+                self._replace_range(line_end - edit.remove_trailing, line_end, b"")
+            self._replace_range(line_start, line_start + edit.remove_leading,
+                                edit.indent.encode('utf-8'))
+        editor.endUndoAction()
+        self.output_panel.log_info(f"Code formatted ({len(edits)} lines changed)")
+
+    def _replace_range(self, start, end, text: bytes):
+        """Replace a byte range of the document through the Scintilla target"""
+        self.editor.SendScintilla(QsciScintilla.SCI_SETTARGETSTART, start)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETTARGETEND, end)
+        self.editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(text), text)
 
     def clear_editor(self):
         """Clear editor content"""
         self.editor.clear()
+        self._semantic_base = None
         self.editor.clear_markers()
         self.editor.clear_error_highlights()
         self.output_panel.log_info("Editor cleared")
 
+    def reset(self):
+        """重置為未使用的狀態（供 ScriptViewPool 重複使用）"""
+        self.on_apply_callback = None
+        self.on_back_callback = None
+        self.property_name = ""
+        self.original_value = ""
+        self.symbol_index = None
+        self.source_id = None
+
+        self.editor.setText("")
+        self.editor.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        self.editor.clear_markers()
+        self.editor.clear_error_highlights()
+        self.output_panel.clear_output()
+
+        # 停止排程中與執行中的檢查
+        self.check_timer.stop()
+        self.check_worker.cancel()
+        self.semantic_worker.cancel()
+        self._semantic_base = None
+
+    def set_symbol_index(self, symbol_index, source_id):
+        """綁定工作區符號索引，啟用跳至定義、尋找參考與未定義變數警告
+
+        編輯中的內容尚未套用，不寫入索引；本腳本的符號每次從編輯器
+        內容取得，其他來源的符號由索引查詢。
+        """
+        self.symbol_index = symbol_index if source_id is not None else None
+        self.source_id = source_id
+
+    def _word_at_cursor(self):
+        line, index = self.editor.getCursorPosition()
+        return self.editor.wordAtLineIndex(line, index)
+
+    def _workspace_symbols(self, name):
+        """(本腳本的符號, 其他來源的符號)，兩者皆只含 name"""
+        own = [symbol for symbol in extract_symbols(self.editor.text(), self.source_id)
+               if symbol.name == name]
+        others = [symbol for symbol in
+                  self.symbol_index.definitions(name) + self.symbol_index.usages(name)
+                  if symbol.source != self.source_id]
+        return own, others
+
+    def go_to_definition(self):
+        """Jump to the definition of the name under the cursor"""
+        name = self._word_at_cursor()
+        if not name or self.symbol_index is None:
+            return
+        own, others = self._workspace_symbols(name)
+        own = [symbol for symbol in own if symbol.definition]
+        others = [symbol for symbol in others if symbol.definition]
+        if not own and not others:
+            self.output_panel.log_warning(f"No definition found for '{name}'")
+            return
+
+        # 優先跳至本腳本內的定義，其他來源的定義列在輸出面板
+        if own:
+            self.editor.setCursorPosition(own[0].line, own[0].column)
+            self.editor.ensureLineVisible(own[0].line)
+        for symbol in others:
+            self.output_panel.log_info(
+                f"'{name}' defined in {symbol.source}, line {symbol.line + 1}")
+
+    def find_usages(self):
+        """List every definition and usage of the name under the cursor"""
+        name = self._word_at_cursor()
+        if not name or self.symbol_index is None:
+            return
+        own, others = self._workspace_symbols(name)
+        self.output_panel.log_info(f"'{name}': {len(own) + len(others)} references")
+        for symbol in own + others:
+            kind = "definition" if symbol.definition else "usage"
+            source = "this script" if symbol.source == self.source_id else symbol.source
+            self.output_panel.log_info(f"  {kind}: {source}, line {symbol.line + 1}")
+
     def set_callbacks(self, on_apply=None, on_back=None):
         """設定簡化模式的回調函式"""
         self.on_apply_callback = on_apply
@@ -1479,14 +1734,64 @@ class ScriptView(QWidget):
         if self.on_back_callback:
             self.on_back_callback()
 
+    def _on_large_document_changed(self, large):
+        """Show the large document indicator"""
+        self.large_doc_label.setVisible(large)
+        if large:
+            self.output_panel.log_warning(
+                "Large document: word wrap, folding, brace matching, "
+                "indentation guides and current line highlight disabled")
+        else:
+            self.output_panel.log_info("Large document mode off, editor features restored")
+
     def on_text_changed(self):
         """On text changed"""
-        # Clear old error markers
-        self.editor.clear_markers()
-        self.editor.clear_error_highlights()
-
-        # Clear syntax checker cache when text changes
-        self.syntax_checker.clear_cache()
+        # New document version, results of older versions become stale
+        self._doc_version += 1
+
+        # Markers stay anchored to their lines and move with the edit;
+        # the next check result updates only what changed
+
+        # Restart debounce for real-time checking
+        self.check_timer.start(self.check_delay_ms)
+
+
+class ScriptViewPool:
+    """預先建立的 ScriptView 物件池
+
+    建立 ScriptView 需要編輯器、詞法分析器、API 與語法檢查器，
+    屬性腳本編輯每次都重新建立會很慢且記憶體持續增加。物件池保留
+    少量閒置的實例，取用時重新綁定，歸還時重置；超出容量的實例
+    直接釋放，記憶體用量不隨編輯次數增加。
+    """
+
+    def __init__(self, size=2, mode="simple"):
+        self.size = size
+        self.mode = mode
+        self._idle = []
+
+    def prefill(self):
+        """預先建立閒置實例（建議在視窗顯示後呼叫）"""
+        while len(self._idle) < self.size:
+            self._idle.append(ScriptView(mode=self.mode))
+
+    def acquire(self, property_name, current_value, on_apply=None, on_back=None,
+                symbol_index=None, source_id=None):
+        """取出一個 ScriptView 並綁定屬性、回調與符號索引"""
+        view = self._idle.pop() if self._idle else ScriptView(mode=self.mode)
+        view.set_symbol_index(symbol_index, source_id)
+        view.set_property(property_name, current_value)
+        view.set_callbacks(on_apply=on_apply, on_back=on_back)
+        return view
+
+    def release(self, view):
+        """歸還 ScriptView；呼叫前應已從顯示容器中移除"""
+        view.reset()
+        if len(self._idle) < self.size and view not in self._idle:
+            view.setParent(None)
+            self._idle.append(view)
+        else:
+            view.deleteLater()
 
 
 if __name__ == "__main__":
@@ -1542,5 +1847,6 @@ end
 
     window.set_property("Test Script", sample_code)
     window.show()
+    QTimer.singleShot(0, prewarm_parser)
 
     sys.exit(app.exec_())
@@ -0,0 +1,99 @@
+from lua_completion import API_COMPLETIONS, API_WORDS, TAG_INDEX, CompletionIndex, TagIndex
+
+
+def test_prefix_search_is_case_insensitive_and_sorted():
+    index = CompletionIndex(["math.max", "Math", "math.min", "print", "math.abs", "mat"])
+    assert index.complete("MATH.") == ["math.abs", "math.max", "math.min"]
+    assert index.complete("ma") == ["mat", "Math", "math.abs", "math.max", "math.min"]
+    assert index.complete("zz") == []
+
+
+def test_empty_prefix_returns_everything_and_limit_applies():
+    index = CompletionIndex(["b", "a", "c", "a"])
+    assert len(index) == 3
+    assert index.complete("") == ["a", "b", "c"]
+    assert index.complete("", limit=2) == ["a", "b"]
+
+
+def test_prefix_range_ends_before_next_prefix():
+    index = CompletionIndex(["var_", "var_s_", "var_ms_", "vara", "vas"])
+    assert index.complete("var_") == ["var_", "var_ms_", "var_s_"]
+
+
+def test_recorded_use_ranks_words_first_keeping_alphabetical_ties():
+    index = CompletionIndex(["string.find", "string.format", "string.len", "string.sub"])
+    index.record_use("string.sub")
+    index.record_use("string.sub")
+    index.record_use("string.len")
+    assert index.complete("string.") == [
+        "string.sub", "string.len", "string.find", "string.format"]
+    assert index.complete("string.f") == ["string.find", "string.format"]
+
+
+def test_api_index_covers_api_words():
+    assert len(API_COMPLETIONS) == len(set(API_WORDS))
+    assert "wm_schedule" in API_COMPLETIONS.complete("wm_sch")
+
+
+GROUPS = {
+    "Date": {
+        "Day_of_week_full:{ddww}": "{ddww}",
+        "Day_of_week:{ddw}": "{ddw}",
+        "Day:{dd}": "{dd}",
+    },
+    "Time": {
+        "Hour:{dh}": "{dh}",
+        "Minute:{dm}": "{dm}",
+        "Seconds_rotation:{drs}": "{drs}",
+    },
+}
+
+
+def _codes(entries):
+    return [entry.code for entry in entries]
+
+
+def test_tag_entries_are_built_from_groups():
+    index = TagIndex(GROUPS)
+    assert len(index) == 6
+    entry = index.get("Day_of_week_full:{ddww}")
+    assert (entry.tag, entry.code, entry.name, entry.initials, entry.category) == (
+        "{ddww}", "ddww", "day_of_week_full", "dowf", "Date")
+
+
+def test_empty_query_keeps_original_order():
+    index = TagIndex(GROUPS)
+    assert _codes(index.search("")) == ["ddww", "ddw", "dd", "dh", "dm", "drs"]
+    assert _codes(index.search("{}", limit=2)) == ["ddww", "ddw"]
+
+
+def test_exact_code_ranks_before_prefix_and_fuzzy_matches():
+    index = TagIndex(GROUPS)
+    result = _codes(index.search("dd"))
+    assert result[0] == "dd"
+    assert set(result[1:3]) == {"ddw", "ddww"}
+
+
+def test_word_initials_and_word_prefixes_rank_as_abbreviations():
+    index = TagIndex(GROUPS)
+    assert set(_codes(index.search("dow"))[:2]) == {"ddww", "ddw"}
+    assert _codes(index.search("rot")) == ["drs"]
+
+
+def test_subsequence_matches_last_and_braces_are_ignored():
+    index = TagIndex(GROUPS)
+    assert _codes(index.search("{hr}")) == ["dh"]
+    assert index.search("xyz") == []
+
+
+def test_narrowing_query_matches_fresh_search():
+    narrowed = TagIndex(GROUPS)
+    for query in ("d", "da", "day", "day_"):
+        result = _codes(narrowed.search(query))
+        assert result == _codes(TagIndex(GROUPS).search(query))
+    # Going back to a shorter query searches everything again
+    assert _codes(narrowed.search("m")) == _codes(TagIndex(GROUPS).search("m"))
+
+
+def test_shared_tag_index_finds_common_tags():
+    assert TAG_INDEX.search("dh")[0].tag == "{dh}"
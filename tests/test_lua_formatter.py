@@ -0,0 +1,68 @@
+from lua_formatter import LineEdit, apply_edits, format_edits, format_lua, indent_levels
+
+MESSY = """function on_second(h, m, s)
+if s > 30 then
+x = {
+1,
+2,
+}
+else
+y = 1   
+end
+end
+"""
+
+FORMATTED = """function on_second(h, m, s)
+  if s > 30 then
+    x = {
+      1,
+      2,
+    }
+  else
+    y = 1
+  end
+end
+"""
+
+
+def test_format_lua_indents_blocks_and_tables():
+    assert format_lua(MESSY) == FORMATTED
+
+
+def test_formatted_code_produces_no_edits():
+    assert format_edits(FORMATTED) == []
+
+
+def test_one_level_per_line_of_openers():
+    code = "foo({\na = 1,\n})\n"
+    assert indent_levels(code) == [0, 1, 0, 0]
+    assert format_lua(code) == "foo({\n  a = 1,\n})\n"
+
+
+def test_edits_touch_whitespace_only():
+    edits = format_edits("if x then\n\ty = 1  \n   \nend")
+    assert edits == [LineEdit(1, 1, "  ", 2), LineEdit(2, 3, "", 0)]
+
+
+def test_range_is_indented_in_context():
+    edits = format_edits(MESSY, start_line=2, end_line=3)
+    assert [edit.line for edit in edits] == [2, 3]
+    result = apply_edits(MESSY, edits).split("\n")
+    assert result[1] == "if s > 30 then"          # outside the range, unchanged
+    assert result[2:4] == ["    x = {", "      1,"]
+
+
+def test_multiline_strings_and_comments_are_left_alone():
+    code = "if x then\ns = [[\n  keep\n]]\n--[[\n   also\n]]\nend"
+    levels = indent_levels(code)
+    assert levels[2] is None and levels[3] is None
+    assert levels[5] is None and levels[6] is None
+    assert format_lua(code).split("\n")[2] == "  keep"
+
+
+def test_crlf_line_endings_are_kept():
+    assert format_lua("do\r\nx = 1\r\nend") == "do\r\n  x = 1\r\nend"
+
+
+def test_custom_indent():
+    assert format_lua("do\nx = 1\nend", indent="\t") == "do\n\tx = 1\nend"
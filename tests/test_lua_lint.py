@@ -0,0 +1,89 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from lua_lint import LintItem, check_item, collect_items, format_json, format_junit, main
+from lua_syntax_checker import LuaSyntaxChecker
+
+requires_parser = pytest.mark.skipif(
+    not LuaSyntaxChecker().parser_available, reason="luaparser is not installed")
+
+
+WATCH_XML = """<Watch>
+  <Script>var_x = 1</Script>
+  <Layer type="text" name="clock" x="12" y="var_s_rotation * (2"/>
+</Watch>
+"""
+
+
+def _result(name, diagnostics, path="face.lua"):
+    return {"path": path, "name": name, "kind": "script", "time": 0.5,
+            "diagnostics": diagnostics}
+
+
+ERROR = {"line": 1, "column": 5, "severity": "error", "code": "E001", "message": "bad"}
+WARNING = {"line": 2, "column": 1, "severity": "warning", "code": "W010", "message": "meh"}
+
+
+@requires_parser
+def test_expression_errors_are_reported_once_per_position():
+    result = check_item(LintItem("face.xml", "clock.x", "(1+", "expression"))
+    keys = [(d["line"], d["column"], d["code"]) for d in result["diagnostics"]]
+    assert keys
+    assert len(keys) == len(set(keys))
+
+
+@requires_parser
+def test_expression_positions_are_relative_to_the_expression():
+    result = check_item(LintItem("face.xml", "clock.x", "var_s_rotation * 6", "expression"))
+    assert result["diagnostics"] == []
+    result = check_item(LintItem("face.xml", "clock.x", "var_s_rotation *", "expression"))
+    assert [(d["line"], d["code"]) for d in result["diagnostics"]] == [(1, "E001")]
+
+
+def test_collect_items_reads_scripts_and_expressions(tmp_path):
+    (tmp_path / "main.lua").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("not lua")
+    (tmp_path / "watch.xml").write_text(WATCH_XML)
+
+    items = collect_items([str(tmp_path)])
+    assert sorted((item.name, item.kind) for item in items) == [
+        ("clock.y", "expression"), ("script", "script"), ("script", "script")]
+    # Plain numbers are not expressions
+    assert not any(item.name == "clock.x" for item in items)
+
+    with_txt = collect_items([str(tmp_path)], (".lua", ".txt"))
+    assert len(with_txt) == len(items) + 1
+
+
+def test_format_json_counts_by_severity_and_groups_by_file():
+    results = [_result("script", [ERROR, WARNING]),
+               _result("script", [], path="other.lua")]
+    report = json.loads(format_json(results, 1.25))
+    assert report["summary"] == {"files": 2, "items": 2, "errors": 1, "warnings": 1, "time": 1.25}
+    assert [entry["path"] for entry in report["files"]] == ["face.lua", "other.lua"]
+    assert report["files"][0]["items"][0]["diagnostics"] == [ERROR, WARNING]
+
+
+def test_format_junit_has_one_failure_per_item_with_diagnostics():
+    results = [_result("script", [ERROR, WARNING]), _result("clock.x", [])]
+    suites = ET.fromstring(format_junit(results, 1.0))
+    assert suites.get("tests") == "2"
+    assert suites.get("failures") == "1"
+    (suite,) = suites
+    failing, passing = suite
+    assert failing.get("name") == "script"
+    failure = failing.find("failure")
+    assert failure.get("message") == "bad"
+    assert failure.text.splitlines() == ["1:5 [E001] bad", "2:1 [W010] meh"]
+    assert passing.find("failure") is None
+
+
+@requires_parser
+def test_main_exit_status(tmp_path, capsys):
+    (tmp_path / "ok.lua").write_text("x = 1\n")
+    assert main(["-j", "1", str(tmp_path)]) == 0
+    (tmp_path / "bad.lua").write_text("x = (\n")
+    assert main(["-j", "1", "-f", "junit", str(tmp_path)]) == 1
+    assert "<testsuites" in capsys.readouterr().out
@@ -0,0 +1,245 @@
+import pytest
+
+import lua_symbols
+from lua_symbols import (API_CALL, BUILTIN_GLOBALS, CALLBACK, GLOBAL, TAG, VARIABLE,
+                         SemanticHighlighter, SymbolIndex, build_index,
+                         chunk_semantic_spans, extract_symbols, semantic_spans)
+from lua_syntax_checker import DiagnosticsCache, LuaSyntaxChecker
+from watchmaker_api import EASING_FUNCTIONS, WATCHMAKER_API
+
+requires_parser = pytest.mark.skipif(
+    not LuaSyntaxChecker().parser_available, reason="luaparser is not installed")
+
+
+def names(code, definition=None):
+    return [(symbol.name, symbol.definition) for symbol in extract_symbols(code)
+            if definition is None or symbol.definition == definition]
+
+
+def test_assignments_are_definitions_and_reads_are_usages():
+    assert names("var_a = 1\nvar_b = var_a + other") == [
+        ("var_a", True), ("var_b", True), ("var_a", False), ("other", False)]
+
+
+def test_multiple_assignment_targets_are_definitions():
+    assert names("a, b = 1, c") == [("a", True), ("b", True), ("c", False)]
+
+
+def test_locals_are_skipped_within_their_block_only():
+    code = (
+        "local x = 1\n"
+        "do\n"
+        "  local y = x\n"
+        "  y = 2\n"
+        "end\n"
+        "y = 3\n"
+    )
+    assert names(code) == [("y", True)]
+
+
+def test_local_function_and_parameters_are_skipped():
+    code = (
+        "local function helper(a, b)\n"
+        "  return a + b + var_c\n"
+        "end\n"
+        "helper(1, 2)\n"
+    )
+    assert names(code) == [("var_c", False)]
+
+
+def test_parameters_do_not_leak_out_of_the_function():
+    code = "function f(a)\n  return a\nend\nprint(a)"
+    assert names(code) == [("f", True), ("print", False), ("a", False)]
+
+
+def test_method_definition_declares_self():
+    code = "function obj:m(x)\n  return self, x\nend"
+    assert names(code) == [("obj", False)]
+
+
+def test_for_variables_are_scoped_to_the_loop():
+    code = (
+        "for i = 1, 10 do total = i end\n"
+        "for k, v in pairs(t) do print(k, v) end\n"
+        "print(i, k)\n"
+    )
+    assert names(code) == [
+        ("total", True), ("pairs", False), ("t", False), ("print", False),
+        ("print", False), ("i", False), ("k", False)]
+
+
+def test_if_branches_are_separate_scopes():
+    code = (
+        "if c then local a = 1 else a = 2 end\n"
+    )
+    assert names(code) == [("c", False), ("a", True)]
+
+
+def test_fields_and_table_keys_are_skipped():
+    code = "t = {key = value, [k2] = 1}\nt.field = math.floor(t.x)\nobj:call()"
+    assert names(code) == [
+        ("t", True), ("value", False), ("k2", False),
+        ("t", False), ("math", False), ("t", False), ("obj", False)]
+
+
+def test_tag_placeholders_are_skipped():
+    assert names("var_x = {dh} + {dm}") == [("var_x", True)]
+
+
+def test_categories_and_positions():
+    symbols = extract_symbols("function on_second()\n  var_ms_a = speed\nend", "src")
+    assert [(s.name, s.category, s.line, s.column, s.source) for s in symbols] == [
+        ("on_second", CALLBACK, 0, 9, "src"),
+        ("var_ms_a", VARIABLE, 1, 2, "src"),
+        ("speed", GLOBAL, 1, 13, "src"),
+    ]
+
+
+def test_builtin_globals_cover_lua_stdlib_and_watchmaker():
+    for name in ("io", "debug", "package", "loadfile", "getfenv", "bit32", "_ENV"):
+        assert name in BUILTIN_GLOBALS
+    assert set(WATCHMAKER_API) <= BUILTIN_GLOBALS
+    assert set(EASING_FUNCTIONS) <= BUILTIN_GLOBALS
+
+
+def test_index_update_replaces_only_that_source():
+    index = build_index([("a", "var_x = 1"), ("b", "var_y = var_x")])
+    assert [s.source for s in index.definitions("var_x")] == ["a"]
+    assert [s.source for s in index.usages("var_x")] == ["b"]
+
+    assert index.update("a", "var_z = 1")
+    assert index.definitions("var_x") == []
+    assert [s.source for s in index.usages("var_x")] == ["b"]
+    assert not index.update("a", "var_z = 1")   # unchanged code is skipped
+
+
+def test_index_is_defined_and_undefined():
+    index = build_index([("a", "var_x = 1\nprint(var_y)"), ("b", "var_x = var_x + 1")])
+    assert index.is_defined("var_x")
+    assert index.is_defined("var_x", exclude_source="a")
+    assert index.is_defined("print")
+    assert not index.is_defined("var_y")
+    assert [s.name for s in index.undefined()] == ["var_y"]
+    assert index.undefined("b") == []
+
+    index.remove("b")
+    assert not index.is_defined("var_x", exclude_source="a")
+
+
+def test_index_remove_prefix():
+    index = build_index([("1.x", "a = 1"), ("1.y", "b = 1"), ("10.x", "c = 1")])
+    index.remove_prefix("1.")
+    assert index.sources() == ["10.x"]
+    assert index.names() == ["c"]
+
+
+def test_index_symbol_at():
+    index = build_index([("a", "var_x = 1\nvar_y = var_x")])
+    symbol = index.symbol_at("a", 1, 10)
+    assert (symbol.name, symbol.definition) == ("var_x", False)
+    assert index.symbol_at("a", 1, 6) is None
+    assert index.symbol_at("missing", 0, 0) is None
+
+
+def test_index_names_by_category():
+    index = build_index([("a", "function on_minute() end\nvar_a = b")])
+    assert index.names(CALLBACK) == ["on_minute"]
+    assert index.names(VARIABLE) == ["var_a"]
+    assert index.names(GLOBAL) == ["b"]
+
+
+def test_index_submit_applies_latest_code_in_background():
+    index = SymbolIndex()
+    try:
+        index.submit("a", "var_old = 1")
+        index.submit("a", "var_new = 1")
+        index.submit("b", "var_b = 1")
+        assert index.wait(5)
+        assert index.names() == ["var_b", "var_new"]
+
+        index.submit("b", None)
+        assert index.wait(5)
+        assert index.sources() == ["a"]
+    finally:
+        index.close()
+
+
+def texts(code, spans):
+    return [(code[span.start:span.end], span.kind) for span in spans]
+
+
+def highlighter():
+    return SemanticHighlighter(LuaSyntaxChecker(cache=DiagnosticsCache()))
+
+
+HIGHLIGHT_CODE = (
+    "local t = {var_k = 1, [var_j] = wm_tag}\n"
+    "function on_second() var_x = t.var_y + is_bright end\n"
+    "print({dd}, \"at {dm}\")\n"
+)
+
+
+def test_token_semantic_spans():
+    assert texts(HIGHLIGHT_CODE, semantic_spans(HIGHLIGHT_CODE)) == [
+        ("var_k", VARIABLE), ("var_j", VARIABLE), ("wm_tag", API_CALL),
+        ("on_second", CALLBACK), ("var_x", VARIABLE), ("is_bright", API_CALL),
+        ("{dd}", TAG), ("{dm}", TAG)]
+
+
+@requires_parser
+def test_ast_spans_skip_table_keys_and_local_callbacks():
+    code = "t = {var_k = 1, [var_j] = 2} local function on_second() end\n"
+    parsed = LuaSyntaxChecker(cache=DiagnosticsCache()).parsed_chunks(code)
+    assert len(parsed) == 1 and parsed[0].ast is not None
+    tree = parsed[0].ast
+    assert texts(code, chunk_semantic_spans(code, tree)) == [("var_j", VARIABLE)]
+    # Without an AST the tokens decide
+    assert texts(code, chunk_semantic_spans(code)) == [
+        ("var_k", VARIABLE), ("var_j", VARIABLE), ("on_second", CALLBACK)]
+
+
+def test_highlighter_maps_tags_back_to_the_original_code():
+    assert texts(HIGHLIGHT_CODE, highlighter().spans(HIGHLIGHT_CODE))[-2:] == [
+        ("{dd}", TAG), ("{dm}", TAG)]
+
+
+def test_highlighter_falls_back_to_tokens_on_syntax_errors():
+    code = "var_a = (\nwm_vibrate(var_b"
+    assert texts(code, highlighter().spans(code)) == [
+        ("var_a", VARIABLE), ("wm_vibrate", API_CALL), ("var_b", VARIABLE)]
+
+
+def test_highlighter_recomputes_only_changed_chunks(monkeypatch):
+    computed = []
+
+    def counting(text, tree=None):
+        computed.append(text)
+        return chunk_semantic_spans(text, tree)
+
+    monkeypatch.setattr(lua_symbols, "chunk_semantic_spans", counting)
+    code = "var_a = 1\nvar_b = 2\nfunction on_minute()\n  wm_vibrate(1)\nend\n"
+    spans = highlighter()
+    first = texts(code, spans.spans(code))
+    assert len(computed) == 3
+
+    computed.clear()
+    edited = code.replace("var_b = 2", "var_b = 20")
+    assert texts(edited, spans.spans(edited)) == first
+    assert computed == ["var_b = 20\n"]
+
+
+@requires_parser
+def test_highlighter_reuses_chunks_parsed_by_the_check(monkeypatch):
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    code = "var_a = 1\nfunction on_minute()\n  wm_vibrate(var_a)\nend\n"
+    checker.check(code)
+
+    def fail(text):
+        raise AssertionError("chunk parsed again")
+
+    monkeypatch.setattr(checker, "_do_full_check", fail)
+    parsed = checker.parsed_chunks(code)
+    assert all(item.ast is not None for item in parsed)
+    assert texts(code, SemanticHighlighter(checker).spans(code)) == [
+        ("var_a", VARIABLE), ("on_minute", CALLBACK), ("wm_vibrate", API_CALL),
+        ("var_a", VARIABLE)]
@@ -0,0 +1,156 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from lua_syntax_checker import (CacheEntry, DiagnosticsCache, ErrorSeverity, LuaSyntaxChecker,
+                                LuaSyntaxError)
+from lua_tokenizer import split_chunks
+
+requires_parser = pytest.mark.skipif(
+    not LuaSyntaxChecker().parser_available, reason="luaparser is not installed")
+
+
+def _positions(errors):
+    return [(error.line, error.column, error.error_code, error.message) for error in errors]
+
+
+def _chunked_and_full(code):
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    chunked = _positions(checker.check(code))
+    full = _positions(checker._do_full_check(checker._preprocess_tags(code)))
+    return chunked, full
+
+
+# Code whose diagnostics depend on what follows a statement
+CONTEXT_CASES = [
+    "return 1\nx = 2\n",
+    "x = 1\nend\ny = 2\n",
+    "function f()\nend\nend\nz = 1\n",
+    "x = 1\nuntil\ny = 2\n",
+    "x = 1)\ny = 2\n",
+    "x = (1\ny = 2\n",
+]
+
+VALID_CASES = [
+    "local a = 1\nfunction f()\n    return a\nend\nb = f()\n",
+    "do return end\nx = 1\n",
+    "local function f() return 1 end\nx = 2\n",
+    "t = {\n    1,\n    2,\n}\nprint(t)\n",
+]
+
+
+@requires_parser
+@pytest.mark.parametrize("code", CONTEXT_CASES + VALID_CASES)
+def test_chunked_check_matches_full_parse(code):
+    chunked, full = _chunked_and_full(code)
+    assert chunked == full
+
+
+@requires_parser
+def test_top_level_return_reports_following_statement():
+    chunked, _ = _chunked_and_full("return 1\nx = 2\n")
+    assert chunked == [(1, 0, "E001", "mismatched input 'x' expecting <EOF>")]
+
+
+@pytest.mark.parametrize("code", CONTEXT_CASES[:5])
+def test_no_boundary_after_top_level_return_or_stray_closer(code):
+    assert len(split_chunks(code)) == 1
+
+
+def test_boundaries_between_independent_statements():
+    code = "local a = 1\nfunction f()\n    return a\nend\nb = f()\n"
+    chunks = split_chunks(code)
+    assert [chunk.line for chunk in chunks] == [0, 1, 4]
+    assert "".join(chunk.text for chunk in chunks) == code
+
+
+def _entry():
+    return CacheEntry([LuaSyntaxError(
+        line=2, column=4, message="unexpected symbol", severity=ErrorSeverity.ERROR,
+        error_code="E001", start_pos=20, length=3)], ast=object())
+
+
+def test_disk_cache_round_trip_keeps_diagnostics_only(tmp_path):
+    key = DiagnosticsCache.make_key("x = (")
+    DiagnosticsCache(cache_dir=str(tmp_path)).put(key, _entry())
+    assert [name.endswith(".json") for name in os.listdir(tmp_path)] == [True]
+
+    entry = DiagnosticsCache(cache_dir=str(tmp_path)).get(key)
+    assert entry.errors == _entry().errors
+    assert entry.ast is None
+
+
+def test_disk_cache_ignores_pickles_and_malformed_files(tmp_path):
+    key = DiagnosticsCache.make_key("x = 1")
+    with open(tmp_path / f"{key}.v1.pickle", "wb") as f:
+        pickle.dump(_entry(), f)
+    (tmp_path / "notes.txt").write_text("kept")
+    cache = DiagnosticsCache(cache_dir=str(tmp_path))
+    # Old pickles are removed, unrelated files are left alone
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt"]
+
+    (tmp_path / f"{key}.v{DiagnosticsCache.FORMAT_VERSION}.json").write_text(
+        '{"errors": [{"line": "0", "column": 0}]}')
+    assert cache.get(key) is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiagnosticsCache(cache_dir=str(tmp_path), max_disk_bytes=1000)
+    keys = [DiagnosticsCache.make_key(str(index)) for index in range(10)]
+    for age, key in enumerate(reversed(keys)):
+        cache.put(key, _entry())
+        path = cache._disk_path(key)
+        os.utime(path, (time.time() - 100 + age, time.time() - 100 + age))
+    total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert total <= 1000
+    # The most recently written entry survives
+    assert os.path.exists(cache._disk_path(keys[0]))
+
+
+def test_disk_cache_drops_expired_entries(tmp_path):
+    key = DiagnosticsCache.make_key("x = 1")
+    DiagnosticsCache(cache_dir=str(tmp_path)).put(key, _entry())
+    old = time.time() - 3600
+    os.utime(DiagnosticsCache(cache_dir=str(tmp_path))._disk_path(key), (old, old))
+    cache = DiagnosticsCache(max_disk_age=60)
+    cache.cache_dir = str(tmp_path)
+    assert cache.get(key) is None
+    assert os.listdir(tmp_path) == []
+
+
+def _large_script(valid=True):
+    rows = ",\n".join(f'    {{ name = "item{i}", x = {i} }}' for i in range(400))
+    tail = "}\n" if valid else "\nx = 1\n"
+    return "local data = {\n" + rows + "\n" + tail + "function on_second() print(#data) end\n"
+
+
+@requires_parser
+@pytest.mark.parametrize("valid", [True, False])
+def test_oversized_chunk_in_child_process_matches_thread(valid):
+    code = _large_script(valid)
+    in_thread = LuaSyntaxChecker(cache=DiagnosticsCache())
+    expected = _positions(in_thread.check(code))
+
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    checker.process_chunk_chars = 1000
+    try:
+        slices = list(checker.check_progressive(code, budget=0.01))
+    finally:
+        checker.close()
+    assert _positions(error for errors, _ in slices for error in errors) == expected
+    assert slices[-1][1] is True
+    assert checker._chunk_process is not None and not checker._chunk_process.broken
+
+
+@requires_parser
+def test_closing_a_check_stops_the_child_process():
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    checker.process_chunk_chars = 1000
+    slices = checker.check_progressive(_large_script(), budget=0.001)
+    assert next(slices) == ([], False)
+    process = checker._chunk_process._process
+    slices.close()
+    assert process.wait(timeout=5) is not None
+    assert checker._chunk_process._process is None
@@ -0,0 +1,150 @@
+import pytest
+
+from lua_syntax_checker import DiagnosticsCache, LuaSyntaxChecker
+from lua_tokenizer import (COMMENT, KEYWORD, NAME, NUMBER, OPERATOR, STRING, LineIndex,
+                           resplit_chunks, split_chunks, tokenize)
+
+
+def _kinds(code):
+    return [(token.type, token.value) for token in tokenize(code)]
+
+
+def test_token_types_and_values():
+    assert _kinds("local x = 0x1F + 3.5e-2 .. 'a' -- note") == [
+        (KEYWORD, "local"), (NAME, "x"), (OPERATOR, "="), (NUMBER, "0x1F"),
+        (OPERATOR, "+"), (NUMBER, "3.5e-2"), (OPERATOR, ".."), (STRING, "'a'"),
+        (COMMENT, "-- note"),
+    ]
+
+
+def test_longest_operator_wins():
+    assert [value for _, value in _kinds("a...b..c.d//e::f==g~=h")] == [
+        "a", "...", "b", "..", "c", ".", "d", "//", "e", "::", "f", "==", "g", "~=", "h"]
+
+
+def test_positions_across_multiline_tokens():
+    code = "x = [[a\nb]] --[==[c\n]==]\n  y"
+    tokens = tokenize(code)
+    assert [(token.value, token.line, token.column) for token in tokens] == [
+        ("x", 0, 0), ("=", 0, 2), ("[[a\nb]]", 0, 4), ("--[==[c\n]==]", 1, 4), ("y", 3, 2)]
+    for token in tokens:
+        assert code[token.start:token.end] == token.value
+
+
+def test_escaped_newline_in_short_string():
+    tokens = tokenize('s = "a\\\nb" t')
+    assert tokens[2].type == STRING and tokens[2].error is None
+    assert (tokens[3].value, tokens[3].line, tokens[3].column) == ("t", 1, 3)
+
+
+@pytest.mark.parametrize("code, error", [
+    ("s = 'abc\nx = 1", "unfinished string"),
+    ("s = [[abc", "unfinished long string"),
+    ("--[[ never closed", "unfinished long comment"),
+    ("x = $", "unexpected symbol '$'"),
+])
+def test_errors_are_tokens_not_exceptions(code, error):
+    assert [token.error for token in tokenize(code) if token.error] == [error]
+
+
+def test_unfinished_string_stops_at_line_end():
+    tokens = tokenize("s = 'abc\nx = 1")
+    assert [token.value for token in tokens] == ["s", "=", "'abc", "x", "=", "1"]
+
+
+def _fallback(code):
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    checker._fallback_warned = True
+    return [(error.line, error.column, error.error_code)
+            for error in checker._basic_fallback_check(code)]
+
+
+def test_fallback_accepts_balanced_code():
+    code = "function f(t)\n  for i = 1, #t do\n    repeat x = t[i] until x\n  end\nend\n"
+    assert _fallback(code) == []
+
+
+def test_fallback_reports_blocks_and_brackets():
+    assert _fallback("if x then\n  y = (1\n") == [(0, 0, "E003"), (1, 6, "E004")]
+    assert _fallback("x = 1 end") == [(0, 6, "E003")]
+    assert _fallback("x = {1)") == [(0, 4, "E004"), (0, 6, "E004")]
+
+
+def test_fallback_ignores_keywords_in_strings_and_comments():
+    assert _fallback("s = 'end' -- until )\n--[[ do ]]") == []
+
+
+@pytest.mark.parametrize("code", ["", "abc", "a\nbc\n\nd", "\n\n", "x\r\ny\n"])
+def test_line_index_round_trips_every_offset(code):
+    index = LineIndex(code)
+    assert index.line_count == code.count("\n") + 1
+    for offset in range(len(code) + 1):
+        line, column = index.position(offset)
+        expected_line = code.count("\n", 0, offset)
+        assert (line, column) == (expected_line, offset - (code.rfind("\n", 0, offset) + 1))
+        assert index.offset(line, column) == offset
+
+
+def test_line_index_clamps_out_of_range():
+    index = LineIndex("ab\ncd")
+    assert index.position(-5) == (0, 0)
+    assert index.position(99) == (1, 2)
+    assert index.offset(7, 0) == 3
+    assert index.offset(0, 99) == 5
+    assert index.offset(-1) == 0
+
+
+def test_line_index_line_end_excludes_newline():
+    index = LineIndex("ab\n\ncd")
+    assert [index.line_end(line) for line in range(3)] == [2, 3, 6]
+
+
+def test_tag_positions_map_back_to_original_code():
+    checker = LuaSyntaxChecker(cache=DiagnosticsCache())
+    checker._parser_available = False
+    checker._fallback_warned = True
+    code = 'x = {dd} .. {hh}\ny = "abc'
+    (error,) = checker.check(code)
+    assert (error.line, error.column, error.start_pos) == (1, 4, code.index('"abc'))
+
+
+RESPLIT_SOURCE = (
+    "function a()\n  return 1\nend\n"
+    "x = 1\n"
+    "local t = {\n  1, 2,\n}\n"
+    "s = [[\nlong\n]]\n"
+    "-- comment\n"
+    "z = f(1)\n  (2)\n"
+    "repeat x = x - 1 until x == 0\n"
+) * 3
+
+
+@pytest.mark.parametrize("edit", [
+    ("x = 1\n", "x = 10\n"),                  # inside one chunk
+    ("x = 1\n", "x = 1\ny = 2\n"),           # adds a chunk
+    ("x = 1\n", ""),                          # removes a chunk
+    ("function a()\n", "function a()\nif b then\n"),  # opens a block
+    ("s = [[\n", "s = 1\n"),                  # ends a long string
+    ("-- comment\n", "--[[ comment\n"),       # opens a long comment
+    ("z = f(1)\n", "return f(1)\n"),          # seals the rest
+    ("end\n", "end\nend\n"),                   # stray closer
+])
+def test_resplit_matches_full_split(edit):
+    old, new = edit
+    for count in (1, 2):
+        code = RESPLIT_SOURCE.replace(old, new, count)
+        assert resplit_chunks(code, RESPLIT_SOURCE, split_chunks(RESPLIT_SOURCE)) == \
+            split_chunks(code)
+        # Edits near the end of the code
+        code = RESPLIT_SOURCE[::-1].replace(old[::-1], new[::-1], count)[::-1]
+        assert resplit_chunks(code, RESPLIT_SOURCE, split_chunks(RESPLIT_SOURCE)) == \
+            split_chunks(code)
+
+
+def test_resplit_reuses_chunks_after_the_edit():
+    old_chunks = split_chunks(RESPLIT_SOURCE)
+    code = "y = 0\n" + RESPLIT_SOURCE
+    chunks = resplit_chunks(code, RESPLIT_SOURCE, old_chunks)
+    assert chunks == split_chunks(code)
+    # The chunk at the edit is split again, the ones after it are reused
+    assert all(new.text is old.text for new, old in zip(chunks[2:], old_chunks[1:]))